@@ -0,0 +1,267 @@
+"""
+Motor de alertas de Walletive
+Las reglas se declaran como objetos con sus parámetros (REGLAS_POR_DEFECTO)
+y el motor las evalúa de forma incremental: guarda el id del último
+movimiento evaluado y en cada pasada solo mira los movimientos nuevos,
+comparándolos contra los agregados que ya mantienen los triggers
+(ResumenTipos, ResumenCategorias, ResumenPeriodos) en lugar de recorrer el
+historial. Las alertas disparadas quedan en la tabla Alertas, y el panel de
+ALERTAS solo lee esa tabla.
+
+Hay dos clases de reglas:
+- de evento (presupuesto, gasto inusual): la alerta queda hasta que se purga.
+- de estado (balance negativo, meta próxima): la alerta existe mientras se
+  cumpla la condición y se borra sola cuando deja de cumplirse.
+"""
+
+from collections import namedtuple
+from datetime import date
+
+from transacciones import NOMBRES_CATEGORIA
+
+
+# Las alertas de evento se borran pasado este tiempo para que la tabla siga chica
+DIAS_RETENCION = 90
+
+ESQUEMA_ALERTAS = [
+    """
+    CREATE TABLE IF NOT EXISTS Alertas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        regla TEXT NOT NULL,
+        clave TEXT NOT NULL, -- qué disparó la alerta dentro de la regla (mes y categoría, id...)
+        nivel TEXT NOT NULL CHECK (nivel IN ('info', 'advertencia', 'error')),
+        mensaje TEXT NOT NULL,
+        creada TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (regla, clave)
+    );
+    """,
+    # Presupuesto mensual de gastos por categoría (0 = sin categoría), en centavos
+    """
+    CREATE TABLE IF NOT EXISTS Presupuestos (
+        categoria_id INTEGER PRIMARY KEY CHECK (categoria_id IN (0, 1, 2, 3, 4, 5)),
+        limite_mensual INTEGER NOT NULL CHECK (limite_mensual > 0)
+    );
+    """,
+    # Último movimiento ya evaluado por el motor (una sola fila, id = 1)
+    """
+    CREATE TABLE IF NOT EXISTS EstadoAlertas (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        ultimo_movimiento INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    "INSERT OR IGNORE INTO EstadoAlertas (id) VALUES (1)",
+]
+
+Alerta = namedtuple("Alerta", ["clave", "nivel", "mensaje"])
+
+# Lo que una regla necesita saber de la pasada actual: movimientos con
+# desde_id < id <= hasta_id son los nuevos
+Contexto = namedtuple("Contexto", ["desde_id", "hasta_id", "hoy"])
+
+
+def crear_alertas(cursor):
+    """Crear las tablas del motor de alertas"""
+    for sentencia in ESQUEMA_ALERTAS:
+        cursor.execute(sentencia)
+
+
+def _pesos(centavos):
+    return f"${centavos / 100:,.2f}"
+
+
+def _categoria(categoria_id):
+    return NOMBRES_CATEGORIA.get(categoria_id, "Sin categoría")
+
+
+class ReglaPresupuesto:
+    """Gasto del mes en una categoría que se acerca o supera su presupuesto"""
+
+    nombre = "presupuesto"
+    de_estado = False
+
+    def __init__(self, aviso=0.8):
+        self.aviso = aviso
+
+    def evaluar(self, cursor, contexto):
+        # Solo los pares (mes, categoría) que tocaron los movimientos nuevos
+        # del mes en curso; el total sale de ResumenPeriodos
+        cursor.execute("""
+            SELECT r.inicio, r.categoria_id, r.total, p.limite_mensual
+            FROM ResumenPeriodos r
+            JOIN Presupuestos p ON p.categoria_id = r.categoria_id
+            WHERE r.periodo = 'mes' AND r.tipo = 2
+              AND r.inicio = date(?, 'start of month')
+              AND r.categoria_id IN (
+                  SELECT IFNULL(categoria_id, 0) FROM Movimientos
+                  WHERE id > ? AND id <= ? AND tipo = 2
+                    AND date(fecha, 'start of month') = date(?, 'start of month')
+              )
+        """, (str(contexto.hoy), contexto.desde_id, contexto.hasta_id, str(contexto.hoy)))
+        alertas = []
+        for inicio, categoria_id, total, limite in cursor.fetchall():
+            clave = f"{inicio[:7]}:{categoria_id}"
+            if total > limite:
+                alertas.append(Alerta(clave, "error",
+                    f"🚨 Superaste el presupuesto de {_categoria(categoria_id)}: "
+                    f"{_pesos(total)} de {_pesos(limite)} este mes"))
+            elif total >= self.aviso * limite:
+                alertas.append(Alerta(clave, "advertencia",
+                    f"⚠️ Llevas el {total / limite:.0%} del presupuesto de {_categoria(categoria_id)} este mes"))
+        return alertas
+
+
+class ReglaGastoInusual:
+    """Gasto nuevo mucho mayor que el promedio de su categoría"""
+
+    nombre = "gasto_inusual"
+    de_estado = False
+
+    def __init__(self, factor=3.0, minimo_movimientos=10, dias_recientes=30):
+        self.factor = factor
+        # Con pocos movimientos el promedio todavía no dice nada
+        self.minimo_movimientos = minimo_movimientos
+        # Un extracto viejo importado no debería llenar el panel de alertas
+        self.dias_recientes = dias_recientes
+
+    def evaluar(self, cursor, contexto):
+        # Promedio de la categoría = total / cantidad de ResumenCategorias
+        cursor.execute("""
+            SELECT m.id, m.descripcion, m.monto, r.categoria_id, r.total, r.cantidad
+            FROM Movimientos m
+            JOIN ResumenCategorias r ON r.tipo = m.tipo AND r.categoria_id = IFNULL(m.categoria_id, 0)
+            WHERE m.id > ? AND m.id <= ? AND m.tipo = 2
+              AND m.fecha >= date(?, ?)
+              AND r.cantidad >= ? AND m.monto * r.cantidad > ? * r.total
+        """, (contexto.desde_id, contexto.hasta_id, str(contexto.hoy), f"-{int(self.dias_recientes)} days",
+              self.minimo_movimientos, self.factor))
+        return [
+            Alerta(str(movimiento_id), "advertencia",
+                   f"🔎 Gasto inusual: {descripcion or 'sin descripción'} por {_pesos(monto)} "
+                   f"({monto * cantidad / total:.1f}× el promedio de {_categoria(categoria_id)})")
+            for movimiento_id, descripcion, monto, categoria_id, total, cantidad in cursor.fetchall()
+        ]
+
+
+class ReglaMetaProxima:
+    """Metas activas cuya fecha límite está cerca o ya pasó"""
+
+    nombre = "meta_proxima"
+    de_estado = True
+
+    def __init__(self, dias=30):
+        self.dias = dias
+
+    def evaluar(self, cursor, contexto):
+        cursor.execute("""
+            SELECT id, descripcion, CAST(julianday(date(fecha_limite)) - julianday(date(?)) AS INTEGER)
+            FROM MetasAhorro
+            WHERE estado_actual = 0 AND estado_logro = 0
+              AND date(fecha_limite) <= date(?, ?)
+        """, (str(contexto.hoy), str(contexto.hoy), f"+{int(self.dias)} days"))
+        alertas = []
+        for meta_id, descripcion, dias in cursor.fetchall():
+            if dias < 0:
+                alertas.append(Alerta(str(meta_id), "error", f"⏰ La meta '{descripcion}' venció sin completarse"))
+            else:
+                cuando = "hoy" if dias == 0 else f"en {dias} días"
+                alertas.append(Alerta(str(meta_id), "advertencia", f"⏳ La meta '{descripcion}' vence {cuando}"))
+        return alertas
+
+
+class ReglaBalanceNegativo:
+    """Gastos totales mayores que los ingresos"""
+
+    nombre = "balance_negativo"
+    de_estado = True
+
+    def evaluar(self, cursor, contexto):
+        cursor.execute("""
+            SELECT IFNULL(SUM(CASE tipo WHEN 1 THEN total WHEN 2 THEN -total ELSE 0 END), 0)
+            FROM ResumenTipos
+        """)
+        if cursor.fetchone()[0] < 0:
+            return [Alerta("total", "error", "⚠️ Tu balance es negativo. Revisa tus gastos.")]
+        return []
+
+
+REGLAS_POR_DEFECTO = (
+    ReglaBalanceNegativo(),
+    ReglaPresupuesto(aviso=0.8),
+    ReglaGastoInusual(factor=3.0),
+    ReglaMetaProxima(dias=30),
+)
+
+
+class MotorAlertas:
+    """Evalúa las reglas contra los movimientos nuevos y persiste las alertas"""
+
+    def __init__(self, reglas=REGLAS_POR_DEFECTO):
+        self.reglas = tuple(reglas)
+
+    def evaluar(self, cursor, hoy=None):
+        """Una pasada del motor (dentro de una transacción de escritura)
+
+        Retorna la cantidad de alertas nuevas o que subieron de nivel.
+        """
+        hoy = hoy or date.today()
+        cursor.execute("SELECT ultimo_movimiento FROM EstadoAlertas WHERE id = 1")
+        desde_id = cursor.fetchone()[0]
+        cursor.execute("SELECT IFNULL(MAX(id), 0) FROM Movimientos")
+        hasta_id = cursor.fetchone()[0]
+        contexto = Contexto(desde_id, hasta_id, hoy)
+
+        nuevas = 0
+        for regla in self.reglas:
+            alertas = regla.evaluar(cursor, contexto)
+            for alerta in alertas:
+                nuevas += self._guardar(cursor, regla.nombre, alerta)
+            if regla.de_estado:
+                # Lo que la regla ya no reporta dejó de cumplirse
+                claves = [alerta.clave for alerta in alertas]
+                marcas = ", ".join("?" * len(claves))
+                cursor.execute(f"""
+                    DELETE FROM Alertas WHERE regla = ? AND clave NOT IN ({marcas})
+                """, [regla.nombre] + claves)
+
+        de_evento = [regla.nombre for regla in self.reglas if not regla.de_estado]
+        if de_evento:
+            cursor.execute(f"""
+                DELETE FROM Alertas
+                WHERE regla IN ({', '.join('?' * len(de_evento))}) AND creada < date(?, ?)
+            """, de_evento + [str(hoy), f"-{DIAS_RETENCION} days"])
+        cursor.execute("UPDATE EstadoAlertas SET ultimo_movimiento = ? WHERE id = 1", (hasta_id,))
+        return nuevas
+
+    def _guardar(self, cursor, regla, alerta):
+        """Insertar o actualizar una alerta; retorna 1 si es nueva o cambió de nivel"""
+        cursor.execute("SELECT nivel, mensaje FROM Alertas WHERE regla = ? AND clave = ?", (regla, alerta.clave))
+        actual = cursor.fetchone()
+        if actual is None:
+            cursor.execute("""
+                INSERT INTO Alertas (regla, clave, nivel, mensaje)
+                VALUES (?, ?, ?, ?)
+            """, (regla, alerta.clave, alerta.nivel, alerta.mensaje))
+            return 1
+        if actual[0] != alerta.nivel:
+            # Cambió de nivel: vuelve arriba en el panel
+            cursor.execute("""
+                UPDATE Alertas SET nivel = ?, mensaje = ?, creada = CURRENT_TIMESTAMP
+                WHERE regla = ? AND clave = ?
+            """, (alerta.nivel, alerta.mensaje, regla, alerta.clave))
+            return 1
+        if actual[1] != alerta.mensaje:
+            cursor.execute("UPDATE Alertas SET mensaje = ? WHERE regla = ? AND clave = ?",
+                           (alerta.mensaje, regla, alerta.clave))
+        return 0
+
+    @staticmethod
+    def leer(cursor, limite=5):
+        """Alertas para el panel: [(nivel, mensaje)], las más graves y recientes primero"""
+        cursor.execute("""
+            SELECT nivel, mensaje
+            FROM Alertas
+            ORDER BY CASE nivel WHEN 'error' THEN 0 WHEN 'advertencia' THEN 1 ELSE 2 END,
+                     creada DESC, id DESC
+            LIMIT ?
+        """, (int(limite),))
+        return cursor.fetchall()
@@ -0,0 +1,258 @@
+"""
+Análisis de movimientos con NumPy
+AnalisisMovimientos carga fecha, tipo, categoría y monto de Movimientos en
+arreglos de NumPy con una sola lectura masiva y calcula las estadísticas de
+Reportes (promedios móviles, variación mes a mes, participación por
+categoría, percentiles) con operaciones vectorizadas.
+
+Los arreglos quedan en memoria. Al actualizar solo se leen las filas con id
+mayor al último cargado; si además cambió o se borró alguna fila ya cargada
+(la firma de ResumenPeriodos no coincide con la de los arreglos) se recarga
+todo. NumPy es opcional: sin él NUMPY_DISPONIBLE es False.
+"""
+
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_DISPONIBLE = np is not None
+
+# Filas por lote en la carga masiva (acota la memoria de las tuplas intermedias)
+TAMANO_LOTE = 50000
+
+# Día como entero (días desde 1970-01-01), igual que datetime64[D]
+_DIA_SQL = "CAST(julianday(date({fecha})) - 2440587.5 AS INTEGER)"
+
+
+def _firma_sql(cursor):
+    """Firma de los movimientos según ResumenPeriodos: cambia con cualquier alta,
+    baja o modificación de tipo, categoría, monto o día"""
+    cursor.execute(f"""
+        SELECT IFNULL(SUM(cantidad), 0), IFNULL(SUM(total), 0),
+               IFNULL(SUM(total * {_DIA_SQL.format(fecha='inicio')}), 0),
+               IFNULL(SUM(total * tipo), 0), IFNULL(SUM(total * categoria_id), 0)
+        FROM ResumenPeriodos
+        WHERE periodo = 'dia'
+    """)
+    return tuple(cursor.fetchone())
+
+
+def _firma_arreglos(dias, tipos, categorias, montos):
+    """La misma firma calculada sobre arreglos (enteros de Python para no desbordar)"""
+    return (
+        len(montos),
+        int(montos.sum()),
+        int((montos * dias).sum()),
+        int((montos * tipos).sum()),
+        int((montos * categorias).sum()),
+    )
+
+
+def _sumar_firmas(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def media_movil(valores, ventana):
+    """Promedio de las últimas `ventana` posiciones; las primeras usan las que haya"""
+    valores = np.asarray(valores, dtype=np.float64)
+    if not len(valores):
+        return valores
+    acumulado = np.cumsum(np.insert(valores, 0, 0.0))
+    posiciones = np.arange(1, len(valores) + 1)
+    inicio = np.maximum(posiciones - ventana, 0)
+    return (acumulado[posiciones] - acumulado[inicio]) / (posiciones - inicio)
+
+
+def variacion(valores):
+    """Diferencia y variación relativa de cada posición respecto de la anterior
+
+    La primera posición no tiene anterior (NaN); una variación sobre 0 también es NaN.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    anteriores = np.concatenate(([np.nan], valores[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relativa = np.where(anteriores != 0, (valores - anteriores) / anteriores, np.nan)
+    return valores - anteriores, relativa
+
+
+class AnalisisMovimientos:
+    """Columnas de Movimientos en memoria y estadísticas vectorizadas sobre ellas
+
+    Los montos quedan en centavos (int64) y las fechas en días desde 1970.
+    """
+
+    def __init__(self):
+        if not NUMPY_DISPONIBLE:
+            raise RuntimeError("NumPy no está instalado")
+        self._lock = threading.Lock()
+        self._n = 0
+        self._ultimo_id = 0
+        self._firma = None
+        self._columnas = {
+            "dias": np.empty(0, dtype=np.int64),
+            "tipos": np.empty(0, dtype=np.int8),
+            "categorias": np.empty(0, dtype=np.int8),
+            "montos": np.empty(0, dtype=np.int64),
+        }
+
+    # === Carga ===
+
+    def actualizar(self, cursor, fuente="Movimientos"):
+        """Traer las filas nuevas; recargar todo si cambió alguna ya cargada
+
+        Si hay años archivados, fuente debe incluirlos (archivo.fuente_movimientos):
+        la firma de ResumenPeriodos los sigue contando.
+        Retorna la cantidad de filas leídas de la base.
+        """
+        with self._lock:
+            firma = _firma_sql(cursor)
+            if firma == self._firma:
+                return 0
+            nuevas = self._leer(cursor, self._ultimo_id, fuente) if self._firma is not None else None
+            if nuevas is not None and _sumar_firmas(self._firma, nuevas[1]) == firma:
+                self._agregar(nuevas[0])
+                self._firma = firma
+                return len(nuevas[0]["montos"])
+            # Primera carga, o modificaciones/bajas en filas ya cargadas
+            self._n = 0
+            self._ultimo_id = 0
+            columnas, _ = self._leer(cursor, 0, fuente)
+            self._agregar(columnas)
+            self._firma = firma
+            return self._n
+
+    def _leer(self, cursor, desde_id, fuente="Movimientos"):
+        """Lectura masiva de las filas con id > desde_id: (columnas, firma)"""
+        # Sin ORDER BY: sobre varias particiones obligaría a ordenar todo el historial
+        cursor.execute(f"""
+            SELECT id, {_DIA_SQL.format(fecha='fecha')}, tipo, IFNULL(categoria_id, 0), monto
+            FROM {fuente}
+            WHERE id > ? AND date(fecha) IS NOT NULL
+        """, (desde_id,))
+        bloques = []
+        while True:
+            filas = cursor.fetchmany(TAMANO_LOTE)
+            if not filas:
+                break
+            bloques.append(np.array(filas, dtype=np.int64))
+        datos = np.concatenate(bloques) if bloques else np.empty((0, 5), dtype=np.int64)
+        if len(datos):
+            self._ultimo_id = max(self._ultimo_id, int(datos[:, 0].max()))
+        columnas = {
+            "dias": datos[:, 1],
+            "tipos": datos[:, 2].astype(np.int8),
+            "categorias": datos[:, 3].astype(np.int8),
+            "montos": datos[:, 4],
+        }
+        firma = _firma_arreglos(datos[:, 1], datos[:, 2], datos[:, 3], datos[:, 4])
+        return columnas, firma
+
+    def _agregar(self, columnas):
+        """Copiar filas al final, duplicando la capacidad cuando hace falta"""
+        cantidad = len(columnas["montos"])
+        necesario = self._n + cantidad
+        for nombre, valores in columnas.items():
+            arreglo = self._columnas[nombre]
+            if necesario > len(arreglo):
+                nuevo = np.empty(max(necesario, 2 * len(arreglo)), dtype=arreglo.dtype)
+                nuevo[:self._n] = arreglo[:self._n]
+                self._columnas[nombre] = arreglo = nuevo
+            arreglo[self._n:necesario] = valores
+        self._n = necesario
+
+    def _vista(self):
+        """Columnas cargadas (vistas, sin copiar)"""
+        return {nombre: arreglo[:self._n] for nombre, arreglo in self._columnas.items()}
+
+    @property
+    def cantidad(self):
+        return self._n
+
+    # === Estadísticas ===
+
+    def _seleccion(self, tipo=None, desde=None, hasta=None):
+        """Columnas filtradas por tipo y rango de fechas (desde/hasta inclusive)"""
+        columnas = self._vista()
+        mascara = np.ones(self._n, dtype=bool)
+        if tipo is not None:
+            mascara &= columnas["tipos"] == tipo
+        if desde is not None:
+            mascara &= columnas["dias"] >= np.datetime64(str(desde)[:10], "D").astype(np.int64)
+        if hasta is not None:
+            mascara &= columnas["dias"] <= np.datetime64(str(hasta)[:10], "D").astype(np.int64)
+        return {nombre: valores[mascara] for nombre, valores in columnas.items()}
+
+    def totales_mensuales(self, tipo, meses=None):
+        """(meses como datetime64[M], totales en centavos) del tipo, sin huecos
+
+        Con meses=N se devuelven solo los últimos N meses con datos.
+        """
+        with self._lock:
+            seleccion = self._seleccion(tipo)
+        if not len(seleccion["montos"]):
+            return np.empty(0, dtype="datetime64[M]"), np.empty(0, dtype=np.int64)
+        mes = seleccion["dias"].astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        primero = mes.min()
+        totales = np.bincount(mes - primero, weights=seleccion["montos"]).astype(np.int64)
+        etiquetas = np.arange(primero, primero + len(totales)).astype("datetime64[M]")
+        if meses:
+            etiquetas, totales = etiquetas[-meses:], totales[-meses:]
+        return etiquetas, totales
+
+    def participacion_categorias(self, tipo=2, desde=None, hasta=None):
+        """{categoria_id: (total en centavos, fracción del total)} en el rango"""
+        with self._lock:
+            seleccion = self._seleccion(tipo, desde, hasta)
+        totales = np.bincount(seleccion["categorias"], weights=seleccion["montos"], minlength=6)
+        suma = totales.sum()
+        return {int(categoria): (int(total), float(total / suma) if suma else 0.0)
+                for categoria, total in enumerate(totales) if total}
+
+    def percentiles(self, tipo=2, cuantiles=(50, 75, 90, 95), desde=None, hasta=None):
+        """Percentiles del monto de cada movimiento del tipo: {cuantil: centavos}"""
+        with self._lock:
+            seleccion = self._seleccion(tipo, desde, hasta)
+        if not len(seleccion["montos"]):
+            return {}
+        valores = np.percentile(seleccion["montos"], cuantiles)
+        return {cuantil: int(round(valor)) for cuantil, valor in zip(cuantiles, valores)}
+
+    def tendencias(self, meses=12, ventana=3, hasta=None):
+        """Estadísticas de Reportes por mes para ingresos y gastos
+
+        La serie termina en el mes de hasta (por defecto el último con datos).
+        Retorna {"meses": [...], "ingresos"/"gastos": {"totales", "media_movil",
+        "variacion", "variacion_relativa"}}; montos en centavos.
+        """
+        series = {campo: self.totales_mensuales(tipo) for campo, tipo in (("ingresos", 1), ("gastos", 2))}
+        # Alinear ambas series sobre los mismos meses
+        todos = [etiquetas for etiquetas, _ in series.values() if len(etiquetas)]
+        if not todos:
+            return {"meses": [], "ingresos": None, "gastos": None}
+        primero = min(etiquetas[0] for etiquetas in todos)
+        if hasta is not None:
+            ultimo = np.datetime64(str(hasta)[:7], "M")
+        else:
+            ultimo = max(etiquetas[-1] for etiquetas in todos)
+        if ultimo < primero:
+            return {"meses": [], "ingresos": None, "gastos": None}
+        eje = np.arange(primero, ultimo + 1)
+
+        resultado = {"meses": [str(mes) for mes in eje[-meses:]]}
+        for campo, (etiquetas, totales) in series.items():
+            alineados = np.zeros(len(eje), dtype=np.int64)
+            dentro = etiquetas <= ultimo
+            alineados[(etiquetas[dentro] - primero).astype(np.int64)] = totales[dentro]
+            # Media y variación sobre toda la serie, para que el primer mes mostrado tenga historia
+            promedio = media_movil(alineados, ventana)
+            diferencia, relativa = variacion(alineados)
+            resultado[campo] = {
+                "totales": alineados[-meses:].tolist(),
+                "media_movil": np.round(promedio[-meses:]).astype(np.int64).tolist(),
+                "variacion": [None if np.isnan(v) else int(v) for v in diferencia[-meses:]],
+                "variacion_relativa": [None if np.isnan(v) else float(v) for v in relativa[-meses:]],
+            }
+        return resultado
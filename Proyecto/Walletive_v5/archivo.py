@@ -0,0 +1,242 @@
+"""
+Archivo por años de los movimientos de Walletive
+Los años cerrados de Movimientos se mueven a un archivo SQLite por año
+(walletive_2023.db, ...) junto a la base principal, que queda solo con los
+años en curso. Las bases de un año se adjuntan con ATTACH DATABASE solo
+cuando una consulta las necesita: el dashboard, el listado y la búsqueda
+trabajan sobre la base principal y los años fríos no entran a la caché.
+
+La tabla Particiones de la base principal registra cada año archivado con
+su primera y última fecha. fuente_movimientos arma a partir de ella una
+consulta UNION ALL que incluye solo las particiones que tocan el rango
+pedido, con el filtro de fechas dentro de cada rama para que cada archivo
+use su índice.
+
+Los totales materializados (resúmenes, balance diario, períodos) siguen
+contando los movimientos archivados: al archivar se borran de la base
+principal sin pasar por los triggers de agregados. El índice de texto sí
+los quita, así que la búsqueda solo encuentra movimientos en caliente.
+Por eso archivar lo pide el usuario (Ajustes o walletive_cli.py archivar)
+y el listado de transacciones muestra desde qué fecha hay movimientos.
+"""
+
+import os
+import re
+from collections import namedtuple
+from datetime import date
+
+from balance_diario import TRIGGERS_BALANCE
+from reportes import TRIGGERS_REPORTES
+from resumenes import TRIGGERS_RESUMENES
+
+
+# Años cerrados que se quedan en la base principal (el anterior sigue recibiendo correcciones)
+ANIOS_EN_CALIENTE = 1
+# SQLite adjunta como máximo 10 bases por conexión (SQLITE_MAX_ATTACHED)
+MAXIMO_ADJUNTAS = 10
+
+COLUMNAS = "id, tipo, descripcion, monto, categoria_id, fecha, metas_id"
+
+ESQUEMA_ARCHIVO = [
+    """
+    CREATE TABLE IF NOT EXISTS Particiones (
+        anio INTEGER PRIMARY KEY,
+        archivo TEXT NOT NULL, -- nombre del archivo, relativo a la carpeta de la base
+        desde TEXT NOT NULL, -- primera y última fecha archivadas
+        hasta TEXT NOT NULL,
+        filas INTEGER NOT NULL DEFAULT 0,
+        archivada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+]
+
+# Esquema de cada archivo anual ({esquema} = alias con que está adjuntado).
+# Sin clave foránea a MetasAhorro: la meta puede borrarse después de archivar
+ESQUEMA_PARTICION = [
+    """
+    CREATE TABLE IF NOT EXISTS {esquema}.Movimientos (
+        id INTEGER PRIMARY KEY,
+        tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)),
+        descripcion TEXT,
+        monto INTEGER NOT NULL, -- centavos
+        categoria_id INTEGER,
+        fecha TIMESTAMP,
+        metas_id INTEGER
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {esquema}.idx_mov_fecha
+    ON Movimientos (fecha)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS {esquema}.idx_mov_tipo_fecha_monto
+    ON Movimientos (tipo, fecha, monto)
+    """,
+]
+
+# Triggers que se suspenden al borrar lo archivado para no descontarlo de los totales
+TRIGGERS_AGREGADOS_BORRADO = ("trg_resumen_mov_delete", "trg_balance_mov_delete", "trg_periodos_mov_delete")
+
+# Alias con que se adjunta el archivo que se está escribiendo
+_ALIAS_DESTINO = "archivo_destino"
+
+Particion = namedtuple("Particion", ["anio", "ruta", "desde", "hasta", "filas"])
+
+
+def crear_archivo(cursor):
+    """Crear el registro de particiones"""
+    for sentencia in ESQUEMA_ARCHIVO:
+        cursor.execute(sentencia)
+
+
+def _sentencias_trigger(nombres):
+    """CREATE TRIGGER de los triggers pedidos, tomados de sus módulos"""
+    sentencias = {}
+    for sentencia in TRIGGERS_RESUMENES + TRIGGERS_BALANCE + TRIGGERS_REPORTES:
+        nombre = re.search(r"CREATE TRIGGER IF NOT EXISTS (\w+)", sentencia).group(1)
+        if nombre in nombres:
+            sentencias[nombre] = sentencia
+    return [sentencias[nombre] for nombre in nombres]
+
+
+def _limites(anio):
+    """[desde, hasta) del año como texto comparable con fecha"""
+    return f"{anio:04d}-01-01", f"{anio + 1:04d}-01-01"
+
+
+class ArchivoMovimientos:
+    """Particiones por año de una base y armado de consultas sobre ellas"""
+
+    def __init__(self, db_path):
+        ruta = os.path.abspath(db_path)
+        self.directorio = os.path.dirname(ruta)
+        self.prefijo = os.path.splitext(os.path.basename(ruta))[0]
+        self._particiones = None
+
+    def nombre_archivo(self, anio):
+        return f"{self.prefijo}_{int(anio)}.db"
+
+    # === Registro ===
+
+    def particiones(self, cursor):
+        """Particiones registradas, ordenadas por año (se leen una vez y quedan en caché)"""
+        if self._particiones is None:
+            cursor.execute("SELECT anio, archivo, desde, hasta, filas FROM Particiones ORDER BY anio")
+            self._particiones = [
+                Particion(anio, os.path.join(self.directorio, archivo), desde, hasta, filas)
+                for anio, archivo, desde, hasta, filas in cursor.fetchall()
+            ]
+        return self._particiones
+
+    def invalidar(self):
+        """Releer el registro en la próxima consulta"""
+        self._particiones = None
+
+    # === Consultas unificadas ===
+
+    def fuente_movimientos(self, cursor, desde=None, hasta=None):
+        """Subconsulta con los movimientos de [desde, hasta] en caliente y archivados
+
+        Retorna (sql, adjuntos): sql va después de FROM y adjuntos
+        ({alias: ruta}) son las particiones a adjuntar, solo las que tocan el
+        rango. Sin particiones la fuente es directamente Movimientos.
+        """
+        desde = str(date.fromisoformat(str(desde)[:10])) if desde else None
+        hasta = str(date.fromisoformat(str(hasta)[:10])) if hasta else None
+        necesarias = [
+            particion for particion in self.particiones(cursor)
+            if (desde is None or particion.hasta[:10] >= desde)
+            and (hasta is None or particion.desde[:10] <= hasta)
+        ]
+        if len(necesarias) > MAXIMO_ADJUNTAS:
+            raise ValueError(f"El rango abarca {len(necesarias)} años archivados "
+                             f"(SQLite adjunta como máximo {MAXIMO_ADJUNTAS})")
+
+        # Las fechas ya están validadas, se pueden escribir en la consulta
+        condiciones = []
+        if desde:
+            condiciones.append(f"fecha >= '{desde}'")
+        if hasta:
+            condiciones.append(f"fecha < date('{hasta}', '+1 day')")
+        if not necesarias and not condiciones:
+            return "Movimientos", {}
+        where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        if not necesarias:
+            return f"(SELECT {COLUMNAS} FROM main.Movimientos{where})", {}
+
+        adjuntos = {f"archivo_{particion.anio}": particion.ruta for particion in necesarias}
+        ramas = [f"SELECT {COLUMNAS} FROM main.Movimientos{where}"]
+        ramas += [f"SELECT {COLUMNAS} FROM {alias}.Movimientos{where}" for alias in adjuntos]
+        return "(" + " UNION ALL ".join(ramas) + ")", adjuntos
+
+    # === Archivado ===
+
+    def anios_para_archivar(self, cursor, hoy=None, en_caliente=ANIOS_EN_CALIENTE):
+        """Años cerrados con movimientos en la base principal que ya se pueden archivar"""
+        hoy = hoy or date.today()
+        limite, _ = _limites(hoy.year - en_caliente)
+        cursor.execute("""
+            SELECT DISTINCT CAST(substr(fecha, 1, 4) AS INTEGER)
+            FROM Movimientos
+            WHERE fecha < ?
+            ORDER BY 1
+        """, (limite,))
+        return [anio for anio, in cursor.fetchall() if anio]
+
+    def archivar_anio(self, conexiones, anio, hoy=None):
+        """Mover los movimientos de un año cerrado a su archivo
+
+        Se hace en dos transacciones porque en modo WAL una transacción que
+        escribe en varias bases no es atómica entre ellas:
+        1. Copiar el año al archivo (INSERT OR REPLACE: reintentar es seguro).
+        2. Borrarlo de la base principal y registrar la partición. Hasta que
+           esta confirma, las consultas unificadas no ven el archivo, así que
+           una caída entre ambas no duplica movimientos.
+        Retorna la cantidad de movimientos movidos.
+        """
+        anio = int(anio)
+        hoy = hoy or date.today()
+        if anio >= hoy.year:
+            raise ValueError(f"El año {anio} todavía no está cerrado")
+        desde, hasta = _limites(anio)
+        archivo = self.nombre_archivo(anio)
+        with conexiones.lectura() as cursor:
+            cursor.execute("SELECT 1 FROM Movimientos WHERE fecha >= ? AND fecha < ? LIMIT 1", (desde, hasta))
+            if cursor.fetchone() is None:
+                return 0
+
+        with conexiones.adjuntar({_ALIAS_DESTINO: os.path.join(self.directorio, archivo)}):
+            with conexiones.transaccion() as cursor:
+                for sentencia in ESQUEMA_PARTICION:
+                    cursor.execute(sentencia.format(esquema=_ALIAS_DESTINO))
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO {_ALIAS_DESTINO}.Movimientos ({COLUMNAS})
+                    SELECT {COLUMNAS} FROM main.Movimientos
+                    WHERE fecha >= ? AND fecha < ?
+                """, (desde, hasta))
+
+            with conexiones.transaccion() as cursor:
+                # Solo se borra lo que efectivamente quedó en el archivo
+                cursor.execute(f"""
+                    SELECT COUNT(*) FROM main.Movimientos m
+                    WHERE m.fecha >= ? AND m.fecha < ?
+                      AND NOT EXISTS (SELECT 1 FROM {_ALIAS_DESTINO}.Movimientos a WHERE a.id = m.id)
+                """, (desde, hasta))
+                if cursor.fetchone()[0]:
+                    raise RuntimeError(f"El archivo de {anio} no tiene todos los movimientos del año")
+
+                for nombre in TRIGGERS_AGREGADOS_BORRADO:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+                cursor.execute("DELETE FROM main.Movimientos WHERE fecha >= ? AND fecha < ?", (desde, hasta))
+                movidos = cursor.rowcount
+                for sentencia in _sentencias_trigger(TRIGGERS_AGREGADOS_BORRADO):
+                    cursor.execute(sentencia)
+
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO Particiones (anio, archivo, desde, hasta, filas)
+                    SELECT ?, ?, MIN(fecha), MAX(fecha), COUNT(*)
+                    FROM {_ALIAS_DESTINO}.Movimientos
+                """, (anio, archivo))
+
+        self.invalidar()
+        return movidos
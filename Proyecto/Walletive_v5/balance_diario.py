@@ -0,0 +1,233 @@
+"""
+Índice de balance diario de Walletive
+BalanceDiario guarda el neto (ingresos - gastos, en centavos) de cada día y
+los triggers lo mantienen al insertar, modificar o borrar movimientos. En
+memoria, IndiceBalance arma un árbol de Fenwick sobre esos netos: el balance
+a una fecha es una suma de prefijo y el flujo entre dos fechas es la
+diferencia de dos prefijos, ambas en O(log días) sin tocar Movimientos.
+
+Cada fila lleva un número de cambio creciente, así el índice en memoria se
+pone al día leyendo solo los días que cambiaron desde la última vez.
+"""
+
+import threading
+from datetime import date
+
+
+ESQUEMA_BALANCE = [
+    """
+    CREATE TABLE IF NOT EXISTS BalanceDiario (
+        dia TEXT PRIMARY KEY, -- YYYY-MM-DD
+        neto INTEGER NOT NULL DEFAULT 0, -- ingresos - gastos del día, en centavos
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        cambio INTEGER NOT NULL DEFAULT 0 -- secuencia del último cambio de la fila
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_balance_cambio
+    ON BalanceDiario (cambio)
+    """,
+]
+
+# Aporte de un movimiento al balance: ingresos suman, gastos restan, metas no cuentan
+_APORTE = "CASE {fila}.tipo WHEN 1 THEN {fila}.monto WHEN 2 THEN -{fila}.monto ELSE 0 END"
+_CUENTA = "({fila}.tipo IN (1, 2))"
+_SIGUIENTE_CAMBIO = "(SELECT IFNULL(MAX(cambio), 0) + 1 FROM BalanceDiario)"
+
+
+def _sumar(fila, signo):
+    """UPDATE que suma (o resta) el movimiento NEW/OLD al día que le corresponde"""
+    return f"""
+        UPDATE BalanceDiario
+           SET neto = neto {signo} {_APORTE.format(fila=fila)},
+               cantidad = cantidad {signo} {_CUENTA.format(fila=fila)},
+               cambio = {_SIGUIENTE_CAMBIO}
+         WHERE dia = date({fila}.fecha);
+    """
+
+
+TRIGGERS_BALANCE = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_balance_mov_insert
+    AFTER INSERT ON Movimientos
+    WHEN NEW.tipo IN (1, 2)
+    BEGIN
+        INSERT OR IGNORE INTO BalanceDiario (dia) VALUES (date(NEW.fecha));
+        {_sumar("NEW", "+")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_balance_mov_delete
+    AFTER DELETE ON Movimientos
+    WHEN OLD.tipo IN (1, 2)
+    BEGIN
+        {_sumar("OLD", "-")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_balance_mov_update
+    AFTER UPDATE OF tipo, monto, fecha ON Movimientos
+    WHEN OLD.tipo IN (1, 2) OR NEW.tipo IN (1, 2)
+    BEGIN
+        {_sumar("OLD", "-")}
+        INSERT OR IGNORE INTO BalanceDiario (dia) VALUES (date(NEW.fecha));
+        {_sumar("NEW", "+")}
+    END;
+    """,
+]
+
+
+def eliminar_balance_diario(cursor):
+    """Eliminar la tabla de balance diario y sus triggers"""
+    for trigger in ("trg_balance_mov_insert", "trg_balance_mov_delete", "trg_balance_mov_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS BalanceDiario")
+
+
+def crear_balance_diario(cursor):
+    """Crear tabla y triggers; retorna True si la tabla es nueva"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'BalanceDiario'")
+    nueva = cursor.fetchone() is None
+
+    for sentencia in ESQUEMA_BALANCE + TRIGGERS_BALANCE:
+        cursor.execute(sentencia)
+
+    if nueva:
+        reconstruir_balance_diario(cursor)
+    return nueva
+
+
+def reconstruir_balance_diario(cursor, fuente="Movimientos"):
+    """Recalcular el neto de cada día a partir de Movimientos (o de otra fuente)"""
+    cursor.execute("SELECT IFNULL(MAX(cambio), 0) + 1 FROM BalanceDiario")
+    cambio = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM BalanceDiario")
+    cursor.execute(f"""
+        INSERT INTO BalanceDiario (dia, neto, cantidad, cambio)
+        SELECT date(fecha), SUM({_APORTE.format(fila="m")}), COUNT(*), ?
+        FROM {fuente} AS m
+        WHERE tipo IN (1, 2) AND date(fecha) IS NOT NULL
+        GROUP BY date(fecha)
+    """, (cambio,))
+
+
+def _ordinal(dia):
+    """Número de día (date.toordinal) de una fecha, date o texto YYYY-MM-DD[...]"""
+    if isinstance(dia, date):
+        return dia.toordinal()
+    return date.fromisoformat(str(dia)[:10]).toordinal()
+
+
+class ArbolFenwick:
+    """Sumas de prefijo con actualización puntual, ambas en O(log n)"""
+
+    def __init__(self, valores):
+        # Construcción en O(n): cada nodo pasa su suma al padre inmediato
+        self.n = len(valores)
+        self.arbol = [0] + list(valores)
+        for i in range(1, self.n + 1):
+            padre = i + (i & -i)
+            if padre <= self.n:
+                self.arbol[padre] += self.arbol[i]
+
+    def sumar(self, posicion, delta):
+        """Sumar delta al valor en posicion (desde 0)"""
+        i = posicion + 1
+        while i <= self.n:
+            self.arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, posicion):
+        """Suma de los valores en [0, posicion]"""
+        i = min(posicion + 1, self.n)
+        total = 0
+        while i > 0:
+            total += self.arbol[i]
+            i -= i & -i
+        return total
+
+
+class IndiceBalance:
+    """Balance acumulado por día en memoria, sincronizado con BalanceDiario
+
+    Las posiciones del árbol son días consecutivos desde el primer día con
+    movimientos, más un margen hacia el futuro para no reconstruir con cada
+    día nuevo.
+    """
+
+    MARGEN_DIAS = 366
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._arbol = None
+        self._netos = []        # neto por posición (para reconstruir al crecer)
+        self._primer_dia = None
+        self._ultimo_cambio = -1
+
+    def actualizar(self, cursor):
+        """Traer de BalanceDiario solo los días que cambiaron desde la última vez"""
+        with self._lock:
+            cursor.execute("SELECT IFNULL(MAX(cambio), 0) FROM BalanceDiario")
+            ultimo = cursor.fetchone()[0]
+            if ultimo == self._ultimo_cambio:
+                return
+            desde = self._ultimo_cambio if self._arbol is not None and ultimo > self._ultimo_cambio else -1
+            cursor.execute("SELECT dia, neto FROM BalanceDiario WHERE cambio > ?", (desde,))
+            cambiadas = cursor.fetchall()
+            cursor.execute("SELECT COUNT(*) FROM BalanceDiario")
+            if len(cambiadas) == cursor.fetchone()[0]:
+                # Primera carga o tabla reconstruida: todas las filas son nuevas
+                self._cargar(cambiadas)
+            else:
+                for dia, neto in cambiadas:
+                    self._fijar(_ordinal(dia), neto)
+            self._ultimo_cambio = ultimo
+
+    def _cargar(self, filas):
+        netos = {_ordinal(dia): neto for dia, neto in filas}
+        if not netos:
+            self._primer_dia = None
+            self._netos = []
+            self._arbol = ArbolFenwick([])
+            return
+        self._primer_dia = min(netos)
+        largo = max(netos) - self._primer_dia + 1 + self.MARGEN_DIAS
+        self._netos = [0] * largo
+        for ordinal, neto in netos.items():
+            self._netos[ordinal - self._primer_dia] = neto
+        self._arbol = ArbolFenwick(self._netos)
+
+    def _fijar(self, ordinal, neto):
+        """Poner el neto de un día, extendiendo el árbol si queda fuera de rango"""
+        if self._primer_dia is None or not 0 <= ordinal - self._primer_dia < len(self._netos):
+            filas = [(date.fromordinal(self._primer_dia + i), n)
+                     for i, n in enumerate(self._netos) if n] if self._primer_dia is not None else []
+            filas.append((date.fromordinal(ordinal), neto))
+            self._cargar(filas)
+            return
+        posicion = ordinal - self._primer_dia
+        delta = neto - self._netos[posicion]
+        if delta:
+            self._netos[posicion] = neto
+            self._arbol.sumar(posicion, delta)
+
+    def balance_al(self, dia):
+        """Balance acumulado (centavos) al final del día indicado"""
+        with self._lock:
+            if self._primer_dia is None:
+                return 0
+            posicion = _ordinal(dia) - self._primer_dia
+            if posicion < 0:
+                return 0
+            return self._arbol.prefijo(posicion)
+
+    def flujo_neto(self, desde, hasta):
+        """Ingresos - gastos (centavos) entre dos fechas, ambas inclusive"""
+        anterior = date.fromordinal(_ordinal(desde) - 1)
+        return self.balance_al(hasta) - self.balance_al(anterior)
+
+    def serie(self, desde, hasta, paso_dias=1):
+        """Lista de (fecha, balance) entre dos fechas cada paso_dias días"""
+        inicio, fin = _ordinal(desde), _ordinal(hasta)
+        return [(date.fromordinal(o), self.balance_al(date.fromordinal(o)))
+                for o in range(inicio, fin + 1, max(1, int(paso_dias)))]
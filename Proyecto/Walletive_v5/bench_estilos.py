@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de estilos de la interfaz de Walletive
+Compara la hoja de estilos única de aplicación (tema.py) contra el esquema
+anterior de un setStyleSheet por widget, construyendo las pantallas reales.
+Uso: python bench_estilos.py [repeticiones]
+"""
+
+import os
+import re
+import sys
+import time
+
+# Sin ventana: se mide solo el costo de estilos y construcción
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from tema import compilar_hoja, aplicar_tema, cambiar_propiedad
+from walletive import Dashboard, DashboardViewModel, EncuestaInicial
+
+
+def _bloques(hoja):
+    """Separar la hoja en pares (selector, cuerpo)"""
+    hoja = re.sub(r"/\*.*?\*/", "", hoja, flags=re.S)
+    return [(sel.strip(), cuerpo) for sel, cuerpo in re.findall(r"([^{}]+)\{([^{}]*)\}", hoja)]
+
+
+def _reglas_de(widget, bloques):
+    """Reglas que antes se aplicaban con setStyleSheet sobre este widget"""
+    nombre = widget.objectName()
+    rol = widget.property("rol")
+    claves = []
+    if nombre:
+        claves.append(f"#{nombre}")
+    if rol:
+        claves.append(f'[rol="{rol}"]')
+    reglas = [f"{sel} {{{cuerpo}}}" for sel, cuerpo in bloques
+              if any(clave in sel for clave in claves)]
+    return "\n".join(reglas)
+
+
+def _construir_pantallas():
+    """Construir el dashboard y la encuesta y forzar el polish de todo"""
+    pantallas = [Dashboard(DashboardViewModel()), EncuestaInicial(lambda *args: None)]
+    for pantalla in pantallas:
+        pantalla.ensurePolished()
+        for hijo in pantalla.findChildren(QWidget):
+            hijo.ensurePolished()
+    return pantallas
+
+
+def _estilo_por_widget(pantallas, bloques):
+    """Esquema anterior: cada widget recibe y parsea su propia hoja"""
+    llamadas = 0
+    for pantalla in pantallas:
+        for widget in [pantalla] + pantalla.findChildren(QWidget):
+            reglas = _reglas_de(widget, bloques)
+            if reglas:
+                widget.setStyleSheet(reglas)
+                widget.ensurePolished()
+                llamadas += 1
+    return llamadas
+
+
+def _medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication(sys.argv)
+    bloques = _bloques(compilar_hoja("oscuro"))
+
+    print("🎨 Benchmark de estilos de Walletive")
+    print("=" * 50)
+
+    # 1. Construcción de pantallas
+    def construir_por_widget():
+        app.setStyleSheet("")
+        pantallas = _construir_pantallas()
+        _estilo_por_widget(pantallas, bloques)
+        for pantalla in pantallas:
+            pantalla.deleteLater()
+        app.processEvents()
+
+    def construir_con_tema():
+        pantallas = _construir_pantallas()
+        for pantalla in pantallas:
+            pantalla.deleteLater()
+        app.processEvents()
+
+    antes = _medir(construir_por_widget, repeticiones)
+    aplicar_tema(app, "oscuro")
+    despues = _medir(construir_con_tema, repeticiones)
+    print(f"🏗️  Construir pantallas:  por widget {antes:8.2f} ms | hoja única {despues:8.2f} ms")
+
+    # 2. Cambio de tema con las pantallas vivas
+    pantallas = _construir_pantallas()
+    bloques_claro = _bloques(compilar_hoja("claro"))
+    estado = {"claro": False}
+
+    def tema_por_widget():
+        estado["claro"] = not estado["claro"]
+        _estilo_por_widget(pantallas, bloques_claro if estado["claro"] else bloques)
+
+    def tema_unico():
+        estado["claro"] = not estado["claro"]
+        aplicar_tema(app, "claro" if estado["claro"] else "oscuro")
+        for pantalla in pantallas:
+            pantalla.ensurePolished()
+
+    app.setStyleSheet("")
+    antes = _medir(tema_por_widget, repeticiones)
+    for pantalla in pantallas:
+        for widget in [pantalla] + pantalla.findChildren(QWidget):
+            widget.setStyleSheet("")
+    despues = _medir(tema_unico, repeticiones)
+    print(f"🌗 Cambiar de tema:      por widget {antes:8.2f} ms | hoja única {despues:8.2f} ms")
+
+    # 3. Cambio de color del balance (positivo/negativo)
+    aplicar_tema(app, "oscuro")
+    balance = pantallas[0].balance_label
+    colores = ["#F44336", "#4CAF50"]
+    estados = ["negativo", "positivo"]
+    contador = {"i": 0}
+
+    def color_por_widget():
+        contador["i"] += 1
+        balance.setStyleSheet(f"color: {colores[contador['i'] % 2]};")
+        balance.ensurePolished()
+
+    def color_por_propiedad():
+        contador["i"] += 1
+        cambiar_propiedad(balance, "estado", estados[contador["i"] % 2])
+
+    antes = _medir(color_por_widget, repeticiones * 50)
+    balance.setStyleSheet("")
+    despues = _medir(color_por_propiedad, repeticiones * 50)
+    print(f"📈 Color del balance:    por widget {antes:8.3f} ms | propiedad  {despues:8.3f} ms")
+
+    print("=" * 50)
+    print(f"✅ {repeticiones} repeticiones por medición")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Búsqueda de texto completo sobre las descripciones de Movimientos
+MovimientosFTS es una tabla FTS5 de contenido externo: no duplica el texto,
+solo guarda el índice invertido, que los triggers mantienen al día. Los
+índices de prefijo permiten buscar mientras se escribe ("pag" encuentra
+"pago") sin recorrer todo el vocabulario.
+"""
+
+import re
+
+
+# Prefijos indexados: con 2 a 4 letras escritas la búsqueda usa el índice directo
+PREFIJOS_INDEXADOS = "2 3 4"
+# Por debajo de este largo una búsqueda por prefijo toca casi todo el índice
+MINIMO_CARACTERES = 2
+
+ESQUEMA_BUSQUEDA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS MovimientosFTS USING fts5(
+        descripcion,
+        content = 'Movimientos',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 1',
+        prefix = '{PREFIJOS_INDEXADOS}'
+    );
+    """,
+]
+
+TRIGGERS_BUSQUEDA = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busqueda_mov_insert
+    AFTER INSERT ON Movimientos
+    BEGIN
+        INSERT INTO MovimientosFTS (rowid, descripcion) VALUES (NEW.id, NEW.descripcion);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busqueda_mov_delete
+    AFTER DELETE ON Movimientos
+    BEGIN
+        INSERT INTO MovimientosFTS (MovimientosFTS, rowid, descripcion)
+        VALUES ('delete', OLD.id, OLD.descripcion);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busqueda_mov_update
+    AFTER UPDATE OF descripcion ON Movimientos
+    BEGIN
+        INSERT INTO MovimientosFTS (MovimientosFTS, rowid, descripcion)
+        VALUES ('delete', OLD.id, OLD.descripcion);
+        INSERT INTO MovimientosFTS (rowid, descripcion) VALUES (NEW.id, NEW.descripcion);
+    END;
+    """,
+]
+
+
+def eliminar_busqueda(cursor):
+    """Eliminar la tabla FTS y sus triggers (para recrearlos en una migración)"""
+    for trigger in ("trg_busqueda_mov_insert", "trg_busqueda_mov_delete", "trg_busqueda_mov_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS MovimientosFTS")
+
+
+def crear_busqueda(cursor):
+    """Crear el índice de texto y sus triggers; retorna True si el índice es nuevo"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'MovimientosFTS'")
+    nueva = cursor.fetchone() is None
+
+    for sentencia in ESQUEMA_BUSQUEDA + TRIGGERS_BUSQUEDA:
+        cursor.execute(sentencia)
+
+    if nueva:
+        # Indexar el historial que ya existe
+        reconstruir_busqueda(cursor)
+    return nueva
+
+
+def reconstruir_busqueda(cursor):
+    """Regenerar el índice de texto completo a partir de Movimientos"""
+    cursor.execute("INSERT INTO MovimientosFTS (MovimientosFTS) VALUES ('rebuild')")
+
+
+def expresion_busqueda(texto):
+    """Convertir lo que escribe el usuario en una consulta FTS5
+
+    Cada palabra se busca como prefijo y todas deben aparecer:
+    "pago lu" -> "pago"* AND "lu"*. Retorna None si no hay nada que buscar.
+    """
+    palabras = [p for p in re.findall(r"\w+", texto or "") if len(p) >= MINIMO_CARACTERES]
+    if not palabras:
+        return None
+    return " AND ".join(f'"{palabra}"*' for palabra in palabras)
+
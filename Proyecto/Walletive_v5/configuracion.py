@@ -0,0 +1,204 @@
+"""
+Configuración de usuario de Walletive
+AlmacenConfiguracion lee la configuración una sola vez y la mantiene en
+memoria como un objeto Configuracion (namedtuple inmutable con tipos fijos),
+así consultar el nombre de usuario no vuelve a abrir ni parsear el archivo.
+
+La configuración vive en walletive_config.json o, con una base de datos, en
+la tabla Configuracion (clave -> valor en JSON), para que el arranque lea un
+solo archivo. Si la tabla todavía no existe o está vacía se usa el JSON.
+
+El JSON se escribe de forma atómica (archivo temporal + os.replace): un
+corte a mitad de la escritura deja el archivo anterior entero. Los cambios
+hechos por otro programa se toman con recargar(), que la interfaz llama desde
+un QFileSystemWatcher en lugar de releer el archivo en cada acceso.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+
+# Campo -> (tipo, valor por defecto)
+CAMPOS = {
+    "nombre_usuario": (str, None),
+    "configurado": (bool, False),
+    "fecha_configuracion": (str, None),
+}
+
+Configuracion = namedtuple("Configuracion", list(CAMPOS), defaults=[defecto for _, defecto in CAMPOS.values()])
+
+ESQUEMA_CONFIGURACION = [
+    """
+    CREATE TABLE IF NOT EXISTS Configuracion (
+        clave TEXT PRIMARY KEY,
+        valor TEXT NOT NULL -- JSON
+    ) WITHOUT ROWID;
+    """,
+]
+
+
+def crear_configuracion(cursor):
+    """Crear la tabla de configuración"""
+    for sentencia in ESQUEMA_CONFIGURACION:
+        cursor.execute(sentencia)
+
+
+def tipar(datos):
+    """Configuracion a partir de un diccionario: convierte cada campo a su tipo
+
+    Los valores que no se pueden convertir quedan con el valor por defecto y
+    las claves desconocidas se ignoran.
+    """
+    valores = {}
+    for campo, (tipo, defecto) in CAMPOS.items():
+        valor = datos.get(campo, defecto)
+        if tipo is bool and isinstance(valor, str):
+            # Un JSON editado a mano puede traer "false": bool("false") sería True
+            valor = valor.strip().lower() in ("1", "true", "si", "sí")
+        elif valor is not None and not isinstance(valor, tipo):
+            try:
+                valor = tipo(valor)
+            except (TypeError, ValueError):
+                valor = defecto
+        valores[campo] = valor
+    return Configuracion(**valores)
+
+
+class AlmacenConfiguracion:
+    """Configuración en memoria con escritura atómica en JSON o en la base"""
+
+    def __init__(self, ruta, conexiones=None):
+        self.ruta = os.path.abspath(ruta)
+        # Con un ConnectionManager la configuración se guarda en la tabla Configuracion
+        self.conexiones = conexiones
+        self._lock = threading.Lock()
+        self._actual = None
+        self._existe = False
+        self._extra = {}  # claves del JSON que no son campos (se conservan al escribir)
+        self._firma = None  # (mtime, tamaño) del JSON leído o escrito por última vez
+
+    # === Lectura ===
+
+    @property
+    def actual(self):
+        """Configuración vigente (se carga en el primer acceso)"""
+        with self._lock:
+            if self._actual is None:
+                self._cargar()
+            return self._actual
+
+    @property
+    def existe(self):
+        """True si hay una configuración guardada"""
+        self.actual
+        return self._existe
+
+    def _cargar(self):
+        datos = self._leer_base() if self.conexiones is not None else None
+        if datos is None:
+            datos = self._leer_json()
+        self._existe = datos is not None
+        datos = datos or {}
+        self._extra = {clave: valor for clave, valor in datos.items() if clave not in CAMPOS}
+        self._actual = tipar(datos)
+
+    def _firma_archivo(self):
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return None
+        return (estado.st_mtime_ns, estado.st_size)
+
+    def _leer_json(self):
+        self._firma = self._firma_archivo()
+        if self._firma is None:
+            return None
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            return datos if isinstance(datos, dict) else None
+        except (OSError, ValueError) as e:
+            print(f"❌ Error al cargar configuración: {e}")
+            return None
+
+    def _leer_base(self):
+        """Configuración de la tabla, o None si la tabla no existe o está vacía"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Configuracion'")
+                if cursor.fetchone() is None:
+                    return None
+                cursor.execute("SELECT clave, valor FROM Configuracion")
+                filas = cursor.fetchall()
+        except Exception as e:
+            print(f"❌ Error al leer configuración de la base: {e}")
+            return None
+        return {clave: json.loads(valor) for clave, valor in filas} or None
+
+    def recargar(self):
+        """Releer el JSON si cambió desde la última lectura o escritura propia
+
+        Retorna True si la configuración vigente cambió.
+        """
+        with self._lock:
+            if self.conexiones is not None or self._firma_archivo() == self._firma:
+                return False
+            anterior = self._actual
+            datos = self._leer_json()
+            if datos is None and self._firma is not None:
+                # Archivo a medio escribir por otro programa: esperar al próximo aviso
+                self._firma = None
+                return False
+            self._existe = datos is not None
+            datos = datos or {}
+            self._extra = {clave: valor for clave, valor in datos.items() if clave not in CAMPOS}
+            self._actual = tipar(datos)
+            return self._actual != anterior
+
+    # === Escritura ===
+
+    def guardar(self, **cambios):
+        """Actualizar campos y persistir; retorna la nueva Configuracion"""
+        desconocidos = set(cambios) - set(CAMPOS)
+        if desconocidos:
+            raise ValueError(f"Campos de configuración desconocidos: {', '.join(sorted(desconocidos))}")
+        with self._lock:
+            if self._actual is None:
+                self._cargar()
+            nueva = tipar({**self._actual._asdict(), **cambios})
+            if self.conexiones is not None:
+                self._escribir_base(nueva)
+            else:
+                self._escribir_json({**self._extra, **nueva._asdict()})
+            self._actual = nueva
+            self._existe = True
+            return nueva
+
+    def _escribir_json(self, datos):
+        """Escribir en un temporal de la misma carpeta y reemplazar de una vez"""
+        carpeta = os.path.dirname(self.ruta)
+        descriptor, temporal = tempfile.mkstemp(dir=carpeta, prefix=".config_", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                json.dump(datos, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.ruta)
+        except BaseException:
+            try:
+                os.remove(temporal)
+            except FileNotFoundError:
+                pass
+            raise
+        # La escritura propia no cuenta como cambio externo
+        self._firma = self._firma_archivo()
+
+    def _escribir_base(self, configuracion):
+        with self.conexiones.transaccion() as cursor:
+            cursor.executemany(
+                "INSERT OR REPLACE INTO Configuracion (clave, valor) VALUES (?, ?)",
+                [(campo, json.dumps(valor, ensure_ascii=False)) for campo, valor in configuracion._asdict().items()],
+            )
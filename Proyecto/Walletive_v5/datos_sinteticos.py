@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos de Walletive
+Arma bases de prueba del tamaño que haga falta (10k, 1M, 10M movimientos o
+cualquier cantidad) repartidas en varios años, con un historial creíble:
+sueldo, arriendo y servicios todos los meses (con su regla en Recurrencias),
+gastos del día a día con montos log-normales por categoría, ingresos
+esporádicos y metas de ahorro con aportes mensuales hasta lograrse o vencer.
+
+El ritmo de gasto de una cuenta (un hogar) es fijo: MOVIMIENTOS_POR_DIA
+movimientos variables por día y los fijos de cada mes. Los volúmenes
+grandes se alcanzan con más cuentas en la misma base, cada una con su
+sueldo y sus fijos, y las metas crecen con la cantidad de cuentas: la
+relación entre ingresos, gastos y aportes es la misma con 10k que con 10M
+movimientos.
+
+Todo sale de un random.Random con semilla: la misma semilla, cantidad y
+fecha final (--hasta) producen exactamente la misma base.
+
+La carga va en lotes con executemany, una transacción por lote, con
+synchronous=OFF y una caché grande mientras dura. Los índices de Movimientos
+y sus triggers de inserción (resúmenes, balance diario, períodos, índice de
+texto) se quitan durante la carga y se recrean al final: construir un índice
+ordenando todo de una vez y recalcular los agregados con un GROUP BY es
+mucho más rápido que mantenerlos fila por fila.
+
+Uso:
+    python datos_sinteticos.py <ruta.db> [--movimientos 1m] [--anios 3] [--metas 6] [--semilla 42] [--hasta AAAA-MM-DD]
+"""
+
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from busqueda import reconstruir_busqueda
+from balance_diario import reconstruir_balance_diario
+from recurrencias import insertar_recurrencia, ocurrencia
+from reportes import reconstruir_periodos
+from resumenes import reconstruir_resumenes
+
+
+# Tamaños de referencia para las pruebas de rendimiento
+TAMANOS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+FILAS_POR_LOTE = 50_000
+
+# PRAGMAs del escritor mientras dura la carga (se restauran al terminar)
+PRAGMAS_CARGA = {
+    "synchronous": "OFF",
+    "cache_size": -256000,  # ~256 MB
+    "temp_store": "MEMORY",
+}
+
+# Movimientos variables por día de cada cuenta
+MOVIMIENTOS_POR_DIA = 3
+
+# Movimientos fijos de cada mes: (tipo, descripción, monto en pesos, categoría, día del mes).
+# Con los variables, una cuenta gasta en promedio ~82% de lo que gana
+FIJOS_MENSUALES = [
+    (1, "Salario mensual", 5_800_000, None, 1),
+    (2, "Arriendo", 1_300_000, 1, 5),
+    (2, "Servicios públicos", 260_000, 1, 12),
+    (2, "Internet y telefonía", 120_000, 1, 15),
+    (2, "Seguro de salud", 180_000, 1, 20),
+]
+
+# Movimientos del día a día: (tipo, categoría, descripción, comercios, mediana en pesos, dispersión, peso)
+VARIABLES = [
+    (2, 2, "Mercado", ["Éxito", "Carulla", "D1", "Ara", "Olímpica", "Jumbo"], 85_000, 0.6, 18),
+    (2, 2, "Transporte", ["TransMilenio", "Uber", "Taxi", "DiDi", "Gasolina Terpel"], 12_000, 0.7, 22),
+    (2, 2, "Restaurante", ["Crepes & Waffles", "El Corral", "Wok", "Frisby", "Corrientazo"], 38_000, 0.5, 14),
+    (2, 2, "Café", ["Juan Valdez", "Tostao", "Oma", "Starbucks"], 9_000, 0.4, 16),
+    (2, 2, "Domicilio", ["Rappi", "iFood", "Domicilios.com"], 42_000, 0.5, 8),
+    (2, 3, "Ropa", ["Zara", "Arturo Calle", "Falabella", "Koaj"], 160_000, 0.6, 3),
+    (2, 3, "Regalo", ["Falabella", "Panamericana", "Amazon"], 90_000, 0.7, 2),
+    (2, 3, "Entretenimiento", ["Cine Colombia", "Spotify", "Netflix", "Concierto"], 45_000, 0.6, 5),
+    (2, 4, "Farmacia", ["Cruz Verde", "Farmatodo", "Drogas La Rebaja"], 35_000, 0.8, 4),
+    (2, 4, "Reparación", ["Taller", "Cerrajería", "Servicio técnico"], 220_000, 0.8, 1),
+    (1, None, "Freelance", ["Cliente", "Proyecto", "Consultoría"], 900_000, 0.6, 2),
+    (1, None, "Reembolso", ["Banco", "Tienda", "Aseguradora"], 60_000, 0.7, 1),
+]
+
+# Los fijos y los aportes se registran a primera hora
+HORA_FIJOS = 6 * 3600
+
+METAS = ["Vacaciones", "Fondo de emergencia", "Carro", "Cuota inicial vivienda", "Estudios",
+         "Computador nuevo", "Matrimonio", "Viaje a Europa"]
+
+
+def _centavos(pesos):
+    """Redondear a centenas de pesos y pasar a centavos"""
+    return int(round(pesos, -2)) * 100
+
+
+def _fecha_hora(dia, segundos):
+    return f"{dia} {segundos // 3600:02d}:{segundos // 60 % 60:02d}:{segundos % 60:02d}"
+
+
+def _cantidad(texto):
+    """'1m', '10k', '250000' -> entero"""
+    texto = str(texto).strip().lower()
+    if texto in TAMANOS:
+        return TAMANOS[texto]
+    multiplicador = {"k": 1_000, "m": 1_000_000}.get(texto[-1:], 1)
+    return int(float(texto.rstrip("km")) * multiplicador)
+
+
+class GeneradorDatos:
+    """Historial sintético reproducible de movimientos, metas y reglas recurrentes"""
+
+    def __init__(self, movimientos, anios=3, metas=6, semilla=42, hasta=None):
+        self.total = int(movimientos)
+        self.hasta = hasta or date.today()
+        self.desde = self.hasta.replace(year=self.hasta.year - anios) + timedelta(days=1)
+        self.cantidad_metas = metas
+        self.rng = random.Random(semilla)
+        self._pesos = list(itertools.accumulate(peso for *_, peso in VARIABLES))
+        self.dias = (self.hasta - self.desde).days + 1
+        # Cuentas necesarias para llegar a la cantidad pedida a ritmo de una cuenta
+        por_cuenta = MOVIMIENTOS_POR_DIA * self.dias + len(FIJOS_MENSUALES) * self.dias * 12 // 365
+        self.cuentas = max(1, round(self.total / por_cuenta))
+        # Escala de los montos variables para compensar el redondeo de cuentas
+        self._escala = 1.0
+
+    # === Fijos y metas ===
+
+    def _meses(self, dia_del_mes):
+        """Primera fecha con ese día del mes dentro del rango"""
+        inicio = self.desde.replace(day=dia_del_mes)
+        return inicio if inicio >= self.desde else ocurrencia(inicio, "mensual", 1)
+
+    def reglas_fijas(self):
+        """[(tipo, descripción, centavos, categoría, inicio, metas_id)] de los fijos mensuales de cada cuenta"""
+        return [(tipo, descripcion + (f" (cuenta {cuenta})" if self.cuentas > 1 else ""), _centavos(monto),
+                 categoria, self._meses(dia), None)
+                for cuenta in range(1, self.cuentas + 1)
+                for tipo, descripcion, monto, categoria, dia in FIJOS_MENSUALES]
+
+    def metas(self):
+        """Metas a crear: (descripción, objetivo en centavos, inicio, límite, aporte mensual en centavos)
+
+        Los objetivos se multiplican por la cantidad de cuentas: las metas
+        son de todo el presupuesto de la base.
+        """
+        dias = (self.hasta - self.desde).days
+        metas = []
+        for numero in range(self.cantidad_metas):
+            descripcion = METAS[numero % len(METAS)] + (f" {numero // len(METAS) + 1}" if numero >= len(METAS) else "")
+            meses = self.rng.randint(6, 36)
+            objetivo = _centavos(self.rng.choice((2, 3, 5, 8, 12, 20, 40)) * 1_000_000 * self.cuentas)
+            inicio = self.desde + timedelta(days=self.rng.randint(0, max(dias - 60, 0)))
+            inicio = inicio.replace(day=min(inicio.day, 28))
+            limite = ocurrencia(inicio, "mensual", meses)
+            # Algunas metas van atrasadas: el aporte no siempre alcanza
+            aporte = _centavos(objetivo / 100 / meses * self.rng.uniform(0.8, 1.15))
+            metas.append((descripcion, objetivo, inicio, limite, aporte))
+        return metas
+
+    def ocurrencias(self, inicio, monto, tope=None):
+        """Fechas de una regla mensual dentro del rango (hasta juntar tope, si se da)"""
+        fechas = []
+        numero = 0
+        while True:
+            dia = ocurrencia(inicio, "mensual", numero)
+            if dia > self.hasta or (tope is not None and monto * len(fechas) >= tope):
+                return fechas
+            fechas.append(dia)
+            numero += 1
+
+    # === Movimientos ===
+
+    def _variable(self, dia):
+        tipo, categoria, descripcion, comercios, mediana, dispersion, _ = VARIABLES[
+            _buscar(self._pesos, self.rng.random() * self._pesos[-1])]
+        monto = max(_centavos(self.rng.lognormvariate(math.log(mediana), dispersion) * self._escala), 10_000)
+        segundos = self.rng.randint(HORA_FIJOS, 23 * 3600)
+        return segundos, (tipo, f"{descripcion} {self.rng.choice(comercios)}", monto, categoria, None)
+
+    def movimientos(self, fijos):
+        """Movimientos en orden cronológico: (tipo, descripción, monto, categoría, fecha, metas_id)
+
+        fijos es {día: [(tipo, descripción, monto, categoría, metas_id)]}; el
+        resto de la cantidad pedida se reparte entre los días del rango. Si
+        son más o menos que MOVIMIENTOS_POR_DIA por cuenta, los montos se
+        escalan para que el gasto diario de cada cuenta sea el mismo.
+        """
+        cantidad_fijos = sum(len(lista) for lista in fijos.values())
+        variables = self.total - cantidad_fijos
+        if variables < 0:
+            raise ValueError(f"{self.total} movimientos no alcanzan para los {cantidad_fijos} fijos del período")
+        dias = self.dias
+        if variables:
+            self._escala = MOVIMIENTOS_POR_DIA * self.cuentas * dias / variables
+        for numero in range(dias):
+            dia = self.desde + timedelta(days=numero)
+            # Reparto exacto: la suma de todos los días da justo `variables`
+            del_dia = (numero + 1) * variables // dias - numero * variables // dias
+            filas = [self._variable(dia) for _ in range(del_dia)]
+            filas.extend((HORA_FIJOS, fila) for fila in fijos.get(dia, ()))
+            for segundos, (tipo, descripcion, monto, categoria, metas_id) in sorted(filas, key=lambda par: par[0]):
+                yield tipo, descripcion, monto, categoria, _fecha_hora(dia, segundos), metas_id
+
+
+def _buscar(acumulados, valor):
+    """Índice del primer acumulado mayor que valor (búsqueda binaria)"""
+    bajo, alto = 0, len(acumulados) - 1
+    while bajo < alto:
+        medio = (bajo + alto) // 2
+        if acumulados[medio] > valor:
+            alto = medio
+        else:
+            bajo = medio + 1
+    return bajo
+
+
+# === Carga ===
+
+def _quitar_indices_y_triggers(cursor):
+    """Quitar índices y triggers de inserción de Movimientos; retorna su SQL para recrearlos"""
+    cursor.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = 'Movimientos' AND sql IS NOT NULL
+          AND (type = 'index' OR (type = 'trigger' AND sql LIKE '%AFTER INSERT ON Movimientos%'))
+    """)
+    objetos = cursor.fetchall()
+    for tipo, nombre, _ in objetos:
+        cursor.execute(f"DROP {'INDEX' if tipo == 'index' else 'TRIGGER'} IF EXISTS {nombre}")
+    return [sql for _, _, sql in objetos]
+
+
+def generar(conexiones, movimientos, anios=3, metas=6, semilla=42, hasta=None,
+            filas_por_lote=FILAS_POR_LOTE, progreso=None):
+    """Cargar un historial sintético en una base con el esquema al día y sin movimientos
+
+    progreso(filas, total) se llama después de cada lote. Retorna la
+    cantidad de movimientos insertados. Si la carga falla, los índices y
+    triggers se recrean igual, pero lo cargado queda sin agregados: la base
+    se descarta (main la borra).
+    """
+    generador = GeneradorDatos(movimientos, anios, metas, semilla, hasta)
+    with conexiones.lectura(instantanea=False) as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Movimientos")
+        if cursor.fetchone()[0]:
+            raise ValueError("La base ya tiene movimientos: el generador necesita una base nueva")
+
+    conn = conexiones.escritor()
+    anteriores = {nombre: conn.execute(f"PRAGMA {nombre}").fetchone()[0] for nombre in PRAGMAS_CARGA}
+    for nombre, valor in PRAGMAS_CARGA.items():
+        conn.execute(f"PRAGMA {nombre} = {valor}")
+    recrear = []
+    try:
+        # === Metas y reglas recurrentes (pocas filas, con sus triggers) ===
+        fijos = defaultdict(list)
+        with conexiones.transaccion() as cursor:
+            reglas = [regla + (None,) for regla in generador.reglas_fijas()]
+            for descripcion, objetivo, inicio, limite, aporte in generador.metas():
+                fechas = generador.ocurrencias(inicio, aporte, tope=objetivo)
+                fechas = [dia for dia in fechas if dia <= limite]
+                lograda = aporte * len(fechas) >= objetivo
+                activa = not lograda and limite > generador.hasta
+                cursor.execute("""
+                    INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro,
+                                             fecha_inicio, fecha_limite)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (descripcion, objetivo, 0 if activa else 1, 1 if lograda else 0,
+                      f"{inicio} 00:00:00", f"{limite} 00:00:00"))
+                meta_id = cursor.lastrowid
+                cursor.execute("INSERT INTO FrecuenciaMeta (id, frecuencia) VALUES (?, 'mensual')", (meta_id,))
+                for dia in fechas:
+                    fijos[dia].append((3, f"Aporte: {descripcion}", aporte, 5, meta_id))
+                if activa:
+                    reglas.append((3, f"Aporte: {descripcion}", aporte, 5, inicio, meta_id, limite))
+
+            # Cada regla queda con sus ocurrencias pasadas ya materializadas
+            for tipo, descripcion, monto, categoria, inicio, meta_id, fin in reglas:
+                fechas = generador.ocurrencias(inicio, monto)
+                if meta_id is None:
+                    for dia in fechas:
+                        fijos[dia].append((tipo, descripcion, monto, categoria, None))
+                regla = insertar_recurrencia(cursor, tipo, descripcion, monto, "mensual", inicio,
+                                             categoria, meta_id, fin)
+                proxima = ocurrencia(inicio, "mensual", len(fechas))
+                cursor.execute("UPDATE Recurrencias SET ocurrencias = ?, proxima = ? WHERE id = ?",
+                               (len(fechas), str(proxima) if fin is None or proxima <= fin else None, regla.id))
+
+        # === Movimientos por lotes, sin índices ni triggers ===
+        with conexiones.transaccion() as cursor:
+            recrear = _quitar_indices_y_triggers(cursor)
+        insertados = 0
+        lote = []
+        for fila in generador.movimientos(fijos):
+            lote.append(fila)
+            if len(lote) >= filas_por_lote:
+                insertados += _insertar(conexiones, lote)
+                lote = []
+                if progreso:
+                    progreso(insertados, generador.total)
+        if lote:
+            insertados += _insertar(conexiones, lote)
+            if progreso:
+                progreso(insertados, generador.total)
+
+        # === Índices, triggers y agregados ===
+        with conexiones.transaccion() as cursor:
+            for sql in recrear:
+                cursor.execute(sql)
+            reconstruir_resumenes(cursor)
+            reconstruir_balance_diario(cursor)
+            reconstruir_periodos(cursor)
+            reconstruir_busqueda(cursor)
+            # El historial cargado no debe disparar alertas al abrir la aplicación
+            cursor.execute("UPDATE EstadoAlertas SET ultimo_movimiento = (SELECT IFNULL(MAX(id), 0) FROM Movimientos)")
+        recrear = []
+        conn.execute("ANALYZE")
+        return insertados
+    finally:
+        try:
+            # Una carga interrumpida no deja la base sin índices ni triggers
+            if recrear:
+                with conexiones.transaccion() as cursor:
+                    for sql in recrear:
+                        cursor.execute(sql)
+        finally:
+            for nombre, valor in anteriores.items():
+                conn.execute(f"PRAGMA {nombre} = {valor}")
+
+
+def _insertar(conexiones, lote):
+    with conexiones.transaccion() as cursor:
+        cursor.executemany("""
+            INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha, metas_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, lote)
+    return len(lote)
+
+
+def main(argv=None):
+    """Crear una base sintética desde la terminal"""
+    from db_connection import ConnectionManager
+    from migraciones import aplicar_migraciones
+
+    parser = argparse.ArgumentParser(prog="datos_sinteticos.py", description="Base de prueba con datos sintéticos")
+    parser.add_argument("ruta", help="base a crear (no debe existir)")
+    parser.add_argument("--movimientos", type=_cantidad, default="10k",
+                        help=f"cantidad de movimientos ({', '.join(TAMANOS)} o un número; por defecto 10k)")
+    parser.add_argument("--anios", type=int, default=3)
+    parser.add_argument("--metas", type=int, default=6)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--hasta", type=date.fromisoformat, help="última fecha (por defecto, hoy)")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.ruta):
+        print(f"❌ {args.ruta} ya existe: el generador crea bases nuevas")
+        return 1
+
+    # Sin WAL durante la carga: el diario en memoria evita escribir cada página dos veces.
+    # La aplicación pasa la base a WAL la primera vez que la abre
+    conexiones = ConnectionManager(args.ruta, modo_wal=False)
+    terminada = False
+    try:
+        conexiones.escritor().execute("PRAGMA journal_mode = MEMORY")
+        aplicar_migraciones(conexiones, verbose=False)
+        print(f"🔄 Generando {args.movimientos:,} movimientos en {args.anios} años (semilla {args.semilla})...")
+        inicio = time.perf_counter()
+
+        def progreso(filas, total):
+            sys.stdout.write(f"\r📦 {filas:,}/{total:,} movimientos")
+            sys.stdout.flush()
+        insertados = generar(conexiones, args.movimientos, args.anios, args.metas, args.semilla, args.hasta,
+                             progreso=progreso)
+        segundos = time.perf_counter() - inicio
+        print(f"\n✅ {insertados:,} movimientos en {segundos:,.1f} s ({insertados / segundos:,.0f} por segundo)")
+        terminada = True
+        return 0
+    except Exception as e:
+        print(f"\n❌ Error al generar datos: {e}")
+        return 1
+    finally:
+        conexiones.cerrar()
+        # Una base a medio cargar no sirve para medir: no dejarla (tampoco con Ctrl+C)
+        if not terminada and os.path.exists(args.ruta):
+            os.remove(args.ruta)
+            print(f"🗑️ {args.ruta} eliminada")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Gestor de conexiones SQLite para Walletive
+Mantiene una conexión de escritura persistente y un pool pequeño de conexiones
+de solo lectura, configuradas una única vez al crearse.
+
+En modo WAL las lecturas trabajan sobre una instantánea y nunca bloquean al
+escritor; un checkpoint administrado evita que el archivo -wal crezca sin límite.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import queue
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# PRAGMAs aplicados a cada conexión al momento de abrirla
+PRAGMAS_BASE = {
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,      # milisegundos esperando un bloqueo antes de fallar
+    "cache_size": -8000,       # ~8 MB de caché de páginas por conexión
+    "temp_store": "MEMORY",
+}
+
+# PRAGMAs adicionales del escritor cuando se usa journaling WAL
+PRAGMAS_WAL = {
+    "synchronous": "NORMAL",            # en WAL es seguro ante caídas de la aplicación
+    "wal_autocheckpoint": 1000,         # checkpoint automático cada ~1000 páginas
+    "journal_size_limit": 64 * 1024 * 1024,  # truncar el -wal a 64 MB tras un checkpoint
+}
+
+# Tamaño del -wal a partir del cual se fuerza un checkpoint TRUNCATE
+UMBRAL_WAL_BYTES = 32 * 1024 * 1024
+# Segundos sin escrituras para considerar la base inactiva
+SEGUNDOS_INACTIVIDAD = 5
+# Segundos esperando un lector libre cuando el pool está agotado
+ESPERA_LECTOR = 30
+
+
+class ConsultaCancelada(Exception):
+    """Una lectura fue interrumpida a pedido (por ejemplo, una búsqueda obsoleta)"""
+
+
+def _adjuntar(conn, adjuntos, solo_lectura=False):
+    """ATTACH de cada {alias: ruta}; retorna los alias adjuntados
+
+    Con solo_lectura=True la base se abre con mode=ro (la conexión debe usar
+    URIs): un archivo que no existe da error en lugar de crearse vacío.
+    """
+    adjuntados = []
+    try:
+        for alias, ruta in adjuntos.items():
+            if solo_lectura:
+                ruta = f"{Path(os.path.abspath(ruta)).as_uri()}?mode=ro"
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (str(ruta),))
+            adjuntados.append(alias)
+    except BaseException:
+        _separar(conn, adjuntados)
+        raise
+    return adjuntados
+
+
+def _separar(conn, alias):
+    """DETACH de las bases adjuntadas (ignorando las que ya no estén)"""
+    for nombre in alias:
+        try:
+            conn.execute(f"DETACH DATABASE {nombre}")
+        except sqlite3.Error:
+            pass
+
+
+class ConnectionManager:
+    def __init__(self, db_path, pool_size=3, pragmas=None, modo_wal=True,
+                 umbral_wal=UMBRAL_WAL_BYTES, segundos_inactividad=SEGUNDOS_INACTIVIDAD,
+                 espera_lector=ESPERA_LECTOR):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.pragmas = dict(PRAGMAS_BASE)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.modo_wal = modo_wal and not self._en_memoria()
+        self.umbral_wal = umbral_wal
+        self.segundos_inactividad = segundos_inactividad
+        self.espera_lector = espera_lector
+        self.pragmas_wal = dict(PRAGMAS_WAL)
+
+        # Estado del checkpoint administrado
+        self._ultima_escritura = None
+        self._escrituras_pendientes = False
+
+        self._escritor = None
+        self._lock_escritor = threading.RLock()
+        self._lectores = queue.LifoQueue(maxsize=pool_size)
+        self._lectores_creados = 0
+        self._lectores_en_uso = 0
+        self._lectores_activos = {}  # id de hilo -> lector que está usando
+        self._lock_pool = threading.Lock()
+        self._profundidad = 0
+        self._hilo_transaccion = None
+        self._cerrado = False
+
+    # === Creación de conexiones ===
+
+    def _aplicar_pragmas(self, conn, extra=None):
+        """Aplicar los PRAGMAs configurados a una conexión recién creada"""
+        pragmas = dict(self.pragmas)
+        if extra:
+            pragmas.update(extra)
+        for nombre, valor in pragmas.items():
+            conn.execute(f"PRAGMA {nombre} = {valor};")
+
+    def _en_memoria(self):
+        """Las bases en memoria no se pueden compartir entre conexiones"""
+        return self.db_path == ":memory:" or self.db_path.startswith("file::memory:")
+
+    def _abrir_escritor(self):
+        """Abrir la conexión de escritura (autocommit, transacciones explícitas)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        if self.modo_wal:
+            # journal_mode es persistente en el archivo, pero se reafirma al abrir
+            modo = conn.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+            if modo.lower() != "wal":
+                print(f"⚠️ No se pudo activar WAL, se usará journal_mode={modo}")
+                self.modo_wal = False
+        extra = self.pragmas_wal if self.modo_wal else None
+        self._aplicar_pragmas(conn, extra)
+        return conn
+
+    def _abrir_lector(self):
+        """Abrir una conexión de solo lectura para el pool"""
+        uri = Path(os.path.abspath(self.db_path)).as_uri()
+        conn = sqlite3.connect(
+            f"{uri}?mode=ro",
+            uri=True,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._aplicar_pragmas(conn, {"query_only": "ON"})
+        return conn
+
+    def escritor(self):
+        """Obtener (creando si hace falta) la conexión de escritura"""
+        if self._cerrado:
+            raise sqlite3.ProgrammingError("El gestor de conexiones está cerrado")
+        with self._lock_escritor:
+            if self._escritor is None:
+                self._escritor = self._abrir_escritor()
+            return self._escritor
+
+    # === Transacciones y lecturas ===
+
+    @contextmanager
+    def transaccion(self):
+        """Ejecutar un bloque dentro de una transacción de escritura
+
+        Las transacciones anidadas se implementan con SAVEPOINT, de modo que
+        un error interno solo revierte su propio bloque.
+        """
+        with self._lock_escritor:
+            conn = self.escritor()
+            nivel = self._profundidad
+            if nivel == 0:
+                conn.execute("BEGIN IMMEDIATE")
+                self._hilo_transaccion = threading.get_ident()
+            else:
+                conn.execute(f"SAVEPOINT sp_{nivel}")
+            self._profundidad += 1
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                if nivel == 0:
+                    conn.execute("ROLLBACK")
+                else:
+                    conn.execute(f"ROLLBACK TO sp_{nivel}")
+                    conn.execute(f"RELEASE sp_{nivel}")
+                raise
+            else:
+                if nivel == 0:
+                    conn.execute("COMMIT")
+                    self._ultima_escritura = time.monotonic()
+                    self._escrituras_pendientes = True
+                else:
+                    conn.execute(f"RELEASE sp_{nivel}")
+            finally:
+                self._profundidad -= 1
+                if self._profundidad == 0:
+                    self._hilo_transaccion = None
+                cursor.close()
+
+            if nivel == 0:
+                self._checkpoint_por_tamano()
+
+    @contextmanager
+    def adjuntar(self, adjuntos):
+        """Adjuntar bases (ATTACH) al escritor mientras dura el bloque
+
+        SQLite no permite ATTACH dentro de una transacción, así que el bloque
+        debe envolver a transaccion() y no al revés.
+        """
+        with self._lock_escritor:
+            if self._profundidad > 0:
+                raise sqlite3.OperationalError("No se puede adjuntar una base dentro de una transacción")
+            conn = self.escritor()
+            adjuntados = _adjuntar(conn, adjuntos)
+            try:
+                yield
+            finally:
+                _separar(conn, adjuntados)
+
+    def _tomar_lector(self):
+        """Tomar un lector libre del pool, creando uno nuevo si hay cupo"""
+        try:
+            return self._lectores.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock_pool:
+            if self._lectores_creados < self.pool_size:
+                self._lectores_creados += 1
+                try:
+                    return self._abrir_lector()
+                except Exception:
+                    self._lectores_creados -= 1
+                    raise
+        # Pool agotado: esperar a que otro hilo devuelva un lector
+        try:
+            return self._lectores.get(timeout=self.espera_lector)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No hay lectores libres: los {self.pool_size} del pool siguen tomados después de "
+                f"{self.espera_lector} s (¿una lectura anidada dentro de otra en el mismo hilo?)"
+            ) from None
+
+    @contextmanager
+    def lectura(self, instantanea=True, adjuntos=None):
+        """Ejecutar consultas con una conexión de solo lectura del pool
+
+        Con instantanea=True todas las consultas del bloque ven la misma
+        versión de la base (una transacción de lectura), aunque el escritor
+        confirme cambios mientras tanto. adjuntos ({alias: ruta}) se adjuntan
+        en solo lectura durante el bloque y se separan al terminar, para que
+        no queden ocupando la caché de páginas del lector.
+        """
+        if self._cerrado:
+            raise sqlite3.ProgrammingError("El gestor de conexiones está cerrado")
+
+        # En memoria o dentro de una transacción propia, leer con el escritor
+        # para ver los mismos datos que se están escribiendo
+        if self._en_memoria() or self._hilo_transaccion == threading.get_ident():
+            if adjuntos:
+                raise sqlite3.OperationalError("No se puede adjuntar una base dentro de una transacción")
+            with self._lock_escritor:
+                cursor = self.escritor().cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+            return
+
+        self.escritor()  # Garantiza que el archivo exista antes de abrirlo en modo ro
+        conn = self._tomar_lector()
+        hilo = threading.get_ident()
+        with self._lock_pool:
+            self._lectores_en_uso += 1
+            self._lectores_activos[hilo] = conn
+        cursor = conn.cursor()
+        adjuntados = []
+        try:
+            if adjuntos:
+                adjuntados = _adjuntar(conn, adjuntos, solo_lectura=True)
+            if instantanea:
+                conn.execute("BEGIN")
+            yield cursor
+        except sqlite3.OperationalError as e:
+            if str(e) == "interrupted":
+                raise ConsultaCancelada("Lectura interrumpida") from e
+            raise
+        finally:
+            cursor.close()
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            _separar(conn, adjuntados)
+            with self._lock_pool:
+                self._lectores_en_uso -= 1
+                self._lectores_activos.pop(hilo, None)
+                # Con el gestor ya cerrado el lector no vuelve al pool: se cierra aquí
+                if self._cerrado:
+                    conn.close()
+                else:
+                    self._lectores.put(conn)
+
+    def interrumpir(self, hilo):
+        """Interrumpir la lectura que está haciendo un hilo (si usa un lector del pool)
+
+        La consulta en curso falla con ConsultaCancelada. Retorna True si había
+        una lectura que interrumpir.
+        """
+        with self._lock_pool:
+            conn = self._lectores_activos.get(hilo)
+            if conn is None:
+                return False
+            conn.interrupt()
+            return True
+
+    # === Checkpoints del WAL ===
+
+    def tamano_wal(self):
+        """Tamaño actual del archivo -wal en bytes (0 si no existe)"""
+        try:
+            return os.path.getsize(f"{self.db_path}-wal")
+        except OSError:
+            return 0
+
+    def checkpoint(self, modo="PASSIVE"):
+        """Ejecutar un checkpoint del WAL
+
+        PASSIVE no espera a los lectores; RESTART y TRUNCATE esperan a que
+        terminen y reinician (o vacían) el archivo -wal.
+        Retorna (ocupado, paginas_wal, paginas_copiadas).
+        """
+        if not self.modo_wal:
+            return (0, 0, 0)
+        modo = modo.upper()
+        if modo not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Modo de checkpoint inválido: {modo}")
+        with self._lock_escritor:
+            if self._profundidad > 0:
+                return (1, -1, -1)
+            resultado = self.escritor().execute(f"PRAGMA wal_checkpoint({modo});").fetchone()
+            if resultado[0] == 0:
+                self._escrituras_pendientes = False
+            return tuple(resultado)
+
+    def _modo_checkpoint_seguro(self):
+        """TRUNCATE solo si no hay lectores activos; si no, PASSIVE para no esperar"""
+        return "TRUNCATE" if self._lectores_en_uso == 0 else "PASSIVE"
+
+    def _checkpoint_por_tamano(self):
+        """Forzar un checkpoint si el -wal supera el umbral"""
+        if self.modo_wal and self.umbral_wal and self.tamano_wal() > self.umbral_wal:
+            self.checkpoint(self._modo_checkpoint_seguro())
+
+    def checkpoint_si_inactivo(self):
+        """Hacer checkpoint si hubo escrituras y la base lleva un rato inactiva
+
+        Pensado para llamarse periódicamente (por ejemplo desde un QTimer).
+        Retorna True si se ejecutó un checkpoint.
+        """
+        if not self.modo_wal or not self._escrituras_pendientes:
+            return False
+        if time.monotonic() - self._ultima_escritura < self.segundos_inactividad:
+            return False
+        self.checkpoint(self._modo_checkpoint_seguro())
+        return True
+
+    # === Compactación ===
+
+    def vacuum(self):
+        """Reescribir la base sin páginas libres y actualizar las estadísticas
+
+        VACUUM no puede correr dentro de una transacción. Retorna los bytes
+        recuperados en el archivo principal.
+        """
+        with self._lock_escritor:
+            if self._profundidad > 0:
+                raise sqlite3.OperationalError("No se puede compactar dentro de una transacción")
+            conn = self.escritor()
+            antes = os.path.getsize(self.db_path) if not self._en_memoria() else 0
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
+        # Con WAL la base reescrita queda en el -wal hasta el checkpoint
+        self.checkpoint("TRUNCATE")
+        despues = os.path.getsize(self.db_path) if not self._en_memoria() else 0
+        return antes - despues
+
+    # === Cierre ===
+
+    def cerrar(self):
+        """Cerrar todas las conexiones abiertas
+
+        Los lectores que otros hilos tienen tomados no se cierran desde aquí
+        (cerrar una conexión en medio de una consulta de otro hilo hace caer
+        el proceso): su lectura en curso se interrumpe y el hilo dueño lo
+        cierra al soltarlo, en lugar de devolverlo al pool.
+        """
+        with self._lock_pool:
+            self._cerrado = True
+            for conn in self._lectores_activos.values():
+                conn.interrupt()
+            while True:
+                try:
+                    self._lectores.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._lectores_creados = 0
+        with self._lock_escritor:
+            if self._escritor is not None:
+                if self.modo_wal:
+                    try:
+                        self._escritor.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+                    except sqlite3.Error:
+                        pass
+                self._escritor.close()
+                self._escritor = None
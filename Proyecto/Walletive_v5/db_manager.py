@@ -0,0 +1,712 @@
+"""
+Acceso a datos de Walletive
+DatabaseManager reúne las operaciones sobre la base (resúmenes, reportes,
+importación, respaldos, archivo por años, configuración) sin depender de
+PyQt5: la ventana lo usa desde el hilo de datos (DatabaseWorker) y la
+interfaz de línea de comandos (walletive_cli.py) lo usa directamente.
+"""
+
+import importlib.util
+import os
+import threading
+from datetime import datetime, timedelta
+
+from perfil_arranque import PERFIL
+from db_connection import ConnectionManager, ConsultaCancelada
+from dinero import a_centavos, desde_centavos
+from exportacion import exportar
+from importador import ImportadorMovimientos
+from migraciones import aplicar_migraciones, VERSION_ESQUEMA
+from recurrencias import ProgramadorRecurrencias, frecuencia_meta, insertar_recurrencia
+from respaldo import (
+    DIRECTORIO_RESPALDOS, HORAS_ENTRE_RESPALDOS, aplicar_retencion, listar_respaldos, prefijo_base, respaldar
+)
+from resumenes import leer_resumen, reconstruir_resumenes, verificar_resumenes
+from alertas import MotorAlertas
+from archivo import ArchivoMovimientos
+from balance_diario import IndiceBalance, reconstruir_balance_diario
+from configuracion import AlmacenConfiguracion
+from reportes import PERIODOS, reconstruir_periodos, reporte_categorias, reporte_periodos, verificar_periodos
+from vencimientos import leer_metas
+from transacciones import FiltroMovimientos, NOMBRES_TIPO, consultar_pagina, contar_movimientos
+
+
+class DatabaseManager:
+    def __init__(self, db_path="walletive.db", modo_wal=True, inicializar=True, config_en_base=False):
+        self.db_path = db_path
+        self.config_path = "walletive_config.json"
+        # En modo WAL los reportes leen una instantánea y no bloquean las inserciones
+        self.conexiones = ConnectionManager(db_path, modo_wal=modo_wal)
+        # Configuración en memoria; con config_en_base se guarda en la tabla Configuracion
+        self.configuracion = AlmacenConfiguracion(
+            self.config_path, self.conexiones if config_en_base else None
+        )
+        # Balance acumulado por día en memoria (se carga en la primera consulta)
+        self.indice_balance = IndiceBalance()
+        # Columnas de Movimientos en arreglos de NumPy para los reportes (opcional).
+        # NumPy se importa recién en el primer reporte o proyección, fuera del arranque
+        self.numpy_disponible = importlib.util.find_spec("numpy") is not None
+        self._analisis = None
+        self._lock_analisis = threading.Lock()
+        self.motor_alertas = MotorAlertas()
+        # Reglas recurrentes en un min-heap por próxima fecha (se cargan en la primera pasada)
+        self.recurrencias = ProgramadorRecurrencias()
+        # Años cerrados en archivos aparte, adjuntados solo cuando se consultan
+        self.archivo = ArchivoMovimientos(db_path)
+        self.respaldos_path = os.path.join(os.path.dirname(os.path.abspath(db_path)), DIRECTORIO_RESPALDOS)
+        # Con inicializar=False el esquema se crea después (p. ej. desde el hilo de datos)
+        if inicializar:
+            self.init_database()
+    
+    def init_database(self):
+        """Crear o actualizar el esquema de la base de datos mediante migraciones"""
+        try:
+            with PERFIL.fase("init_database"):
+                aplicadas = aplicar_migraciones(self.conexiones)
+            if aplicadas:
+                print(f"✅ Esquema actualizado a la versión {VERSION_ESQUEMA}")
+            print("✅ Base de datos inicializada correctamente")
+            
+        except Exception as e:
+            print(f"❌ Error al inicializar la base de datos: {e}")
+    
+    def importar_movimientos(self, ruta, formato=None, progreso=None, **opciones):
+        """Importar un extracto bancario (CSV, OFX o QIF) en lotes"""
+        try:
+            importador = ImportadorMovimientos(self.conexiones)
+            return importador.importar(ruta, formato=formato, progreso=progreso, **opciones)
+        except Exception as e:
+            print(f"❌ Error al importar {ruta}: {e}")
+            return None
+    
+    def mantenimiento_wal(self):
+        """Hacer checkpoint del WAL si la base está inactiva"""
+        try:
+            return self.conexiones.checkpoint_si_inactivo()
+        except Exception as e:
+            print(f"❌ Error en checkpoint del WAL: {e}")
+            return False
+    
+    def vacuum(self):
+        """Compactar la base (VACUUM + PRAGMA optimize); retorna los bytes recuperados o None"""
+        try:
+            return self.conexiones.vacuum()
+        except Exception as e:
+            print(f"❌ Error al compactar la base de datos: {e}")
+            return None
+    
+    def respaldar(self, progreso=None):
+        """Respaldo en línea comprimido; después se borran los que la retención no conserva
+        
+        Es una lectura: se puede enviar como Consulta y las escrituras no esperan.
+        Retorna la ruta del respaldo o None si falla.
+        """
+        try:
+            ruta = respaldar(self.conexiones, self.respaldos_path, progreso=progreso)
+            print(f"💾 Respaldo creado: {ruta}")
+            borrados = aplicar_retencion(self.respaldos_path, prefijo_base(self.db_path))
+            if borrados:
+                print(f"🗑️ {len(borrados)} respaldos viejos eliminados")
+            return ruta
+        except Exception as e:
+            print(f"❌ Error al respaldar la base de datos: {e}")
+            return None
+    
+    def respaldar_si_corresponde(self):
+        """Respaldar si el último respaldo tiene más de HORAS_ENTRE_RESPALDOS"""
+        respaldos = self.listar_respaldos()
+        if respaldos and datetime.now() - respaldos[0].fecha < timedelta(hours=HORAS_ENTRE_RESPALDOS):
+            return None
+        return self.respaldar()
+    
+    def listar_respaldos(self):
+        """Respaldos disponibles, los más recientes primero: [Respaldo(fecha, ruta)]"""
+        return listar_respaldos(self.respaldos_path, prefijo_base(self.db_path))
+    
+    def cerrar(self):
+        """Cerrar las conexiones persistentes a la base de datos"""
+        self.conexiones.cerrar()
+    
+    @property
+    def analisis(self):
+        """AnalisisMovimientos (importa NumPy la primera vez); None sin NumPy"""
+        if not self.numpy_disponible:
+            return None
+        with self._lock_analisis:
+            if self._analisis is None:
+                from analisis import AnalisisMovimientos
+                self._analisis = AnalisisMovimientos()
+            return self._analisis
+    
+    def guardar_configuracion(self, nombre_usuario):
+        """Guardar configuración del usuario (escritura atómica)"""
+        try:
+            self.configuracion.guardar(
+                nombre_usuario=nombre_usuario,
+                configurado=True,
+                fecha_configuracion=datetime.now().isoformat()
+            )
+            print(f"✅ Configuración guardada: {nombre_usuario}")
+        except Exception as e:
+            print(f"❌ Error al guardar configuración: {e}")
+    
+    def cargar_configuracion(self):
+        """Configuración del usuario como diccionario (None si no hay), desde memoria"""
+        if not self.configuracion.existe:
+            return None
+        return self.configuracion.actual._asdict()
+    
+    def guardar_datos_encuesta(self, nombre_usuario, respuestas):
+        """Guardar los datos de la encuesta en las tablas correspondientes
+        
+        Los montos llegan como Decimal (o números) y se guardan en centavos.
+        """
+        try:
+            # Primero guardar la configuración
+            self.guardar_configuracion(nombre_usuario)
+            
+            # Extraer datos de las respuestas
+            ingreso_mensual = respuestas[0]
+            gastos_fijos = respuestas[1] 
+            gastos_variables = respuestas[2]
+            tiene_deudas = respuestas[3]
+            monto_deudas = respuestas[4] if respuestas[4] else 0
+            pago_mensual_deudas = respuestas[5] if respuestas[5] else 0
+            tiene_meta_ahorro = respuestas[6]
+            monto_meta_ahorro = respuestas[7] if respuestas[7] else 0
+            meses_meta_ahorro = respuestas[8] if respuestas[8] else 0
+            
+            print(f"🔄 Guardando datos para {nombre_usuario}...")
+            print(f"   - Ingreso mensual: ${ingreso_mensual:,.2f}")
+            print(f"   - Gastos fijos: ${gastos_fijos:,.2f}")
+            print(f"   - Gastos variables: ${gastos_variables:,.2f}")
+            
+            with self.conexiones.transaccion() as cursor:
+                # Crear movimiento de ingreso mensual
+                cursor.execute("""
+                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
+                    VALUES (1, 'Ingreso mensual inicial', ?, NULL)
+                """, (a_centavos(ingreso_mensual),))
+                print("✅ Ingreso mensual guardado")
+                
+                # Crear movimiento de gastos fijos
+                cursor.execute("""
+                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
+                    VALUES (2, 'Gastos fijos mensuales', ?, 1)
+                """, (a_centavos(gastos_fijos),))
+                print("✅ Gastos fijos guardados")
+                
+                # Crear movimiento de gastos variables
+                cursor.execute("""
+                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
+                    VALUES (2, 'Gastos variables mensuales', ?, 2)
+                """, (a_centavos(gastos_variables),))
+                print("✅ Gastos variables guardados")
+                
+                # Los presupuestos los fija el usuario (fijar_presupuesto): tomarlos de
+                # la encuesta haría que sus propios movimientos los consuman al 100%
+                
+                # Si tiene deudas, crear movimientos
+                if tiene_deudas == "Sí":
+                    cursor.execute("""
+                        INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
+                        VALUES (2, 'Deudas totales', ?, 4)
+                    """, (a_centavos(monto_deudas),))
+                
+                    cursor.execute("""
+                        INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
+                        VALUES (2, 'Pago mensual de deudas', ?, 4)
+                    """, (a_centavos(pago_mensual_deudas),))
+                    print(f"✅ Deudas guardadas: ${monto_deudas:,.2f}")
+                
+                # Lo mensual de la encuesta se registra solo desde el próximo mes
+                proximo_mes = (datetime.now().date().replace(day=1) + timedelta(days=32)).replace(day=1)
+                recurrentes = [(1, "Ingreso mensual", ingreso_mensual, None),
+                               (2, "Gastos fijos mensuales", gastos_fijos, 1)]
+                if tiene_deudas == "Sí":
+                    recurrentes.append((2, "Pago mensual de deudas", pago_mensual_deudas, 4))
+                for tipo, descripcion, monto, categoria_id in recurrentes:
+                    if monto and a_centavos(monto) > 0:
+                        insertar_recurrencia(cursor, tipo, descripcion, a_centavos(monto), "mensual",
+                                             proximo_mes, categoria_id)
+                
+                # Si tiene meta de ahorro, crear meta y movimiento
+                if tiene_meta_ahorro == "Sí":
+                    # Calcular fecha límite
+                    fecha_limite = datetime.now() + timedelta(days=30 * meses_meta_ahorro)
+                
+                    # Crear meta de ahorro
+                    cursor.execute("""
+                        INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro, fecha_limite)
+                        VALUES (?, ?, 0, 0, ?)
+                    """, ("Meta de ahorro principal", a_centavos(monto_meta_ahorro), fecha_limite))
+                
+                    meta_id = cursor.lastrowid
+                
+                    # Crear frecuencia de meta (asumiendo mensual)
+                    cursor.execute("""
+                        INSERT INTO FrecuenciaMeta (id, frecuencia)
+                        VALUES (?, 'mensual')
+                    """, (meta_id,))
+                
+                    # Los movimientos de meta son aportes: se programa la cuota mensual
+                    # en lugar de registrar el objetivo como si ya estuviera ahorrado
+                    if meses_meta_ahorro and a_centavos(monto_meta_ahorro) > 0:
+                        cuota = a_centavos(monto_meta_ahorro) // int(meses_meta_ahorro)
+                        insertar_recurrencia(cursor, 3, "Aporte: Meta de ahorro principal", cuota, "mensual",
+                                             proximo_mes, 5, meta_id, fecha_limite)
+                
+                    print(f"✅ Meta de ahorro guardada: ${monto_meta_ahorro:,.2f} en {meses_meta_ahorro} meses")
+            
+            print("✅ Todos los datos de encuesta guardados correctamente")
+            # Las reglas de la encuesta se escribieron directo en la tabla
+            self.recurrencias.cargado = False
+            
+            # Verificar que se guardaron los datos
+            self.verificar_datos_guardados()
+            
+        except Exception as e:
+            print(f"❌ Error al guardar encuesta: {e}")
+    
+    def verificar_datos_guardados(self):
+        """Verificar qué datos se han guardado en la base de datos"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                # Contar movimientos
+                cursor.execute("SELECT COUNT(*) FROM Movimientos")
+                count_movimientos = cursor.fetchone()[0]
+                
+                # Contar metas
+                cursor.execute("SELECT COUNT(*) FROM MetasAhorro")
+                count_metas = cursor.fetchone()[0]
+                
+                # Mostrar solo los movimientos más recientes (el historial puede ser enorme)
+                movimientos = consultar_pagina(cursor, limite=20)
+            
+            print(f"\n📊 VERIFICACIÓN DE DATOS:")
+            print(f"   - Movimientos guardados: {count_movimientos}")
+            print(f"   - Metas guardadas: {count_metas}")
+            print(f"   - Últimos movimientos:")
+            for _, _, tipo, descripcion, _, monto in movimientos:
+                print(f"     * {NOMBRES_TIPO[tipo]}: {descripcion} - ${desde_centavos(monto):,.2f}")
+            
+        except Exception as e:
+            print(f"❌ Error al verificar datos: {e}")
+    
+    def obtener_pagina_movimientos(self, filtro=None, orden="fecha", descendente=True,
+                                   despues=None, incluir=False, limite=200):
+        """Leer una página del listado de movimientos (paginación por clave)
+        
+        Retorna None si la lectura falla, para distinguirlo de una página vacía.
+        """
+        try:
+            with self.conexiones.lectura() as cursor:
+                return consultar_pagina(cursor, filtro, orden, descendente, despues, incluir, limite)
+        except ConsultaCancelada:
+            raise
+        except Exception as e:
+            print(f"❌ Error al leer movimientos: {e}")
+            return None
+    
+    def contar_movimientos(self, filtro=None):
+        """Contar los movimientos que cumplen un filtro"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                return contar_movimientos(cursor, filtro)
+        except ConsultaCancelada:
+            raise
+        except Exception as e:
+            print(f"❌ Error al contar movimientos: {e}")
+            return None
+    
+    def buscar_movimientos(self, texto, filtro=None, limite=50):
+        """Movimientos cuya descripción coincide con el texto, los más relevantes primero"""
+        filtro = (filtro or FiltroMovimientos())._replace(texto=texto)
+        return self.obtener_pagina_movimientos(filtro, orden="relevancia", limite=limite)
+    
+    def usuario_existe(self):
+        """Verificar si ya existe un usuario registrado"""
+        return self.configuracion.actual.configurado
+    
+    def obtener_nombre_usuario(self):
+        """Obtener el nombre del usuario"""
+        return self.configuracion.actual.nombre_usuario or "Usuario"
+    
+    def obtener_resumen_financiero(self):
+        """Obtener resumen financiero del usuario"""
+        try:
+            # Lectura por clave primaria de los totales materializados
+            with self.conexiones.lectura() as cursor:
+                resumen = leer_resumen(cursor)
+            
+            # Los totales se guardan en centavos; hacia la interfaz van como Decimal
+            return {clave: desde_centavos(valor) for clave, valor in resumen.items()}
+            
+        except Exception as e:
+            print(f"❌ Error al obtener resumen: {e}")
+            return {"ingresos": 0, "gastos": 0, "metas": 0, "balance": 0}
+    
+    def balance_al(self, fecha):
+        """Balance (ingresos - gastos) acumulado al final de una fecha"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                self.indice_balance.actualizar(cursor)
+            return desde_centavos(self.indice_balance.balance_al(fecha))
+        except Exception as e:
+            print(f"❌ Error al calcular balance al {fecha}: {e}")
+            return None
+    
+    def flujo_neto(self, desde, hasta):
+        """Ingresos - gastos entre dos fechas (ambas inclusive)"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                self.indice_balance.actualizar(cursor)
+            return desde_centavos(self.indice_balance.flujo_neto(desde, hasta))
+        except Exception as e:
+            print(f"❌ Error al calcular flujo neto: {e}")
+            return None
+    
+    def serie_balance(self, desde, hasta, paso_dias=1):
+        """Balance acumulado entre dos fechas, para graficar: [(fecha, Decimal)]"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                self.indice_balance.actualizar(cursor)
+            return [(dia, desde_centavos(valor))
+                    for dia, valor in self.indice_balance.serie(desde, hasta, paso_dias)]
+        except Exception as e:
+            print(f"❌ Error al calcular serie de balance: {e}")
+            return []
+    
+    def obtener_reporte(self, periodo="mes", desde=None, hasta=None, categoria_id=None):
+        """Ingresos, gastos, metas y balance por período (dia, semana, mes o anio)"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                filas = reporte_periodos(cursor, periodo, desde, hasta, categoria_id)
+            return [{clave: valor if clave in ("inicio", "cantidad") else desde_centavos(valor)
+                     for clave, valor in fila.items()} for fila in filas]
+        except Exception as e:
+            print(f"❌ Error al generar reporte: {e}")
+            return []
+    
+    def obtener_totales_por_categoria(self, tipo=2, desde=None, hasta=None):
+        """Total por categoría de un tipo (gastos por defecto): [(categoria_id, Decimal, cantidad)]"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                filas = reporte_categorias(cursor, tipo, "mes", desde, hasta)
+            return [(categoria, desde_centavos(total), cantidad) for categoria, total, cantidad in filas]
+        except Exception as e:
+            print(f"❌ Error al totalizar por categoría: {e}")
+            return []
+    
+    def obtener_tendencias(self, meses=12, ventana=3, hasta=None):
+        """Tendencias mensuales, participación por categoría y percentiles de gastos
+        
+        Retorna None si NumPy no está instalado o si el cálculo falla.
+        """
+        analisis = self.analisis
+        if analisis is None:
+            return None
+        try:
+            fuente, adjuntos = self._fuente_historial()
+            with self.conexiones.lectura(adjuntos=adjuntos) as cursor:
+                analisis.actualizar(cursor, fuente)
+            tendencias = analisis.tendencias(meses, ventana, hasta)
+            for campo in ("ingresos", "gastos"):
+                serie = tendencias[campo]
+                if serie is None:
+                    continue
+                for clave in ("totales", "media_movil", "variacion"):
+                    serie[clave] = [desde_centavos(valor) for valor in serie[clave]]
+            desde = tendencias["meses"][0] + "-01" if tendencias["meses"] else None
+            tendencias["categorias"] = {
+                categoria: (desde_centavos(total), fraccion)
+                for categoria, (total, fraccion) in analisis.participacion_categorias(2, desde, hasta).items()
+            }
+            tendencias["percentiles"] = {
+                cuantil: desde_centavos(valor)
+                for cuantil, valor in analisis.percentiles(2, desde=desde, hasta=hasta).items()
+            }
+            return tendencias
+        except Exception as e:
+            print(f"❌ Error al calcular tendencias: {e}")
+            return None
+    
+    def proyectar_metas(self):
+        """Probabilidad de cumplir cada meta activa (simulación de Monte Carlo)
+        
+        Retorna None si NumPy no está instalado.
+        """
+        if not self.numpy_disponible:
+            return None
+        try:
+            from proyeccion import proyectar_metas
+            fuente, adjuntos = self._fuente_historial()
+            with self.conexiones.lectura(adjuntos=adjuntos) as cursor:
+                proyecciones = proyectar_metas(cursor, fuente=fuente)
+            return [proyeccion._replace(
+                objetivo=desde_centavos(proyeccion.objetivo),
+                mediana_final=desde_centavos(proyeccion.mediana_final),
+                pesimista_final=desde_centavos(proyeccion.pesimista_final),
+            ) for proyeccion in proyecciones]
+        except Exception as e:
+            print(f"❌ Error al proyectar metas: {e}")
+            return []
+    
+    def obtener_metas(self):
+        """Metas de ahorro con lo aportado hasta hoy (incluye los años archivados)
+        
+        Retorna [(id, descripcion, objetivo, aportado, fecha_limite, activa, lograda)].
+        """
+        try:
+            fuente, adjuntos = self._fuente_historial()
+            with self.conexiones.lectura(adjuntos=adjuntos) as cursor:
+                cursor.execute(f"""
+                    SELECT m.id, m.descripcion, m.monto_objetivo, IFNULL(a.aportado, 0),
+                           m.fecha_limite, m.estado_actual = 0, m.estado_logro = 1
+                    FROM MetasAhorro m
+                    LEFT JOIN (
+                        SELECT metas_id, SUM(monto) AS aportado
+                        FROM {fuente}
+                        WHERE tipo = 3 AND metas_id IS NOT NULL
+                          AND id NOT IN (SELECT movimiento_id FROM main.ObjetivosEncuesta)
+                        GROUP BY metas_id
+                    ) a ON a.metas_id = m.id
+                    ORDER BY m.estado_actual, m.estado_logro, m.fecha_limite
+                """)
+                filas = cursor.fetchall()
+            return [(meta_id, descripcion, desde_centavos(objetivo), desde_centavos(aportado),
+                     fecha_limite, bool(activa), bool(lograda))
+                    for meta_id, descripcion, objetivo, aportado, fecha_limite, activa, lograda in filas]
+        except Exception as e:
+            print(f"❌ Error al obtener metas: {e}")
+            return []
+    
+    def evaluar_alertas(self):
+        """Evaluar las reglas de alerta contra los movimientos nuevos"""
+        try:
+            with self.conexiones.transaccion() as cursor:
+                nuevas = self.motor_alertas.evaluar(cursor)
+            if nuevas:
+                print(f"🔔 {nuevas} alertas nuevas")
+            return nuevas
+        except Exception as e:
+            print(f"❌ Error al evaluar alertas: {e}")
+            return None
+    
+    def obtener_alertas(self, limite=5):
+        """Alertas vigentes para el panel: [(nivel, mensaje)]"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                return self.motor_alertas.leer(cursor, limite)
+        except Exception as e:
+            print(f"❌ Error al leer alertas: {e}")
+            return None
+    
+    def fijar_presupuesto(self, categoria_id, limite_mensual):
+        """Fijar (o quitar, con limite_mensual vacío) el presupuesto mensual de una categoría"""
+        try:
+            with self.conexiones.transaccion() as cursor:
+                if limite_mensual:
+                    cursor.execute("""
+                        INSERT OR REPLACE INTO Presupuestos (categoria_id, limite_mensual)
+                        VALUES (?, ?)
+                    """, (categoria_id or 0, a_centavos(limite_mensual)))
+                else:
+                    cursor.execute("DELETE FROM Presupuestos WHERE categoria_id = ?", (categoria_id or 0,))
+            return True
+        except Exception as e:
+            print(f"❌ Error al fijar presupuesto: {e}")
+            return False
+    
+    def crear_recurrencia(self, tipo, descripcion, monto, frecuencia, inicio=None,
+                          categoria_id=None, metas_id=None, hasta=None):
+        """Guardar una regla recurrente; retorna su id o None si falla"""
+        try:
+            with self.conexiones.transaccion() as cursor:
+                regla = insertar_recurrencia(cursor, tipo, descripcion, a_centavos(monto), frecuencia,
+                                             inicio or datetime.now().date(), categoria_id, metas_id, hasta)
+            if self.recurrencias.cargado:
+                self.recurrencias.programar(regla)
+            return regla.id
+        except Exception as e:
+            print(f"❌ Error al crear recurrencia: {e}")
+            return None
+    
+    def programar_aportes_meta(self, meta_id, monto, inicio=None):
+        """Aporte recurrente a una meta con la frecuencia de FrecuenciaMeta, hasta su fecha límite"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                frecuencia = frecuencia_meta(cursor, meta_id)
+                cursor.execute("SELECT descripcion, fecha_limite FROM MetasAhorro WHERE id = ?", (meta_id,))
+                descripcion, fecha_limite = cursor.fetchone()
+        except Exception as e:
+            print(f"❌ Error al leer la meta {meta_id}: {e}")
+            return None
+        return self.crear_recurrencia(3, f"Aporte: {descripcion}", monto, frecuencia, inicio,
+                                      categoria_id=5, metas_id=meta_id, hasta=fecha_limite)
+    
+    def desactivar_recurrencia(self, recurrencia_id):
+        """Dejar de generar movimientos de una regla"""
+        try:
+            with self.conexiones.transaccion() as cursor:
+                cursor.execute("UPDATE Recurrencias SET activa = 0 WHERE id = ?", (recurrencia_id,))
+            self.recurrencias.quitar(recurrencia_id)
+            return True
+        except Exception as e:
+            print(f"❌ Error al desactivar recurrencia: {e}")
+            return False
+    
+    def materializar_recurrencias(self, hoy=None):
+        """Crear los movimientos recurrentes vencidos; retorna cuántos se crearon
+        
+        Si el heap dice que nada vence hoy, no se abre ninguna transacción.
+        """
+        hoy = hoy or datetime.now().date()
+        try:
+            if not self.recurrencias.cargado:
+                with self.conexiones.lectura(instantanea=False) as cursor:
+                    self.recurrencias.cargar(cursor)
+            if not self.recurrencias.hay_vencidas(hoy):
+                return 0
+            with self.conexiones.transaccion() as cursor:
+                creados = self.recurrencias.materializar(cursor, hoy)
+            if creados:
+                print(f"🔁 {creados} movimientos recurrentes registrados")
+            return creados
+        except Exception as e:
+            # El heap pudo quedar adelantado respecto de la tabla: releerlo
+            self.recurrencias.cargado = False
+            print(f"❌ Error al registrar movimientos recurrentes: {e}")
+            return 0
+    
+    def leer_cambios_metas(self, desde_cambio=None):
+        """Metas para los avisos de vencimiento: todas o solo las cambiadas desde un número de cambio"""
+        try:
+            with self.conexiones.lectura() as cursor:
+                return leer_metas(cursor, desde_cambio)
+        except Exception as e:
+            print(f"❌ Error al leer metas para avisos: {e}")
+            return None
+    
+    def _fuente_historial(self, desde=None, hasta=None):
+        """Fuente de movimientos (en caliente y archivados) y bases a adjuntar"""
+        with self.conexiones.lectura(instantanea=False) as cursor:
+            return self.archivo.fuente_movimientos(cursor, desde, hasta)
+    
+    def obtener_historial(self, desde=None, hasta=None, tipo=None):
+        """Movimientos de un rango incluyendo los años archivados
+        
+        Solo se adjuntan los archivos de los años que tocan el rango.
+        Retorna [(id, fecha, tipo, descripcion, categoria_id, Decimal)] por fecha.
+        """
+        try:
+            return list(self.iterar_historial(desde, hasta, tipo))
+        except Exception as e:
+            print(f"❌ Error al leer el historial: {e}")
+            return []
+    
+    def iterar_historial(self, desde=None, hasta=None, tipo=None, tamano_lote=5000):
+        """Como obtener_historial, pero entregando las filas de a lotes
+        
+        La memoria no depende del tamaño del rango. El lector queda tomado
+        hasta agotar el generador; los errores se propagan al que itera.
+        """
+        fuente, adjuntos = self._fuente_historial(desde, hasta)
+        condicion, parametros = ("WHERE tipo = ?", (tipo,)) if tipo else ("", ())
+        with self.conexiones.lectura(adjuntos=adjuntos) as cursor:
+            cursor.execute(f"""
+                SELECT id, fecha, tipo, descripcion, categoria_id, monto
+                FROM {fuente}
+                {condicion}
+                ORDER BY fecha, id
+            """, parametros)
+            while True:
+                filas = cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                for fila in filas:
+                    yield fila[:5] + (desde_centavos(fila[5]),)
+    
+    def exportar(self, destinos, formato=None, desde=None, hasta=None, progreso=None):
+        """Exportar tablas ({tabla: ruta}) a CSV, JSON Lines o Parquet, de a lotes
+        
+        Movimientos incluye los años archivados de [desde, hasta].
+        Retorna {tabla: filas exportadas} o None si falla.
+        """
+        try:
+            return exportar(self.conexiones, destinos, formato, self._fuente_historial(desde, hasta),
+                            progreso=progreso)
+        except BrokenPipeError:
+            # El lector de la salida se fue (p. ej. "| head"): lo decide quien llama
+            raise
+        except Exception as e:
+            print(f"❌ Error al exportar: {e}")
+            return None
+    
+    def estado_archivo(self, hoy=None):
+        """Años archivados y años cerrados que todavía se pueden archivar
+        
+        Retorna (particiones, pendientes) o None si la lectura falla. El
+        listado y la búsqueda solo muestran lo posterior a la última partición.
+        """
+        try:
+            with self.conexiones.lectura() as cursor:
+                return (list(self.archivo.particiones(cursor)),
+                        self.archivo.anios_para_archivar(cursor, hoy))
+        except Exception as e:
+            print(f"❌ Error al leer el archivo de movimientos: {e}")
+            return None
+        
+    def archivar_anios_cerrados(self, hoy=None):
+        """Mover a sus archivos los años cerrados que siguen en la base principal
+        
+        Lo pide el usuario (Ajustes o walletive_cli.py archivar): los años
+        archivados dejan de verse en el listado y la búsqueda.
+        Retorna la cantidad de movimientos archivados o None si falla.
+        """
+        try:
+            with self.conexiones.lectura() as cursor:
+                anios = self.archivo.anios_para_archivar(cursor, hoy)
+            total = 0
+            for anio in anios:
+                movidos = self.archivo.archivar_anio(self.conexiones, anio, hoy)
+                print(f"📦 {movidos} movimientos de {anio} archivados en {self.archivo.nombre_archivo(anio)}")
+                total += movidos
+            return total
+        except Exception as e:
+            self.archivo.invalidar()
+            print(f"❌ Error al archivar movimientos: {e}")
+            return None
+    
+    def rebuild_summaries(self):
+        """Recalcular desde cero las tablas de resumen (incluye los años archivados)"""
+        try:
+            fuente, adjuntos = self._fuente_historial()
+            with self.conexiones.adjuntar(adjuntos), self.conexiones.transaccion() as cursor:
+                reconstruir_resumenes(cursor, fuente)
+                reconstruir_balance_diario(cursor, fuente)
+                reconstruir_periodos(cursor, fuente)
+            print("✅ Resúmenes reconstruidos")
+            return True
+        except Exception as e:
+            print(f"❌ Error al reconstruir resúmenes: {e}")
+            return False
+    
+    def check_summaries(self):
+        """Verificar que los totales en caché coincidan con las tablas originales"""
+        try:
+            fuente, adjuntos = self._fuente_historial()
+            with self.conexiones.lectura(adjuntos=adjuntos) as cursor:
+                diferencias = verificar_resumenes(cursor, fuente)
+                for periodo in PERIODOS:
+                    diferencias += verificar_periodos(cursor, periodo, fuente)
+            if diferencias:
+                print(f"⚠️ {len(diferencias)} diferencias en los resúmenes:")
+                for dif in diferencias:
+                    print(f"   - {dif['tabla']} {dif['clave']}: caché {dif['cache']} vs real {dif['real']}")
+            else:
+                print("✅ Resúmenes consistentes")
+            return diferencias
+        except Exception as e:
+            print(f"❌ Error al verificar resúmenes: {e}")
+            return None
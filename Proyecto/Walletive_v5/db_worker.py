@@ -0,0 +1,187 @@
+"""
+Acceso asíncrono a la base de datos para la interfaz de Walletive
+Las operaciones de DatabaseManager se envían como objetos Consulta o Comando
+a hilos de trabajo; el resultado vuelve al hilo de Qt mediante una señal, de
+modo que el event loop nunca espera a SQLite.
+
+- Los comandos (escrituras) se ejecutan en orden en un único hilo.
+- Las consultas (lecturas) usan un pool pequeño de hilos, pero cada una
+  espera a que terminen los comandos enviados antes que ella, así una
+  lectura siempre ve lo que la interfaz ya escribió.
+- Una consulta que ya no interesa (p. ej. una búsqueda mientras se sigue
+  escribiendo) se puede cancelar: si no empezó se descarta y si está
+  corriendo se interrumpe su lectura en SQLite.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from db_connection import ConsultaCancelada
+
+
+class Operacion:
+    def __init__(self, metodo, *args, **kwargs):
+        # metodo puede ser el nombre de un método de DatabaseManager o una
+        # función que recibe el DatabaseManager como primer argumento
+        self.metodo = metodo
+        self.args = args
+        self.kwargs = kwargs
+        # Hilo que la está ejecutando y si se pidió cancelarla
+        self.hilo = None
+        self.cancelada = False
+
+    def ejecutar(self, db):
+        """Ejecutar la operación sobre el DatabaseManager del hilo de trabajo"""
+        if callable(self.metodo):
+            return self.metodo(db, *self.args, **self.kwargs)
+        return getattr(db, self.metodo)(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        nombre = getattr(self.metodo, "__name__", self.metodo)
+        return f"{type(self).__name__}({nombre})"
+
+
+class Consulta(Operacion):
+    """Operación de solo lectura"""
+
+
+class Comando(Operacion):
+    """Operación que modifica la base de datos"""
+    modifica_datos = True
+
+
+class Mantenimiento(Comando):
+    """Escritura que no cambia los datos visibles (esquema, checkpoints)"""
+    modifica_datos = False
+
+
+class DatabaseWorker(QObject):
+    # (callback, valor): se emiten desde los hilos de trabajo y se reciben en el hilo de Qt
+    _terminado = pyqtSignal(object, object)
+    # Se emite en el hilo de Qt cuando un Comando que modifica datos termina bien
+    datos_modificados = pyqtSignal(object)
+
+    def __init__(self, fabrica_db, hilos_lectura=2, parent=None):
+        super().__init__(parent)
+        self._escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="walletive-db-w")
+        self._lectores = ThreadPoolExecutor(max_workers=hilos_lectura, thread_name_prefix="walletive-db-r")
+        self._terminado.connect(self._entregar)
+        self._detenido = False
+        # Future -> Consulta, para poder cancelarla. Lo tocan el hilo de Qt
+        # y los hilos de trabajo: siempre con el lock
+        self._en_curso = {}
+        self._lock_en_curso = threading.Lock()
+
+        # fabrica_db corre en el hilo de escritura antes que cualquier otra
+        # operación, y todo lo demás espera a que termine. Construir un
+        # DatabaseManager no abre conexiones (se abren al primer uso), así que
+        # la fábrica puede entregar uno ya creado en el hilo de Qt
+        self._db = None
+        self._ultimo_comando = self._escritor.submit(self._crear_db, fabrica_db)
+
+    def _crear_db(self, fabrica_db):
+        self._db = fabrica_db()
+        return self._db
+
+    # === Envío de operaciones ===
+
+    def enviar(self, operacion, al_terminar=None, al_fallar=None):
+        """Encolar una Consulta o un Comando y retornar su Future
+
+        al_terminar(resultado) y al_fallar(excepcion) se llaman en el hilo de Qt.
+        """
+        if self._detenido:
+            raise RuntimeError("El acceso a datos ya fue detenido")
+
+        if isinstance(operacion, Consulta):
+            previo = self._ultimo_comando
+            futuro = self._lectores.submit(self._ejecutar_despues, previo, operacion)
+            with self._lock_en_curso:
+                self._en_curso[futuro] = operacion
+        else:
+            futuro = self._escritor.submit(self._ejecutar, operacion)
+            self._ultimo_comando = futuro
+
+        futuro.add_done_callback(lambda f: self._notificar(f, al_terminar, al_fallar, operacion))
+        return futuro
+
+    def consultar(self, metodo, *args, al_terminar=None, al_fallar=None, **kwargs):
+        """Atajo para enviar una Consulta"""
+        return self.enviar(Consulta(metodo, *args, **kwargs), al_terminar, al_fallar)
+
+    def ejecutar(self, metodo, *args, al_terminar=None, al_fallar=None, **kwargs):
+        """Atajo para enviar un Comando"""
+        return self.enviar(Comando(metodo, *args, **kwargs), al_terminar, al_fallar)
+
+    def _ejecutar(self, operacion):
+        return operacion.ejecutar(self._db)
+
+    def _ejecutar_despues(self, previo, operacion):
+        # Esperar a las escrituras anteriores (sin importar si fallaron)
+        wait([previo])
+        with self._lock_en_curso:
+            if operacion.cancelada:
+                raise ConsultaCancelada(f"{operacion!r} cancelada antes de empezar")
+            operacion.hilo = threading.get_ident()
+        try:
+            return operacion.ejecutar(self._db)
+        finally:
+            with self._lock_en_curso:
+                operacion.hilo = None
+
+    def cancelar(self, futuro):
+        """Cancelar una Consulta enviada; sus callbacks ya no se llaman
+
+        Retorna True si la consulta no había terminado todavía.
+        """
+        with self._lock_en_curso:
+            operacion = self._en_curso.get(futuro)
+            if operacion is None or futuro.done():
+                return False
+            operacion.cancelada = True
+            if operacion.hilo is not None and self._db is not None:
+                # Ya está corriendo: interrumpir la lectura de ese hilo
+                self._db.conexiones.interrumpir(operacion.hilo)
+        # Fuera del lock: si no había empezado, cancel() llama a _notificar en este hilo
+        futuro.cancel()
+        return True
+
+    # === Entrega de resultados al hilo de Qt ===
+
+    def _notificar(self, futuro, al_terminar, al_fallar, operacion):
+        """Se ejecuta en el hilo de trabajo cuando termina una operación"""
+        with self._lock_en_curso:
+            self._en_curso.pop(futuro, None)
+        if futuro.cancelled() or operacion.cancelada:
+            return
+        error = futuro.exception()
+        if error is not None:
+            if al_fallar is not None:
+                self._terminado.emit(al_fallar, error)
+            elif isinstance(error, ConsultaCancelada):
+                pass
+            else:
+                print(f"❌ Error en {operacion!r}: {error}")
+        else:
+            if al_terminar is not None:
+                self._terminado.emit(al_terminar, futuro.result())
+            if isinstance(operacion, Comando) and operacion.modifica_datos:
+                self._terminado.emit(self.datos_modificados.emit, operacion)
+
+    @pyqtSlot(object, object)
+    def _entregar(self, callback, valor):
+        """Invocar el callback en el hilo de Qt"""
+        callback(valor)
+
+    # === Cierre ===
+
+    def detener(self):
+        """Esperar las operaciones pendientes y cerrar las conexiones"""
+        if self._detenido:
+            return
+        self._detenido = True
+        self._lectores.shutdown(wait=True)
+        self._escritor.submit(lambda: self._db is not None and self._db.cerrar())
+        self._escritor.shutdown(wait=True)
@@ -7,11 +7,16 @@ Este script verifica dependencias, instala requisitos y ejecuta el proyecto
 import sys
 import os
 import subprocess
-import sqlite3
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import platform
 
+from archivo import ArchivoMovimientos
+from db_connection import ConnectionManager
+from datos_sinteticos import TAMANOS, generar
+from migraciones import aplicar_migraciones, VERSION_ESQUEMA
+from respaldo import DIRECTORIO_RESPALDOS, respaldar
+
 class WalletiveDevInit:
     def __init__(self):
         self.project_name = "Walletive"
@@ -21,6 +26,8 @@ class WalletiveDevInit:
         self.db_file = "walletive.db"
         self.config_file = "walletive_config.json"
         self.test_data_enabled = True
+        self.test_data_size = "10k"  # 10k, 100k, 1m o 10m (ver datos_sinteticos.py)
+        self.test_data_seed = 42
         
         # Colores para output
         self.colors = {
@@ -168,115 +175,52 @@ class WalletiveDevInit:
         """Inicializar la base de datos"""
         self.print_step("Inicializando base de datos...")
         
-        # Respaldar BD existente si existe
+        # Respaldar BD existente si existe (con la API de backup: incluye lo que está en el -wal)
         if os.path.exists(self.db_file):
-            backup_file = f"{self.db_file}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            os.rename(self.db_file, backup_file)
-            self.print_warning(f"Base de datos existente respaldada como: {backup_file}")
+            try:
+                conexiones = ConnectionManager(self.db_file)
+                try:
+                    backup_file = respaldar(conexiones, DIRECTORIO_RESPALDOS)
+                    # Los años archivados van en el respaldo: se borran junto con la base
+                    with conexiones.lectura() as cursor:
+                        particiones = ArchivoMovimientos(self.db_file).particiones(cursor)
+                finally:
+                    conexiones.cerrar()
+                for ruta in [self.db_file + sufijo for sufijo in ("", "-wal", "-shm")] + \
+                        [particion.ruta for particion in particiones]:
+                    if os.path.exists(ruta):
+                        os.remove(ruta)
+                self.print_warning(f"Base de datos existente respaldada como: {backup_file}")
+            except Exception as e:
+                self.print_error(f"No se pudo respaldar la base existente: {e}")
+                return False
         
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Activar foreign keys
-            cursor.execute("PRAGMA foreign_keys = ON;")
-            
-            # Crear tabla de movimientos
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Movimientos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)), -- 1 = ingreso, 2 = gasto, 3 = meta
-                    descripcion TEXT,
-                    monto DECIMAL(12, 2) NOT NULL,
-                    categoria_id INTEGER CHECK (categoria_id IN (1, 2, 3, 4, 5)), -- 1 = fijo, 2 = variable, 3 = esporádico, 4 = imprevisto, 5 = ahorro
-                    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metas_id INTEGER,
-                    FOREIGN KEY (metas_id) REFERENCES MetasAhorro(id) ON DELETE SET NULL
-                );
-            """)
-            
-            # Crear tabla de metas de ahorro
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS MetasAhorro (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    descripcion TEXT NOT NULL,
-                    monto_objetivo DECIMAL(12, 2) NOT NULL,
-                    estado_actual INTEGER NOT NULL CHECK (estado_actual IN (0, 1)), -- 0 = activo, 1 = inactivo
-                    estado_logro INTEGER NOT NULL CHECK (estado_logro IN (0, 1)), -- 0 = no alcanzado, 1 = alcanzado
-                    fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    fecha_limite TIMESTAMP NOT NULL
-                );
-            """)
-            
-            # Crear tabla de frecuencia de metas
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS FrecuenciaMeta (
-                    id INTEGER PRIMARY KEY,
-                    frecuencia VARCHAR(255),
-                    FOREIGN KEY (id) REFERENCES MetasAhorro(id) ON DELETE CASCADE
-                );
-            """)
+            conexiones = ConnectionManager(self.db_file)
             
-            conn.commit()
-            self.print_success("Tablas de base de datos creadas")
+            # Crear las tablas con las mismas migraciones que usa la aplicación
+            aplicar_migraciones(conexiones, verbose=False)
+            self.print_success(f"Tablas de base de datos creadas (esquema v{VERSION_ESQUEMA})")
             
             # Insertar datos de prueba si está habilitado
             if self.test_data_enabled:
-                self.insert_test_data(cursor)
-                conn.commit()
+                self.insert_test_data(conexiones)
             
-            conn.close()
+            conexiones.cerrar()
             return True
             
         except Exception as e:
             self.print_error(f"Error inicializando base de datos: {e}")
             return False
 
-    def insert_test_data(self, cursor):
-        """Insertar datos de prueba"""
-        self.print_colored("📊 Insertando datos de prueba...", 'BLUE')
+    def insert_test_data(self, conexiones):
+        """Insertar datos de prueba (historial sintético reproducible)"""
+        cantidad = TAMANOS[self.test_data_size]
+        self.print_colored(f"📊 Generando {cantidad:,} movimientos de prueba (semilla {self.test_data_seed})...", 'BLUE')
         
         try:
-            # Datos de prueba - Movimientos
-            test_movements = [
-                (1, 'Salario mensual', 3000000, None),
-                (2, 'Arriendo', 800000, 1),
-                (2, 'Servicios públicos', 200000, 1),
-                (2, 'Mercado', 400000, 2),
-                (2, 'Transporte', 150000, 2),
-                (2, 'Entretenimiento', 200000, 2),
-                (1, 'Freelance', 500000, None),
-                (2, 'Restaurante', 80000, 3),
-            ]
-            
-            for tipo, desc, monto, categoria in test_movements:
-                cursor.execute("""
-                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
-                    VALUES (?, ?, ?, ?)
-                """, (tipo, desc, monto, categoria))
-            
-            # Datos de prueba - Metas de ahorro
-            fecha_limite = datetime.now() + timedelta(days=365)
-            cursor.execute("""
-                INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro, fecha_limite)
-                VALUES (?, ?, 0, 0, ?)
-            """, ("Vacaciones familiares", 2000000, fecha_limite))
-            
-            meta_id = cursor.lastrowid
-            
-            # Movimiento de meta
-            cursor.execute("""
-                INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, metas_id)
-                VALUES (3, 'Meta: Vacaciones familiares', 2000000, 5, ?)
-            """, (meta_id,))
-            
-            # Frecuencia de meta
-            cursor.execute("""
-                INSERT INTO FrecuenciaMeta (id, frecuencia)
-                VALUES (?, 'mensual')
-            """, (meta_id,))
-            
-            self.print_success("Datos de prueba insertados")
+            insertados = generar(conexiones, cantidad, semilla=self.test_data_seed)
+            self.print_success(f"Datos de prueba insertados: {insertados:,} movimientos")
             
         except Exception as e:
             self.print_error(f"Error insertando datos de prueba: {e}")
@@ -297,6 +241,7 @@ class WalletiveDevInit:
                 "file": "walletive_dev.log"
             },
             "test_data": self.test_data_enabled,
+            "test_data_size": self.test_data_size,
             "created_at": datetime.now().isoformat()
         }
         
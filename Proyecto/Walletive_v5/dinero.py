@@ -0,0 +1,45 @@
+"""
+Representación del dinero en Walletive
+Los montos se guardan en la base como enteros de 64 bits en centavos; hacia
+afuera (interfaz, reportes) se manejan como Decimal con dos decimales.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+CENTAVOS_POR_UNIDAD = 100
+_UN_CENTAVO = Decimal("0.01")
+
+
+def parsear_monto(texto):
+    """Convertir el texto ingresado por el usuario en un Decimal
+
+    Acepta separadores de miles con coma ("2,500,000"). Lanza ValueError si
+    el valor no es un número finito.
+    """
+    try:
+        valor = Decimal(str(texto).strip().replace(",", ""))
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: {texto!r}")
+    if not valor.is_finite():
+        raise ValueError(f"Monto inválido: {texto!r}")
+    return valor
+
+
+def a_centavos(valor):
+    """Convertir un monto (Decimal, int, float o str) a centavos enteros"""
+    if valor is None:
+        return None
+    if isinstance(valor, float):
+        # repr() evita arrastrar el error binario del float (0.1 -> 0.1000000000000000055...)
+        valor = Decimal(repr(valor))
+    elif not isinstance(valor, Decimal):
+        valor = parsear_monto(valor)
+    return int((valor * CENTAVOS_POR_UNIDAD).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def desde_centavos(centavos):
+    """Convertir centavos enteros a un Decimal con dos decimales"""
+    if centavos is None:
+        return None
+    return (Decimal(int(centavos)) / CENTAVOS_POR_UNIDAD).quantize(_UN_CENTAVO)
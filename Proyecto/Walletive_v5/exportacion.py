@@ -0,0 +1,244 @@
+"""
+Exportación de datos de Walletive
+Movimientos, MetasAhorro y FrecuenciaMeta se leen con un cursor de a lotes
+(fetchmany) y cada lote se escribe enseguida, así la memoria no depende del
+tamaño de la tabla. Todas las tablas pedidas se leen en una misma
+transacción de lectura: la exportación es una instantánea coherente aunque
+la aplicación siga escribiendo.
+
+Formatos:
+- csv y jsonl: se comprimen al vuelo según la extensión del archivo
+  (.gz, .bz2 o .xz); en lugar de una ruta se puede pasar un archivo ya
+  abierto en modo texto (por ejemplo sys.stdout).
+- parquet: columnar para análisis (pandas, DuckDB, Spark), comprimido con
+  zstd por grupos de filas. Requiere pyarrow, que es opcional: sin él
+  PARQUET_DISPONIBLE es False y pedir parquet da error.
+
+Los montos salen en unidades con dos decimales (no en centavos): en CSV y
+JSON Lines como el mismo texto decimal ("1234.50", sin pasar por float) y
+en Parquet como decimal(18, 2). Las filas salen ordenadas por id, así dos
+exportaciones de los mismos datos son idénticas. Sin rango de fechas no
+cuesta una ordenación: cada tabla se recorre por su clave primaria y con
+años archivados SQLite intercala las ramas del UNION ALL, que ya vienen por
+id (MERGE). Con rango, cada rama ordena solo las filas de su rango.
+"""
+
+import bz2
+import csv
+import gzip
+import importlib.util
+import json
+import lzma
+import os
+from collections import namedtuple
+from datetime import datetime
+
+from dinero import desde_centavos
+
+
+# Filas por lectura (fetchmany) y por grupo de filas de Parquet
+TAMANO_LOTE = 5000
+FILAS_POR_GRUPO_PARQUET = 100000
+
+FORMATOS = ("csv", "jsonl", "parquet")
+COMPRESORES = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+# pyarrow se importa recién al escribir Parquet
+PARQUET_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+
+# tipo: entero, texto, dinero (centavos en la base) o fecha
+Columna = namedtuple("Columna", ["nombre", "tipo"])
+
+TABLAS = {
+    "Movimientos": [
+        Columna("id", "entero"),
+        Columna("tipo", "entero"),
+        Columna("descripcion", "texto"),
+        Columna("monto", "dinero"),
+        Columna("categoria_id", "entero"),
+        Columna("fecha", "fecha"),
+        Columna("metas_id", "entero"),
+    ],
+    "MetasAhorro": [
+        Columna("id", "entero"),
+        Columna("descripcion", "texto"),
+        Columna("monto_objetivo", "dinero"),
+        Columna("estado_actual", "entero"),
+        Columna("estado_logro", "entero"),
+        Columna("fecha_inicio", "fecha"),
+        Columna("fecha_limite", "fecha"),
+    ],
+    "FrecuenciaMeta": [
+        Columna("id", "entero"),
+        Columna("frecuencia", "texto"),
+    ],
+}
+
+
+def formato_de(ruta):
+    """Formato según la extensión (sin contar la de compresión)"""
+    base, extension = os.path.splitext(ruta.lower())
+    if extension in COMPRESORES:
+        extension = os.path.splitext(base)[1]
+    formato = extension.lstrip(".")
+    if formato not in FORMATOS:
+        raise ValueError(f"No se reconoce el formato de {ruta} (se espera .csv, .jsonl o .parquet)")
+    return formato
+
+
+def _abrir_texto(ruta):
+    """Archivo de texto para escribir, comprimido al vuelo según la extensión"""
+    if not isinstance(ruta, str):
+        return ruta
+    abrir = COMPRESORES.get(os.path.splitext(ruta.lower())[1])
+    if abrir:
+        return abrir(ruta, "wt", encoding="utf-8", newline="")
+    return open(ruta, "w", encoding="utf-8", newline="")
+
+
+# === Escritores ===
+
+class EscritorCSV:
+    def __init__(self, ruta, columnas):
+        self.ruta = ruta
+        self.archivo = _abrir_texto(ruta)
+        self.dinero = [i for i, columna in enumerate(columnas) if columna.tipo == "dinero"]
+        self.csv = csv.writer(self.archivo)
+        self.csv.writerow([columna.nombre for columna in columnas])
+
+    def escribir(self, filas):
+        if self.dinero:
+            filas = [list(fila) for fila in filas]
+            for fila in filas:
+                for i in self.dinero:
+                    fila[i] = desde_centavos(fila[i])
+        self.csv.writerows(filas)
+
+    def cerrar(self):
+        if self.archivo is not self.ruta:
+            self.archivo.close()
+        else:
+            self.archivo.flush()
+
+
+class EscritorJSONL:
+    def __init__(self, ruta, columnas):
+        self.ruta = ruta
+        self.archivo = _abrir_texto(ruta)
+        self.nombres = [columna.nombre for columna in columnas]
+        self.dinero = [i for i, columna in enumerate(columnas) if columna.tipo == "dinero"]
+
+    def escribir(self, filas):
+        lineas = []
+        for fila in filas:
+            if self.dinero:
+                fila = list(fila)
+                for i in self.dinero:
+                    # Como texto, igual que en CSV: un float no representa todos los centavos
+                    fila[i] = None if fila[i] is None else str(desde_centavos(fila[i]))
+            lineas.append(json.dumps(dict(zip(self.nombres, fila)), ensure_ascii=False))
+        self.archivo.write("\n".join(lineas) + "\n")
+
+    def cerrar(self):
+        if self.archivo is not self.ruta:
+            self.archivo.close()
+        else:
+            self.archivo.flush()
+
+
+class EscritorParquet:
+    """Acumula lotes hasta FILAS_POR_GRUPO_PARQUET y escribe un grupo de filas"""
+
+    def __init__(self, ruta, columnas):
+        if not PARQUET_DISPONIBLE:
+            raise ValueError("Exportar a Parquet requiere pyarrow (pip install pyarrow)")
+        if not isinstance(ruta, str):
+            raise ValueError("Parquet se escribe en un archivo con nombre, no en un flujo de texto")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        tipos = {
+            "entero": pa.int64(),
+            "texto": pa.string(),
+            "dinero": pa.decimal128(18, 2),
+            "fecha": pa.timestamp("us"),
+        }
+        self.columnas = columnas
+        self.esquema = pa.schema([(columna.nombre, tipos[columna.tipo]) for columna in columnas])
+        self.escritor = pq.ParquetWriter(ruta, self.esquema, compression="zstd")
+        self.pendientes = []
+
+    def escribir(self, filas):
+        self.pendientes.extend(filas)
+        if len(self.pendientes) >= FILAS_POR_GRUPO_PARQUET:
+            self._volcar()
+
+    def _valores(self, i, tipo):
+        valores = [fila[i] for fila in self.pendientes]
+        if tipo == "dinero":
+            return [desde_centavos(valor) for valor in valores]
+        if tipo == "fecha":
+            return [None if valor is None else datetime.fromisoformat(str(valor)) for valor in valores]
+        return valores
+
+    def _volcar(self):
+        if not self.pendientes:
+            return
+        arreglos = [self.pa.array(self._valores(i, columna.tipo), type=self.esquema.field(i).type)
+                    for i, columna in enumerate(self.columnas)]
+        self.escritor.write_table(self.pa.Table.from_arrays(arreglos, schema=self.esquema))
+        self.pendientes = []
+
+    def cerrar(self):
+        self._volcar()
+        self.escritor.close()
+
+
+ESCRITORES = {"csv": EscritorCSV, "jsonl": EscritorJSONL, "parquet": EscritorParquet}
+
+
+# === Exportación ===
+
+def exportar(conexiones, destinos, formato=None, fuente_movimientos=("Movimientos", {}),
+             tamano_lote=TAMANO_LOTE, progreso=None):
+    """Exportar tablas en una sola instantánea
+
+    destinos es {tabla: ruta o archivo abierto}. formato=None lo deduce de
+    cada ruta (con un archivo abierto hay que indicarlo).
+    fuente_movimientos es (sql, adjuntos) de ArchivoMovimientos.fuente_movimientos
+    para incluir los años archivados. progreso(tabla, filas) se llama tras
+    cada lote. Retorna {tabla: filas exportadas}.
+    """
+    desconocidas = set(destinos) - set(TABLAS)
+    if desconocidas:
+        raise ValueError(f"Tablas que no se exportan: {', '.join(sorted(desconocidas))}")
+    if formato is None and not all(isinstance(ruta, str) for ruta in destinos.values()):
+        raise ValueError("Indica el formato para exportar a un archivo abierto")
+    formatos = {tabla: formato or formato_de(ruta) for tabla, ruta in destinos.items()}
+    for tabla, formato_tabla in formatos.items():
+        if formato_tabla not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato_tabla}")
+
+    fuente, adjuntos = fuente_movimientos if "Movimientos" in destinos else ("Movimientos", {})
+    exportadas = {}
+    with conexiones.lectura(adjuntos=adjuntos) as cursor:
+        for tabla, ruta in destinos.items():
+            columnas = TABLAS[tabla]
+            origen = fuente if tabla == "Movimientos" else tabla
+            escritor = ESCRITORES[formatos[tabla]](ruta, columnas)
+            filas = 0
+            try:
+                cursor.execute(f"SELECT {', '.join(columna.nombre for columna in columnas)} FROM {origen} ORDER BY id")
+                while True:
+                    lote = cursor.fetchmany(tamano_lote)
+                    if not lote:
+                        break
+                    escritor.escribir(lote)
+                    filas += len(lote)
+                    if progreso:
+                        progreso(tabla, filas)
+            finally:
+                escritor.cerrar()
+            exportadas[tabla] = filas
+    return exportadas
@@ -0,0 +1,359 @@
+"""
+Importación masiva de movimientos bancarios para Walletive
+Lee extractos CSV, OFX o QIF como flujo (un movimiento a la vez), los
+normaliza al esquema de Movimientos y los inserta con executemany en lotes
+de tamaño fijo dentro de pocas transacciones grandes.
+
+El avance se guarda en la tabla Importaciones dentro de la misma transacción
+que los datos, así que una importación interrumpida se retoma donde quedó.
+"""
+
+import csv
+import hashlib
+import os
+import re
+from datetime import datetime
+
+from dinero import a_centavos, parsear_monto
+from transacciones import NOMBRES_CATEGORIA, NOMBRES_TIPO
+
+
+FORMATOS = ("csv", "ofx", "qif")
+
+TAMANO_LOTE = 5000              # filas por executemany
+FILAS_POR_TRANSACCION = 50000   # filas por COMMIT (y por punto de control)
+
+# Alias aceptados en el encabezado de un CSV
+COLUMNAS_CSV = {
+    "fecha": ("fecha", "date", "fecha_movimiento", "fecha operacion", "fecha operación"),
+    "descripcion": ("descripcion", "descripción", "description", "concepto", "detalle", "memo", "payee"),
+    "monto": ("monto", "amount", "valor", "importe"),
+    "credito": ("credito", "crédito", "credit", "abono", "ingreso"),
+    "debito": ("debito", "débito", "debit", "cargo", "gasto"),
+    "tipo": ("tipo", "type"),
+    "categoria_id": ("categoria_id", "categoria", "categoría", "category"),
+}
+
+FORMATOS_FECHA = (
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d",
+    "%d/%m/%y", "%Y%m%d%H%M%S", "%Y%m%d",
+)
+
+# QIF (Quicken) escribe mes/día: 1/31'24, 12/31/2023
+FORMATOS_FECHA_QIF = ("%m/%d/%y", "%m/%d/%Y")
+
+SQL_INSERTAR = """
+    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class ErrorImportacion(Exception):
+    """Error de formato en el archivo a importar"""
+
+
+# === Lectura del archivo ===
+
+class _LectorLineas:
+    """Iterador de líneas de texto que lleva la cuenta de bytes leídos"""
+
+    def __init__(self, archivo_binario, encoding):
+        self.archivo = archivo_binario
+        self.encoding = encoding
+        self.bytes_leidos = 0
+        self._primera = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        linea = self.archivo.readline()
+        if not linea:
+            raise StopIteration
+        self.bytes_leidos += len(linea)
+        texto = linea.decode(self.encoding, errors="replace")
+        if self._primera:
+            self._primera = False
+            texto = texto.lstrip("\ufeff")
+        return texto
+
+
+def detectar_formato(ruta):
+    """Deducir el formato a partir de la extensión del archivo"""
+    extension = os.path.splitext(ruta)[1].lower().lstrip(".")
+    if extension in FORMATOS:
+        return extension
+    if extension == "txt":
+        return "csv"
+    raise ErrorImportacion(f"No se reconoce el formato de {ruta}; indique csv, ofx o qif")
+
+
+def huella_archivo(ruta, tamano_bloque=1024 * 1024):
+    """SHA-256 del archivo, leído por bloques, para identificar la importación"""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+# === Normalización ===
+
+def parsear_fecha(texto, formato=None, formatos=FORMATOS_FECHA):
+    """Convertir una fecha del extracto al formato de la base (YYYY-MM-DD HH:MM:SS)
+
+    Con formato se usa solo ese; si no, se prueban los de formatos en orden.
+    """
+    texto = texto.strip()
+    # OFX agrega milisegundos y zona horaria: 20240131120000.000[-5:COT]
+    texto = re.sub(r"(\d{8,14})(\.\d+)?(\[.*\])?$", r"\1", texto)
+    # QIF usa apóstrofo para años de dos dígitos: 1/31'24
+    texto = texto.replace("'", "/")
+    for fmt in (formato,) if formato else formatos:
+        try:
+            return datetime.strptime(texto, fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    raise ErrorImportacion(f"Fecha no reconocida: {texto!r}")
+
+
+def normalizar_monto(texto, separador_decimal="."):
+    """Convertir un importe del extracto a Decimal respetando el separador decimal"""
+    texto = texto.strip().replace("$", "").replace(" ", "")
+    if separador_decimal == ",":
+        texto = texto.replace(".", "").replace(",", ".")
+    negativo = texto.startswith("(") and texto.endswith(")")
+    if negativo:
+        texto = texto[1:-1]
+    valor = parsear_monto(texto)
+    return -valor if negativo else valor
+
+
+def normalizar(fecha, descripcion, monto, categoria_gastos, categoria=None, tipo=None):
+    """Construir la fila (tipo, descripcion, monto, categoria_id, fecha) de Movimientos
+
+    Los montos negativos son gastos y los positivos ingresos, salvo que el
+    extracto indique el tipo explícitamente.
+    """
+    if tipo is None:
+        tipo = 2 if monto < 0 else 1
+    elif tipo not in NOMBRES_TIPO:
+        raise ErrorImportacion(f"tipo {tipo} no válido (se espera 1, 2 o 3)")
+    if categoria is not None and categoria not in NOMBRES_CATEGORIA:
+        raise ErrorImportacion(f"categoria_id {categoria} no válida (se espera de 1 a 5)")
+    if categoria is None and tipo == 2:
+        categoria = categoria_gastos
+    return (tipo, descripcion or None, abs(a_centavos(monto)), categoria, fecha)
+
+
+# === Parsers (generadores) ===
+
+def parsear_csv(lineas, formato_fecha=None, separador_decimal=".", categoria_gastos=2):
+    """Generar filas normalizadas a partir de un CSV con encabezado"""
+    lineas = iter(lineas)
+    primera = next(lineas, None)
+    if primera is None:
+        return
+    try:
+        dialecto = csv.Sniffer().sniff(primera, delimiters=",;\t|")
+    except csv.Error:
+        dialecto = csv.excel
+
+    def todas():
+        yield primera
+        yield from lineas
+
+    lector = csv.reader(todas(), dialecto)
+    encabezado = [col.strip().lower() for col in next(lector)]
+
+    indices = {}
+    for campo, alias in COLUMNAS_CSV.items():
+        for i, col in enumerate(encabezado):
+            if col in alias:
+                indices[campo] = i
+                break
+    if "fecha" not in indices or not ("monto" in indices or "credito" in indices or "debito" in indices):
+        raise ErrorImportacion(f"El CSV debe tener columnas de fecha y monto; encabezado: {encabezado}")
+
+    def campo(fila, nombre):
+        i = indices.get(nombre)
+        return fila[i].strip() if i is not None and i < len(fila) else ""
+
+    for numero, fila in enumerate(lector, start=2):
+        if not any(celda.strip() for celda in fila):
+            continue
+        try:
+            if "monto" in indices:
+                monto = normalizar_monto(campo(fila, "monto"), separador_decimal)
+            else:
+                credito = campo(fila, "credito")
+                debito = campo(fila, "debito")
+                monto = (normalizar_monto(credito, separador_decimal) if credito else 0) \
+                    - (abs(normalizar_monto(debito, separador_decimal)) if debito else 0)
+            tipo = int(campo(fila, "tipo")) if campo(fila, "tipo").isdigit() else None
+            categoria = int(campo(fila, "categoria_id")) if campo(fila, "categoria_id").isdigit() else None
+            yield normalizar(parsear_fecha(campo(fila, "fecha"), formato_fecha),
+                             campo(fila, "descripcion"), monto, categoria_gastos, categoria, tipo)
+        except (ValueError, ErrorImportacion) as e:
+            raise ErrorImportacion(f"Fila {numero}: {e}")
+
+
+_ETIQUETA_OFX = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def parsear_ofx(lineas, formato_fecha=None, separador_decimal=".", categoria_gastos=2):
+    """Generar filas normalizadas a partir de un OFX (SGML o XML)"""
+    actual = None
+    for linea in lineas:
+        for cierre, etiqueta, valor in _ETIQUETA_OFX.findall(linea):
+            etiqueta = etiqueta.upper()
+            if etiqueta == "STMTTRN":
+                if cierre and actual is not None:
+                    yield _fila_ofx(actual, formato_fecha, separador_decimal, categoria_gastos)
+                    actual = None
+                elif not cierre:
+                    # En SGML la transacción anterior puede no tener cierre
+                    if actual is not None:
+                        yield _fila_ofx(actual, formato_fecha, separador_decimal, categoria_gastos)
+                    actual = {}
+            elif etiqueta == "BANKTRANLIST" and cierre and actual is not None:
+                yield _fila_ofx(actual, formato_fecha, separador_decimal, categoria_gastos)
+                actual = None
+            elif actual is not None and not cierre and valor.strip():
+                actual[etiqueta] = valor.strip()
+    if actual is not None:
+        yield _fila_ofx(actual, formato_fecha, separador_decimal, categoria_gastos)
+
+
+def _fila_ofx(campos, formato_fecha, separador_decimal, categoria_gastos):
+    """Normalizar una transacción STMTTRN de OFX"""
+    if "TRNAMT" not in campos or "DTPOSTED" not in campos:
+        raise ErrorImportacion(f"Transacción OFX incompleta: {campos}")
+    descripcion = " - ".join(v for v in (campos.get("NAME"), campos.get("MEMO")) if v)
+    monto = normalizar_monto(campos["TRNAMT"], separador_decimal)
+    return normalizar(parsear_fecha(campos["DTPOSTED"], formato_fecha),
+                      descripcion, monto, categoria_gastos)
+
+
+def parsear_qif(lineas, formato_fecha=None, separador_decimal=".", categoria_gastos=2):
+    """Generar filas normalizadas a partir de un QIF bancario"""
+    def fila(campos):
+        if "T" not in campos or "D" not in campos:
+            raise ErrorImportacion(f"Registro QIF incompleto: {campos}")
+        descripcion = " - ".join(v for v in (campos.get("P"), campos.get("M")) if v)
+        monto = normalizar_monto(campos["T"], separador_decimal)
+        # Quicken rellena con espacios: " 1/ 5'24"
+        fecha = parsear_fecha(campos["D"].replace(" ", ""), formato_fecha, FORMATOS_FECHA_QIF)
+        return normalizar(fecha, descripcion, monto, categoria_gastos)
+
+    actual = {}
+    for linea in lineas:
+        linea = linea.rstrip("\r\n")
+        if not linea or linea.startswith("!"):
+            continue
+        codigo, valor = linea[0], linea[1:].strip()
+        if codigo == "^":
+            if actual:
+                yield fila(actual)
+            actual = {}
+        elif codigo == "U":
+            # U es el mismo importe que T en versiones nuevas de Quicken
+            actual.setdefault("T", valor)
+        else:
+            actual[codigo] = valor
+    if actual:
+        yield fila(actual)
+
+
+PARSERS = {"csv": parsear_csv, "ofx": parsear_ofx, "qif": parsear_qif}
+
+
+# === Importador ===
+
+class ImportadorMovimientos:
+    def __init__(self, conexiones, tamano_lote=TAMANO_LOTE, filas_por_transaccion=FILAS_POR_TRANSACCION):
+        self.conexiones = conexiones
+        self.tamano_lote = tamano_lote
+        # Cada transacción agrupa un número entero de lotes
+        self.filas_por_transaccion = max(tamano_lote, filas_por_transaccion // tamano_lote * tamano_lote)
+
+    def _estado(self, huella):
+        """Leer el punto de control de una importación previa del mismo archivo"""
+        with self.conexiones.lectura() as cursor:
+            cursor.execute(
+                "SELECT filas_procesadas, completada FROM Importaciones WHERE huella = ?", (huella,)
+            )
+            return cursor.fetchone()
+
+    def importar(self, ruta, formato=None, encoding="utf-8-sig", progreso=None, forzar=False, **opciones):
+        """Importar un extracto completo y retornar cuántas filas se insertaron
+
+        progreso(filas, bytes_leidos, bytes_totales) se llama tras cada lote.
+        Si el archivo ya se importó antes (misma huella) no se repite, salvo
+        con forzar=True. Si la importación anterior quedó a medias, se
+        saltan las filas ya confirmadas y se continúa desde ahí.
+        """
+        formato = (formato or detectar_formato(ruta)).lower()
+        if formato not in PARSERS:
+            raise ErrorImportacion(f"Formato no soportado: {formato}")
+
+        huella = huella_archivo(ruta)
+        estado = self._estado(huella)
+        ya_procesadas = 0
+        if estado is not None:
+            filas_previas, completada = estado
+            if completada and not forzar:
+                print(f"⚠️ {os.path.basename(ruta)} ya fue importado ({filas_previas} filas)")
+                return 0
+            if not completada:
+                ya_procesadas = filas_previas
+                print(f"🔄 Retomando importación desde la fila {ya_procesadas}")
+
+        with self.conexiones.transaccion() as cursor:
+            cursor.execute("""
+                INSERT OR IGNORE INTO Importaciones (huella, archivo, formato, filas_procesadas, completada)
+                VALUES (?, ?, ?, 0, 0)
+            """, (huella, os.path.abspath(ruta), formato))
+            cursor.execute("""
+                UPDATE Importaciones
+                SET filas_procesadas = ?, completada = 0, actualizada = CURRENT_TIMESTAMP
+                WHERE huella = ?
+            """, (ya_procesadas, huella))
+
+        bytes_totales = os.path.getsize(ruta)
+        insertadas = 0
+        with open(ruta, "rb") as archivo:
+            lector = _LectorLineas(archivo, encoding)
+            filas = PARSERS[formato](lector, **opciones)
+
+            # Saltar lo que ya se confirmó en una ejecución anterior
+            for _ in range(ya_procesadas):
+                if next(filas, None) is None:
+                    break
+            procesadas = ya_procesadas
+
+            terminado = False
+            while not terminado:
+                with self.conexiones.transaccion() as cursor:
+                    en_transaccion = 0
+                    while en_transaccion < self.filas_por_transaccion:
+                        lote = [fila for _, fila in zip(range(self.tamano_lote), filas)]
+                        if not lote:
+                            terminado = True
+                            break
+                        cursor.executemany(SQL_INSERTAR, lote)
+                        en_transaccion += len(lote)
+                        procesadas += len(lote)
+                        if progreso:
+                            progreso(procesadas, lector.bytes_leidos, bytes_totales)
+
+                    # Punto de control en la misma transacción que los datos
+                    cursor.execute("""
+                        UPDATE Importaciones
+                        SET filas_procesadas = ?, completada = ?, actualizada = CURRENT_TIMESTAMP
+                        WHERE huella = ?
+                    """, (procesadas, 1 if terminado else 0, huella))
+                insertadas += en_transaccion
+
+        print(f"✅ Importación completada: {insertadas} movimientos desde {os.path.basename(ruta)}")
+        return insertadas
@@ -0,0 +1,304 @@
+"""
+Migraciones de esquema para la base de datos de Walletive
+Cada migración tiene un número de versión; la versión aplicada se guarda en
+PRAGMA user_version. Las migraciones son idempotentes y se ejecutan cada una
+en su propia transacción. Si la base ya está al día no se ejecuta ningún DDL.
+"""
+
+from collections import namedtuple
+
+from alertas import crear_alertas
+from archivo import crear_archivo
+from balance_diario import crear_balance_diario
+from busqueda import crear_busqueda
+from configuracion import crear_configuracion
+from recurrencias import crear_recurrencias
+from reportes import crear_reportes
+from resumenes import crear_resumenes, eliminar_resumenes
+from vencimientos import crear_vencimientos
+
+
+# sin_claves_foraneas: la migración reconstruye tablas referenciadas y debe
+# correr con PRAGMA foreign_keys = OFF (procedimiento de ALTER de SQLite)
+Migracion = namedtuple("Migracion", ["version", "descripcion", "aplicar", "sin_claves_foraneas"],
+                       defaults=[False])
+
+
+def _esquema_inicial(cursor):
+    """Tablas base: Movimientos, MetasAhorro y FrecuenciaMeta"""
+    # Crear tabla de movimientos
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Movimientos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)), -- 1 = ingreso, 2 = gasto, 3 = meta
+            descripcion TEXT,
+            monto DECIMAL(12, 2) NOT NULL,
+            categoria_id INTEGER CHECK (categoria_id IN (1, 2, 3, 4, 5)), -- 1 = fijo, 2 = variable, 3 = esporádico, 4 = imprevisto, 5 = ahorro
+            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            metas_id INTEGER,
+            FOREIGN KEY (metas_id) REFERENCES MetasAhorro(id) ON DELETE SET NULL
+        );
+    """)
+
+    # Crear tabla de metas de ahorro
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS MetasAhorro (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descripcion TEXT NOT NULL,
+            monto_objetivo DECIMAL(12, 2) NOT NULL,
+            estado_actual INTEGER NOT NULL CHECK (estado_actual IN (0, 1)), -- 0 = activo, 1 = inactivo
+            estado_logro INTEGER NOT NULL CHECK (estado_logro IN (0, 1)), -- 0 = no alcanzado, 1 = alcanzado
+            fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fecha_limite TIMESTAMP NOT NULL
+        );
+    """)
+
+    # Crear tabla de frecuencia de metas
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS FrecuenciaMeta (
+            id INTEGER PRIMARY KEY,
+            frecuencia VARCHAR(255),
+            FOREIGN KEY (id) REFERENCES MetasAhorro(id) ON DELETE CASCADE
+        );
+    """)
+
+
+def _tablas_resumen(cursor):
+    """Totales materializados mantenidos por triggers"""
+    crear_resumenes(cursor)
+
+
+def _indices_movimientos(cursor):
+    """Índices de cobertura para los filtros habituales sobre Movimientos"""
+    # Sumas y listados por tipo ordenados por fecha sin tocar la tabla
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mov_tipo_fecha_monto
+        ON Movimientos (tipo, fecha, monto)
+    """)
+    # Filtros por categoría en un rango de fechas
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mov_categoria_fecha
+        ON Movimientos (categoria_id, fecha)
+    """)
+    # Movimientos asociados a una meta (también acelera ON DELETE SET NULL)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mov_metas
+        ON Movimientos (metas_id)
+    """)
+
+
+def _montos_en_centavos(cursor):
+    """Guardar monto y monto_objetivo como enteros en centavos
+
+    SQLite no permite cambiar el tipo de una columna, así que las tablas se
+    reconstruyen copiando los datos convertidos.
+    """
+    cursor.execute("SELECT type FROM pragma_table_info('Movimientos') WHERE name = 'monto'")
+    if cursor.fetchone()[0].upper() == "INTEGER":
+        return  # Ya convertida
+
+    # Los triggers de resumen se recrean al final sobre las tablas nuevas
+    eliminar_resumenes(cursor)
+
+    cursor.execute("""
+        CREATE TABLE Movimientos_nueva (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)), -- 1 = ingreso, 2 = gasto, 3 = meta
+            descripcion TEXT,
+            monto INTEGER NOT NULL, -- centavos
+            categoria_id INTEGER CHECK (categoria_id IN (1, 2, 3, 4, 5)), -- 1 = fijo, 2 = variable, 3 = esporádico, 4 = imprevisto, 5 = ahorro
+            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            metas_id INTEGER,
+            FOREIGN KEY (metas_id) REFERENCES MetasAhorro(id) ON DELETE SET NULL
+        );
+    """)
+    cursor.execute("""
+        INSERT INTO Movimientos_nueva (id, tipo, descripcion, monto, categoria_id, fecha, metas_id)
+        SELECT id, tipo, descripcion, CAST(ROUND(monto * 100) AS INTEGER), categoria_id, fecha, metas_id
+        FROM Movimientos
+    """)
+    cursor.execute("DROP TABLE Movimientos")
+    cursor.execute("ALTER TABLE Movimientos_nueva RENAME TO Movimientos")
+
+    cursor.execute("""
+        CREATE TABLE MetasAhorro_nueva (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            descripcion TEXT NOT NULL,
+            monto_objetivo INTEGER NOT NULL, -- centavos
+            estado_actual INTEGER NOT NULL CHECK (estado_actual IN (0, 1)), -- 0 = activo, 1 = inactivo
+            estado_logro INTEGER NOT NULL CHECK (estado_logro IN (0, 1)), -- 0 = no alcanzado, 1 = alcanzado
+            fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fecha_limite TIMESTAMP NOT NULL
+        );
+    """)
+    cursor.execute("""
+        INSERT INTO MetasAhorro_nueva (id, descripcion, monto_objetivo, estado_actual, estado_logro,
+                                       fecha_inicio, fecha_limite)
+        SELECT id, descripcion, CAST(ROUND(monto_objetivo * 100) AS INTEGER), estado_actual, estado_logro,
+               fecha_inicio, fecha_limite
+        FROM MetasAhorro
+    """)
+    cursor.execute("DROP TABLE MetasAhorro")
+    cursor.execute("ALTER TABLE MetasAhorro_nueva RENAME TO MetasAhorro")
+
+    # DROP TABLE eliminó los índices: recrearlos junto con los resúmenes
+    _indices_movimientos(cursor)
+    crear_resumenes(cursor)
+
+
+def _tabla_importaciones(cursor):
+    """Puntos de control de las importaciones masivas"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Importaciones (
+            huella TEXT PRIMARY KEY, -- SHA-256 del archivo importado
+            archivo TEXT NOT NULL,
+            formato TEXT NOT NULL,
+            filas_procesadas INTEGER NOT NULL DEFAULT 0,
+            completada INTEGER NOT NULL DEFAULT 0 CHECK (completada IN (0, 1)),
+            actualizada TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+
+def _indices_listado(cursor):
+    """Índices para paginar Movimientos por (fecha, id) y (monto, id)
+
+    Todo índice de SQLite termina implícitamente en el rowid (id), así que
+    un índice sobre fecha ya sirve como índice sobre (fecha, id).
+    """
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mov_fecha
+        ON Movimientos (fecha)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_mov_monto
+        ON Movimientos (monto)
+    """)
+
+
+def _busqueda_texto(cursor):
+    """Índice FTS5 de las descripciones, mantenido por triggers"""
+    crear_busqueda(cursor)
+
+
+def _balance_diario(cursor):
+    """Neto por día para consultar el balance a cualquier fecha"""
+    crear_balance_diario(cursor)
+
+
+def _resumen_periodos(cursor):
+    """Totales por día, semana, mes y año para el motor de reportes"""
+    crear_reportes(cursor)
+
+
+def _motor_alertas(cursor):
+    """Alertas persistidas, presupuestos por categoría y estado del motor"""
+    crear_alertas(cursor)
+
+
+def _recurrencias(cursor):
+    """Reglas de movimientos recurrentes"""
+    crear_recurrencias(cursor)
+
+
+def _cambios_metas(cursor):
+    """Registro de metas modificadas para reprogramar sus avisos"""
+    crear_vencimientos(cursor)
+
+
+def _particiones(cursor):
+    """Registro de los años archivados en bases aparte"""
+    crear_archivo(cursor)
+
+
+def _tabla_configuracion(cursor):
+    """Configuración de usuario dentro de la base (opcional, ver configuracion.py)"""
+    crear_configuracion(cursor)
+
+
+def _objetivos_encuesta(cursor):
+    """Marcar los movimientos de meta que registraban el objetivo (encuesta anterior)
+
+    Los movimientos de meta son aportes. La encuesta anterior guardaba uno
+    igual al objetivo al crear la meta: se marca en ObjetivosEncuesta para
+    no contarlo como aporte. El movimiento no se toca (sigue en los totales).
+    Solo se marca el primero de cada meta, con la descripción y el monto
+    exactos que escribía la encuesta.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ObjetivosEncuesta (
+            movimiento_id INTEGER PRIMARY KEY
+        );
+    """)
+    cursor.execute("""
+        INSERT OR IGNORE INTO ObjetivosEncuesta (movimiento_id)
+        SELECT m.id
+        FROM Movimientos m
+        JOIN MetasAhorro g ON g.id = m.metas_id
+        WHERE m.tipo = 3 AND m.descripcion = 'Meta de ahorro' AND m.monto = g.monto_objetivo
+          AND m.id = (SELECT MIN(id) FROM Movimientos WHERE tipo = 3 AND metas_id = m.metas_id)
+    """)
+
+
+MIGRACIONES = [
+    Migracion(1, "Esquema inicial", _esquema_inicial),
+    Migracion(2, "Tablas de resumen con triggers", _tablas_resumen),
+    Migracion(3, "Índices de Movimientos", _indices_movimientos),
+    Migracion(4, "Montos en centavos enteros", _montos_en_centavos, sin_claves_foraneas=True),
+    Migracion(5, "Tabla de importaciones", _tabla_importaciones),
+    Migracion(6, "Índices para el listado de transacciones", _indices_listado),
+    Migracion(7, "Búsqueda de texto en descripciones", _busqueda_texto),
+    Migracion(8, "Balance diario acumulado", _balance_diario),
+    Migracion(9, "Totales por período para reportes", _resumen_periodos),
+    Migracion(10, "Motor de alertas", _motor_alertas),
+    Migracion(11, "Movimientos recurrentes", _recurrencias),
+    Migracion(12, "Cambios de metas para avisos de vencimiento", _cambios_metas),
+    Migracion(13, "Registro de años archivados", _particiones),
+    Migracion(14, "Tabla de configuración", _tabla_configuracion),
+    Migracion(15, "Objetivos de la encuesta anterior marcados", _objetivos_encuesta),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1].version
+
+
+def version_actual(cursor):
+    """Leer la versión de esquema guardada en PRAGMA user_version"""
+    cursor.execute("PRAGMA user_version;")
+    return cursor.fetchone()[0]
+
+
+def aplicar_migraciones(conexiones, verbose=True):
+    """Aplicar las migraciones pendientes usando un ConnectionManager
+
+    Retorna la lista de versiones aplicadas (vacía si la base ya estaba al día).
+    """
+    with conexiones.lectura(instantanea=False) as cursor:
+        version = version_actual(cursor)
+    if version >= VERSION_ESQUEMA:
+        return []
+
+    aplicadas = []
+    for migracion in MIGRACIONES:
+        if migracion.version <= version:
+            continue
+        if migracion.sin_claves_foraneas:
+            # foreign_keys no se puede cambiar dentro de una transacción
+            conexiones.escritor().execute("PRAGMA foreign_keys = OFF;")
+        try:
+            with conexiones.transaccion() as cursor:
+                # Releer dentro de la transacción por si otro proceso ya migró
+                if version_actual(cursor) >= migracion.version:
+                    continue
+                migracion.aplicar(cursor)
+                if migracion.sin_claves_foraneas:
+                    cursor.execute("PRAGMA foreign_key_check;")
+                    if cursor.fetchone() is not None:
+                        raise RuntimeError(f"La migración {migracion.version} rompe claves foráneas")
+                cursor.execute(f"PRAGMA user_version = {int(migracion.version)};")
+        finally:
+            if migracion.sin_claves_foraneas:
+                conexiones.escritor().execute("PRAGMA foreign_keys = ON;")
+        aplicadas.append(migracion.version)
+        if verbose:
+            print(f"🔧 Migración {migracion.version} aplicada: {migracion.descripcion}")
+    return aplicadas
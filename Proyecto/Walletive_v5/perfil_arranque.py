@@ -0,0 +1,97 @@
+"""
+Perfil de arranque de Walletive
+Con --profile-startup (o la variable WALLETIVE_PROFILE_STARTUP=1) se mide
+cada fase del arranque: importaciones, QApplication, tema, configuración,
+init_database (en el hilo de datos), construcción de la ventana, primer
+pintado y primer resumen. Al terminar se imprime una tabla con el momento de
+inicio y la duración de cada fase, en milisegundos desde que se importó este
+módulo (lo primero que hace walletive.py). Con --profile-startup=archivo.json
+además se guarda en JSON, para comparar entre máquinas o versiones.
+
+Sin la opción, fase() y marcar() no hacen nada más que una comparación.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+INICIO = time.perf_counter()
+
+OPCION = "--profile-startup"
+VARIABLE = "WALLETIVE_PROFILE_STARTUP"
+
+
+class PerfilArranque:
+    def __init__(self, activo=False, ruta=None):
+        self.activo = activo
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._registros = []  # (nombre, inicio, duración o None si es una marca, hilo)
+        self._terminado = False
+
+    def _registrar(self, nombre, inicio, duracion):
+        with self._lock:
+            self._registros.append((nombre, inicio - INICIO, duracion, threading.current_thread().name))
+
+    @contextmanager
+    def fase(self, nombre):
+        """Medir la duración de un bloque"""
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._registrar(nombre, inicio, time.perf_counter() - inicio)
+
+    def marcar(self, nombre):
+        """Registrar el momento en que ocurrió algo (sin duración)"""
+        if self.activo:
+            self._registrar(nombre, time.perf_counter(), None)
+
+    def terminar(self, nombre="arranque completo"):
+        """Marcar el fin del arranque e imprimir el perfil (solo la primera vez)"""
+        if not self.activo or self._terminado:
+            return
+        self.marcar(nombre)
+        self._terminado = True
+        with self._lock:
+            registros = sorted(self._registros, key=lambda registro: registro[1])
+
+        print("\n⏱️ Perfil de arranque (ms desde el inicio):")
+        print(f"   {'fase':<28}{'inicio':>10}{'duración':>11}  hilo")
+        for fase, inicio, duracion, hilo in registros:
+            texto_duracion = f"{duracion * 1000:>11.1f}" if duracion is not None else f"{'—':>11}"
+            print(f"   {fase:<28}{inicio * 1000:>10.1f}{texto_duracion}  {hilo}")
+
+        if self.ruta:
+            try:
+                with open(self.ruta, "w", encoding="utf-8") as f:
+                    json.dump([
+                        {"fase": fase, "inicio_ms": round(inicio * 1000, 3),
+                         "duracion_ms": None if duracion is None else round(duracion * 1000, 3), "hilo": hilo}
+                        for fase, inicio, duracion, hilo in registros
+                    ], f, ensure_ascii=False, indent=2)
+                print(f"✅ Perfil guardado en {self.ruta}")
+            except OSError as e:
+                print(f"❌ Error al guardar el perfil: {e}")
+
+
+def desde_argumentos(argv=None):
+    """PerfilArranque según la línea de comandos y el entorno"""
+    argv = sys.argv[1:] if argv is None else argv
+    for argumento in argv:
+        if argumento == OPCION:
+            return PerfilArranque(activo=True)
+        if argumento.startswith(OPCION + "="):
+            return PerfilArranque(activo=True, ruta=argumento.split("=", 1)[1])
+    return PerfilArranque(activo=os.environ.get(VARIABLE, "") not in ("", "0"))
+
+
+# Perfil del proceso: lo comparten walletive.py y el DatabaseManager
+PERFIL = desde_argumentos()
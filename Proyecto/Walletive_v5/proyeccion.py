@@ -0,0 +1,145 @@
+"""
+Proyección de metas de ahorro por simulación de Monte Carlo
+Para cada meta activa se simulan miles de trayectorias del ahorro entre hoy y
+su fecha límite, todas a la vez en una matriz de NumPy (trayectorias x
+aportes). Cada aporte sigue la distribución del flujo neto mensual
+(ingresos - gastos) del historial, leído de ResumenPeriodos, y los aportes
+ocurren con la frecuencia de FrecuenciaMeta. La probabilidad de la meta es la
+fracción de trayectorias que alcanzan el objetivo antes del límite.
+
+Los movimientos de tipo meta son aportes a la meta (metas_id): la simulación
+parte de lo ya aportado y solo proyecta lo que falta. Los objetivos que
+guardaba la encuesta anterior como movimiento están en ObjetivosEncuesta y
+no cuentan como aporte. NumPy es opcional (ver analisis.py).
+"""
+
+import math
+from collections import namedtuple
+from datetime import date
+
+from analisis import NUMPY_DISPONIBLE, np
+
+
+TRAYECTORIAS = 10000
+# Meses completos del historial con que se estima el flujo mensual
+MESES_HISTORIAL = 24
+# Con poca historia la dispersión observada no es confiable: se asume al
+# menos esta fracción del flujo medio como desviación estándar
+DISPERSION_MINIMA = 0.15
+DIAS_POR_MES = 365.25 / 12
+DIAS_POR_APORTE = {"semanal": 7, "quincenal": DIAS_POR_MES / 2, "mensual": DIAS_POR_MES}
+
+ProyeccionMeta = namedtuple("ProyeccionMeta", [
+    "meta_id", "descripcion", "objetivo", "fecha_limite", "probabilidad",
+    "mediana_final", "pesimista_final", "meses_mediana",
+])
+
+
+def flujos_mensuales(cursor, meses=MESES_HISTORIAL, hoy=None):
+    """Flujo neto (centavos) de los últimos meses con movimientos, según ResumenPeriodos
+
+    Se excluye el mes en curso mientras haya meses completos: un mes a medias
+    subestimaría el flujo.
+    """
+    hoy = hoy or date.today()
+    cursor.execute("""
+        SELECT inicio, SUM(CASE tipo WHEN 1 THEN total WHEN 2 THEN -total ELSE 0 END)
+        FROM ResumenPeriodos
+        WHERE periodo = 'mes' AND tipo IN (1, 2)
+        GROUP BY inicio
+        HAVING SUM(cantidad) > 0
+        ORDER BY inicio DESC
+        LIMIT ?
+    """, (meses + 1,))
+    filas = cursor.fetchall()
+    mes_actual = hoy.strftime("%Y-%m-01")
+    completos = [neto for inicio, neto in filas if inicio < mes_actual]
+    return list(reversed(completos[:meses] if completos else [neto for _, neto in filas]))
+
+
+def metas_activas(cursor, fuente="Movimientos"):
+    """Metas activas no alcanzadas: (id, descripcion, objetivo, aportado, fecha_limite, frecuencia)
+
+    Objetivo y aportado en centavos; aportado suma los movimientos de tipo
+    meta de fuente (la de ArchivoMovimientos incluye los años archivados).
+    """
+    cursor.execute(f"""
+        SELECT m.id, m.descripcion, m.monto_objetivo, IFNULL(a.aportado, 0), m.fecha_limite,
+               IFNULL(f.frecuencia, 'mensual')
+        FROM MetasAhorro m
+        LEFT JOIN FrecuenciaMeta f ON f.id = m.id
+        LEFT JOIN (
+            SELECT metas_id, SUM(monto) AS aportado
+            FROM {fuente}
+            WHERE tipo = 3 AND metas_id IS NOT NULL
+              AND id NOT IN (SELECT movimiento_id FROM main.ObjetivosEncuesta)
+            GROUP BY metas_id
+        ) a ON a.metas_id = m.id
+        WHERE m.estado_actual = 0 AND m.estado_logro = 0
+        ORDER BY m.fecha_limite
+    """)
+    return cursor.fetchall()
+
+
+def simular_meta(objetivo, pasos, media, desviacion, trayectorias=TRAYECTORIAS, semilla=None):
+    """Simular el ahorro acumulado con aportes ~ Normal(media, desviacion)
+
+    Retorna (probabilidad de alcanzar el objetivo, montos finales, primer paso
+    en que cada trayectoria alcanzó el objetivo o -1).
+    """
+    if pasos <= 0:
+        return 0.0, np.zeros(trayectorias), np.full(trayectorias, -1)
+    generador = np.random.default_rng(semilla)
+    aportes = generador.normal(media, desviacion, size=(trayectorias, pasos))
+    acumulado = np.cumsum(aportes, axis=1)
+    alcanzado = acumulado >= objetivo
+    llego = alcanzado.any(axis=1)
+    # argmax da el primer True de cada fila (0 si no hay ninguno)
+    primer_paso = np.where(llego, alcanzado.argmax(axis=1), -1)
+    return float(llego.mean()), acumulado[:, -1], primer_paso
+
+
+def proyectar_metas(cursor, hoy=None, trayectorias=TRAYECTORIAS, fuente="Movimientos"):
+    """Probabilidad de cumplir cada meta activa a su fecha límite
+
+    Retorna una lista de ProyeccionMeta (montos en centavos, los finales ya
+    incluyen lo aportado). La semilla de cada meta es su id, así el
+    resultado no cambia entre recargas si no cambian los datos.
+    """
+    if not NUMPY_DISPONIBLE:
+        raise RuntimeError("NumPy no está instalado")
+    hoy = hoy or date.today()
+    metas = metas_activas(cursor, fuente)
+    if not metas:
+        return []
+
+    flujos = np.array(flujos_mensuales(cursor, hoy=hoy), dtype=np.float64)
+    media_mensual = float(flujos.mean()) if len(flujos) else 0.0
+    desviacion_mensual = float(flujos.std(ddof=1)) if len(flujos) > 1 else 0.0
+    desviacion_mensual = max(desviacion_mensual, DISPERSION_MINIMA * abs(media_mensual))
+
+    proyecciones = []
+    for meta_id, descripcion, objetivo, aportado, fecha_limite, frecuencia in metas:
+        limite = date.fromisoformat(str(fecha_limite)[:10])
+        if aportado >= objetivo:
+            # Ya se juntó el objetivo aunque la meta no esté marcada como lograda
+            proyecciones.append(ProyeccionMeta(meta_id, descripcion, objetivo, limite, 1.0,
+                                               aportado, aportado, 0.0))
+            continue
+        dias_aporte = DIAS_POR_APORTE.get(str(frecuencia).lower(), DIAS_POR_MES)
+        pasos = max(0, math.floor((limite - hoy).days / dias_aporte))
+        # Los aportes de un período más corto que el mes reparten media y varianza
+        fraccion = dias_aporte / DIAS_POR_MES
+        probabilidad, finales, primer_paso = simular_meta(
+            objetivo - aportado, pasos,
+            media_mensual * fraccion, desviacion_mensual * math.sqrt(fraccion),
+            trayectorias, semilla=meta_id,
+        )
+        finales = finales + aportado
+        llegaron = primer_paso[primer_paso >= 0]
+        meses_mediana = (float(np.median(llegaron) + 1) * fraccion) if len(llegaron) else None
+        proyecciones.append(ProyeccionMeta(
+            meta_id, descripcion, objetivo, limite, probabilidad,
+            int(np.median(finales)), int(np.percentile(finales, 10)), meses_mediana,
+        ))
+    return proyecciones
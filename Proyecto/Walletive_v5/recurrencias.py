@@ -0,0 +1,242 @@
+"""
+Movimientos recurrentes de Walletive
+Una regla de Recurrencias describe un movimiento que se repite (sueldo,
+arriendo, aporte a una meta) con una frecuencia del mismo vocabulario que
+FrecuenciaMeta ('semanal', 'mensual', ...). ProgramadorRecurrencias guarda
+las reglas activas en un min-heap ordenado por la próxima fecha: en cada
+pasada solo se sacan del heap las reglas vencidas, se generan todas sus
+ocurrencias pendientes y se insertan en una sola transacción. Si nada está
+vencido, la pasada no toca la base.
+
+La k-ésima ocurrencia se calcula desde la fecha de inicio (no sumando a la
+anterior), así una regla del 31 cae el 28/29 en febrero y vuelve al 31 en marzo.
+"""
+
+import calendar
+import heapq
+import threading
+import unicodedata
+from collections import namedtuple
+from datetime import date, timedelta
+
+
+# Frecuencia -> (días, meses) entre ocurrencias
+FRECUENCIAS = {
+    "diaria": (1, 0),
+    "semanal": (7, 0),
+    "quincenal": (15, 0),
+    "mensual": (0, 1),
+    "bimestral": (0, 2),
+    "trimestral": (0, 3),
+    "semestral": (0, 6),
+    "anual": (0, 12),
+}
+
+# Tope de ocurrencias por regla en una pasada (una regla diaria olvidada años)
+MAXIMO_POR_PASADA = 400
+
+ESQUEMA_RECURRENCIAS = [
+    """
+    CREATE TABLE IF NOT EXISTS Recurrencias (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)),
+        descripcion TEXT,
+        monto INTEGER NOT NULL, -- centavos
+        categoria_id INTEGER CHECK (categoria_id IN (1, 2, 3, 4, 5)),
+        metas_id INTEGER,
+        frecuencia TEXT NOT NULL,
+        inicio TEXT NOT NULL, -- YYYY-MM-DD de la primera ocurrencia
+        hasta TEXT, -- última fecha posible (NULL = sin fin)
+        ocurrencias INTEGER NOT NULL DEFAULT 0, -- ya materializadas
+        proxima TEXT, -- YYYY-MM-DD de la siguiente (NULL = terminada)
+        activa INTEGER NOT NULL DEFAULT 1 CHECK (activa IN (0, 1)),
+        FOREIGN KEY (metas_id) REFERENCES MetasAhorro(id) ON DELETE CASCADE
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_recurrencias_proxima
+    ON Recurrencias (activa, proxima)
+    """,
+]
+
+Recurrencia = namedtuple("Recurrencia", [
+    "id", "tipo", "descripcion", "monto", "categoria_id", "metas_id",
+    "frecuencia", "inicio", "hasta", "ocurrencias", "proxima",
+])
+_COLUMNAS = ", ".join(Recurrencia._fields)
+
+
+def crear_recurrencias(cursor):
+    """Crear la tabla de reglas recurrentes"""
+    for sentencia in ESQUEMA_RECURRENCIAS:
+        cursor.execute(sentencia)
+
+
+def normalizar_frecuencia(texto):
+    """'Mensual', 'MENSUAL ', 'Díaria' -> clave de FRECUENCIAS (ValueError si no se reconoce)"""
+    limpio = unicodedata.normalize("NFKD", str(texto or "")).encode("ascii", "ignore").decode().strip().lower()
+    if limpio not in FRECUENCIAS:
+        raise ValueError(f"Frecuencia desconocida: {texto}")
+    return limpio
+
+
+def _sumar_meses(dia, meses):
+    """Misma fecha n meses después, ajustada al último día si el mes es más corto"""
+    total = dia.month - 1 + meses
+    anio, mes = dia.year + total // 12, total % 12 + 1
+    return date(anio, mes, min(dia.day, calendar.monthrange(anio, mes)[1]))
+
+
+def ocurrencia(inicio, frecuencia, numero):
+    """Fecha de la ocurrencia número `numero` (desde 0) de una regla"""
+    dias, meses = FRECUENCIAS[frecuencia]
+    if meses:
+        return _sumar_meses(inicio, meses * numero)
+    return inicio + timedelta(days=dias * numero)
+
+
+def _fecha(texto):
+    return date.fromisoformat(str(texto)[:10]) if texto else None
+
+
+class ProgramadorRecurrencias:
+    """Min-heap de (próxima fecha, id) de las reglas activas
+
+    Las reglas cambiadas o desactivadas dejan entradas viejas en el heap; se
+    descartan al sacarlas porque su fecha ya no coincide con la de la regla.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []
+        self._reglas = {}
+        self.cargado = False
+
+    def cargar(self, cursor):
+        """Leer todas las reglas activas (al arrancar)"""
+        cursor.execute(f"""
+            SELECT {_COLUMNAS} FROM Recurrencias
+            WHERE activa = 1 AND proxima IS NOT NULL
+        """)
+        with self._lock:
+            self._reglas = {}
+            self._heap = []
+            for fila in cursor.fetchall():
+                self._agregar(Recurrencia(*fila))
+            heapq.heapify(self._heap)
+            self.cargado = True
+
+    def _agregar(self, regla):
+        self._reglas[regla.id] = regla
+        self._heap.append((regla.proxima, regla.id))
+
+    def programar(self, regla):
+        """Agregar o reemplazar una regla (después de guardarla en la tabla)"""
+        with self._lock:
+            if regla.proxima is None:
+                self._reglas.pop(regla.id, None)
+                return
+            self._reglas[regla.id] = regla
+            heapq.heappush(self._heap, (regla.proxima, regla.id))
+
+    def quitar(self, regla_id):
+        with self._lock:
+            self._reglas.pop(regla_id, None)
+
+    def siguiente(self):
+        """Fecha (texto) de la próxima ocurrencia de cualquier regla, o None"""
+        with self._lock:
+            self._limpiar_tope()
+            return self._heap[0][0] if self._heap else None
+
+    def _limpiar_tope(self):
+        while self._heap:
+            proxima, regla_id = self._heap[0]
+            regla = self._reglas.get(regla_id)
+            if regla is not None and regla.proxima == proxima:
+                return
+            heapq.heappop(self._heap)
+
+    def hay_vencidas(self, hoy):
+        proxima = self.siguiente()
+        return proxima is not None and proxima <= str(hoy)
+
+    def materializar(self, cursor, hoy=None):
+        """Insertar las ocurrencias vencidas hasta hoy (dentro de una transacción)
+
+        Retorna la cantidad de movimientos creados.
+        """
+        hoy = hoy or date.today()
+        with self._lock:
+            vencidas, tomadas = [], set()
+            self._limpiar_tope()
+            while self._heap and self._heap[0][0] <= str(hoy):
+                _, regla_id = heapq.heappop(self._heap)
+                # Programada dos veces con la misma fecha: dos entradas válidas, una sola regla
+                if regla_id not in tomadas:
+                    tomadas.add(regla_id)
+                    vencidas.append(self._reglas[regla_id])
+                self._limpiar_tope()
+
+        movimientos, actualizadas = [], []
+        for regla in vencidas:
+            inicio, hasta = _fecha(regla.inicio), _fecha(regla.hasta)
+            numero = regla.ocurrencias
+            fechas = []
+            while len(fechas) < MAXIMO_POR_PASADA:
+                dia = ocurrencia(inicio, regla.frecuencia, numero)
+                if dia > hoy or (hasta is not None and dia > hasta):
+                    break
+                fechas.append(dia)
+                numero += 1
+            siguiente = ocurrencia(inicio, regla.frecuencia, numero)
+            proxima = None if hasta is not None and siguiente > hasta else str(siguiente)
+
+            # Solo si nadie la materializó antes (otro proceso o una pasada anterior)
+            cursor.execute("""
+                UPDATE Recurrencias SET ocurrencias = ?, proxima = ?
+                WHERE id = ? AND ocurrencias = ? AND activa = 1
+            """, (numero, proxima, regla.id, regla.ocurrencias))
+            if cursor.rowcount != 1:
+                # La tabla cambió por fuera del heap: releerla en la próxima pasada
+                self.cargado = False
+                continue
+            movimientos.extend(
+                (regla.tipo, regla.descripcion, regla.monto, regla.categoria_id, f"{dia} 00:00:00", regla.metas_id)
+                for dia in fechas
+            )
+            actualizadas.append(regla._replace(ocurrencias=numero, proxima=proxima))
+
+        if movimientos:
+            cursor.executemany("""
+                INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha, metas_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, movimientos)
+        # El heap se actualiza al final; si la transacción falla hay que recargar
+        for regla in actualizadas:
+            self.programar(regla)
+        return len(movimientos)
+
+
+def insertar_recurrencia(cursor, tipo, descripcion, monto, frecuencia, inicio,
+                         categoria_id=None, metas_id=None, hasta=None):
+    """Guardar una regla nueva (monto en centavos) y retornarla como Recurrencia"""
+    frecuencia = normalizar_frecuencia(frecuencia)
+    inicio = _fecha(inicio)
+    hasta = _fecha(hasta)
+    proxima = None if hasta is not None and inicio > hasta else str(inicio)
+    cursor.execute("""
+        INSERT INTO Recurrencias (tipo, descripcion, monto, categoria_id, metas_id,
+                                  frecuencia, inicio, hasta, proxima)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (tipo, descripcion, monto, categoria_id, metas_id, frecuencia, str(inicio),
+          str(hasta) if hasta else None, proxima))
+    return Recurrencia(cursor.lastrowid, tipo, descripcion, monto, categoria_id, metas_id,
+                       frecuencia, str(inicio), str(hasta) if hasta else None, 0, proxima)
+
+
+def frecuencia_meta(cursor, meta_id):
+    """Frecuencia de aportes de una meta según FrecuenciaMeta (mensual si no tiene)"""
+    cursor.execute("SELECT frecuencia FROM FrecuenciaMeta WHERE id = ?", (meta_id,))
+    fila = cursor.fetchone()
+    return normalizar_frecuencia(fila[0]) if fila and fila[0] else "mensual"
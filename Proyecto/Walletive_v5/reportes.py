@@ -0,0 +1,263 @@
+"""
+Motor de reportes de Walletive
+ResumenPeriodos acumula total y cantidad de movimientos por período (día,
+semana, mes y año), tipo y categoría. Los triggers la mantienen al escribir
+en Movimientos, así un reporte lee una fila por período y categoría en
+lugar de agrupar todo el historial: su costo depende de cuántos períodos
+muestra, no de cuántos movimientos hay. Todos los totales están en centavos.
+
+Para bases existentes: python reportes.py backfill [ruta.db]
+"""
+
+import sys
+
+# Inicio de cada período calculado en SQLite a partir de la fecha del movimiento
+# (las semanas empiezan el lunes)
+PERIODOS = {
+    "dia": "date({fecha})",
+    "semana": "date({fecha}, 'weekday 0', '-6 days')",
+    "mes": "date({fecha}, 'start of month')",
+    "anio": "date({fecha}, 'start of year')",
+}
+
+
+ESQUEMA_REPORTES = [
+    """
+    CREATE TABLE IF NOT EXISTS ResumenPeriodos (
+        periodo TEXT NOT NULL CHECK (periodo IN ('dia', 'semana', 'mes', 'anio')),
+        inicio TEXT NOT NULL, -- YYYY-MM-DD del primer día del período
+        tipo INTEGER NOT NULL,
+        categoria_id INTEGER NOT NULL, -- 0 = sin categoría
+        total INTEGER NOT NULL DEFAULT 0,
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (periodo, inicio, tipo, categoria_id)
+    ) WITHOUT ROWID;
+    """,
+]
+
+
+def _claves(fila):
+    """(periodo, expresión de inicio) para NEW u OLD"""
+    return [(periodo, expresion.format(fecha=f"{fila}.fecha")) for periodo, expresion in PERIODOS.items()]
+
+
+def _sembrar(fila):
+    """Crear en cero las filas de los cuatro períodos del movimiento"""
+    valores = ",\n            ".join(
+        f"('{periodo}', {inicio}, {fila}.tipo, IFNULL({fila}.categoria_id, 0))"
+        for periodo, inicio in _claves(fila)
+    )
+    return f"""
+        INSERT OR IGNORE INTO ResumenPeriodos (periodo, inicio, tipo, categoria_id)
+        VALUES {valores};
+    """
+
+
+def _sumar(fila, signo):
+    """Sumar (o restar) el movimiento a sus cuatro períodos, cada uno por clave primaria"""
+    return "".join(f"""
+        UPDATE ResumenPeriodos
+           SET total = total {signo} {fila}.monto, cantidad = cantidad {signo} 1
+         WHERE periodo = '{periodo}' AND inicio = {inicio}
+           AND tipo = {fila}.tipo AND categoria_id = IFNULL({fila}.categoria_id, 0);
+    """ for periodo, inicio in _claves(fila))
+
+
+TRIGGERS_REPORTES = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_periodos_mov_insert
+    AFTER INSERT ON Movimientos
+    BEGIN
+        {_sembrar("NEW")}
+        {_sumar("NEW", "+")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_periodos_mov_delete
+    AFTER DELETE ON Movimientos
+    BEGIN
+        {_sumar("OLD", "-")}
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_periodos_mov_update
+    AFTER UPDATE OF tipo, monto, categoria_id, fecha ON Movimientos
+    BEGIN
+        {_sumar("OLD", "-")}
+        {_sembrar("NEW")}
+        {_sumar("NEW", "+")}
+    END;
+    """,
+]
+
+
+def eliminar_reportes(cursor):
+    """Eliminar la tabla de períodos y sus triggers"""
+    for trigger in ("trg_periodos_mov_insert", "trg_periodos_mov_delete", "trg_periodos_mov_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS ResumenPeriodos")
+
+
+def crear_reportes(cursor):
+    """Crear tabla y triggers de períodos; retorna True si la tabla es nueva"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ResumenPeriodos'")
+    nueva = cursor.fetchone() is None
+
+    for sentencia in ESQUEMA_REPORTES + TRIGGERS_REPORTES:
+        cursor.execute(sentencia)
+
+    if nueva:
+        reconstruir_periodos(cursor)
+    return nueva
+
+
+def reconstruir_periodos(cursor, fuente="Movimientos"):
+    """Recalcular (backfill) todos los períodos a partir de Movimientos (o de otra fuente)
+
+    Primero se agrupa por día y los demás períodos se derivan de esos días,
+    así Movimientos se recorre una sola vez.
+    """
+    cursor.execute("DELETE FROM ResumenPeriodos")
+    cursor.execute(f"""
+        INSERT INTO ResumenPeriodos (periodo, inicio, tipo, categoria_id, total, cantidad)
+        SELECT 'dia', {PERIODOS['dia'].format(fecha='fecha')}, tipo, IFNULL(categoria_id, 0),
+               SUM(monto), COUNT(*)
+        FROM {fuente}
+        WHERE fecha IS NOT NULL
+        GROUP BY 2, 3, 4
+    """)
+    for periodo in ("semana", "mes", "anio"):
+        cursor.execute(f"""
+            INSERT INTO ResumenPeriodos (periodo, inicio, tipo, categoria_id, total, cantidad)
+            SELECT ?, {PERIODOS[periodo].format(fecha='inicio')}, tipo, categoria_id,
+                   SUM(total), SUM(cantidad)
+            FROM ResumenPeriodos
+            WHERE periodo = 'dia'
+            GROUP BY 2, 3, 4
+        """, (periodo,))
+
+
+def _rango(periodo, desde, hasta):
+    """Condiciones sobre inicio para los períodos que tocan [desde, hasta]"""
+    condiciones, parametros = ["periodo = ?"], [periodo]
+    if desde:
+        # El período que contiene a desde empieza antes que desde
+        condiciones.append(f"inicio >= {PERIODOS[periodo].format(fecha='?')}")
+        parametros.append(str(desde)[:10])
+    if hasta:
+        condiciones.append("inicio <= ?")
+        parametros.append(str(hasta)[:10])
+    return condiciones, parametros
+
+
+def reporte_periodos(cursor, periodo="mes", desde=None, hasta=None, categoria_id=None):
+    """Totales por período: lista de dicts con inicio, ingresos, gastos, metas, balance y cantidad"""
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período desconocido: {periodo}")
+    condiciones, parametros = _rango(periodo, desde, hasta)
+    if categoria_id is not None:
+        condiciones.append("categoria_id = ?")
+        parametros.append(categoria_id)
+    cursor.execute(f"""
+        SELECT inicio, tipo, SUM(total), SUM(cantidad)
+        FROM ResumenPeriodos
+        WHERE {' AND '.join(condiciones)}
+        GROUP BY inicio, tipo
+        ORDER BY inicio
+    """, parametros)
+
+    filas = {}
+    for inicio, tipo, total, cantidad in cursor.fetchall():
+        fila = filas.setdefault(inicio, {"inicio": inicio, "ingresos": 0, "gastos": 0,
+                                         "metas": 0, "balance": 0, "cantidad": 0})
+        campo = {1: "ingresos", 2: "gastos", 3: "metas"}.get(tipo)
+        if campo:
+            fila[campo] += total
+        fila["cantidad"] += cantidad
+    for fila in filas.values():
+        fila["balance"] = fila["ingresos"] - fila["gastos"]
+    return [fila for fila in filas.values() if fila["cantidad"]]
+
+
+def reporte_categorias(cursor, tipo=2, periodo="mes", desde=None, hasta=None):
+    """Total por categoría de un tipo en un rango: lista de (categoria_id, total, cantidad)
+
+    Usa el período más grueso que se pida: con el mes bastan ~12 filas por año
+    y categoría.
+    """
+    if periodo not in PERIODOS:
+        raise ValueError(f"Período desconocido: {periodo}")
+    condiciones, parametros = _rango(periodo, desde, hasta)
+    condiciones.append("tipo = ?")
+    parametros.append(tipo)
+    cursor.execute(f"""
+        SELECT categoria_id, SUM(total), SUM(cantidad)
+        FROM ResumenPeriodos
+        WHERE {' AND '.join(condiciones)}
+        GROUP BY categoria_id
+        HAVING SUM(cantidad) > 0
+        ORDER BY SUM(total) DESC
+    """, parametros)
+    return cursor.fetchall()
+
+
+def verificar_periodos(cursor, periodo="mes", fuente="Movimientos"):
+    """Comparar un nivel de ResumenPeriodos contra Movimientos
+
+    Retorna las diferencias con la misma forma que verificar_resumenes (la
+    clave es (periodo, inicio, tipo, categoria_id)).
+    """
+    inicio = PERIODOS[periodo].format(fecha="fecha")
+    cursor.execute(f"""
+        SELECT {inicio}, tipo, IFNULL(categoria_id, 0), SUM(monto), COUNT(*)
+        FROM {fuente}
+        WHERE fecha IS NOT NULL
+        GROUP BY 1, 2, 3
+    """)
+    reales = {fila[:3]: fila[3:] for fila in cursor.fetchall()}
+    cursor.execute("""
+        SELECT inicio, tipo, categoria_id, total, cantidad
+        FROM ResumenPeriodos
+        WHERE periodo = ? AND cantidad <> 0
+    """, (periodo,))
+    cache = {fila[:3]: fila[3:] for fila in cursor.fetchall()}
+    return [
+        {"tabla": "ResumenPeriodos", "clave": (periodo,) + clave, "cache": cache.get(clave), "real": reales.get(clave)}
+        for clave in sorted(set(reales) | set(cache)) if reales.get(clave) != cache.get(clave)
+    ]
+
+
+def main(argv=None):
+    """Backfill de ResumenPeriodos para una base existente (incluye los años archivados)"""
+    from archivo import ArchivoMovimientos
+    from db_connection import ConnectionManager
+    from migraciones import aplicar_migraciones
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != "backfill":
+        print("Uso: python reportes.py backfill [ruta.db]")
+        return 1
+    ruta = argv[1] if len(argv) > 1 else "walletive.db"
+
+    conexiones = ConnectionManager(ruta)
+    try:
+        aplicar_migraciones(conexiones)
+        print(f"🔄 Recalculando períodos de {ruta}...")
+        with conexiones.lectura(instantanea=False) as cursor:
+            fuente, adjuntos = ArchivoMovimientos(ruta).fuente_movimientos(cursor)
+        with conexiones.adjuntar(adjuntos), conexiones.transaccion() as cursor:
+            reconstruir_periodos(cursor, fuente)
+            cursor.execute("SELECT periodo, COUNT(*) FROM ResumenPeriodos GROUP BY periodo")
+            for periodo, filas in cursor.fetchall():
+                print(f"   - {periodo}: {filas} filas")
+        print("✅ Períodos recalculados")
+        return 0
+    except Exception as e:
+        print(f"❌ Error al recalcular períodos: {e}")
+        return 1
+    finally:
+        conexiones.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
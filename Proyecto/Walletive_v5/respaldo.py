@@ -0,0 +1,386 @@
+"""
+Respaldos en línea de la base de datos de Walletive
+La copia usa la API de backup de SQLite (sqlite3.Connection.backup) desde
+un lector con una transacción de lectura abierta: copia una instantánea
+consistente por tandas de páginas, con una pausa entre tandas, mientras el
+escritor sigue confirmando en el -wal. Ni la interfaz ni las escrituras
+esperan a que termine.
+
+Los años archivados (archivo.py) son parte de la base: sus archivos se
+adjuntan al mismo lector y se copian dentro de la misma transacción de
+lectura, así la base principal y sus particiones quedan de un mismo
+instante. Todo se verifica junto (quick_check de cada archivo y las filas
+de cada partición contra Particiones) y se empaqueta en un solo
+<base>_AAAAMMDD_HHMMSS.tar.gz en la carpeta de respaldos. La retención
+conserva los más recientes y el último de cada día, semana y mes hasta los
+límites configurados; el resto se borra.
+
+Restaurar extrae el respaldo en una carpeta temporal, verifica el conjunto
+y recién entonces copia cada base sobre la suya con la misma API (así el
+-wal de la base queda coherente). Los respaldos de un solo archivo
+(<base>_....db.gz, anteriores a los años archivados) se siguen pudiendo
+restaurar. La aplicación debe estar cerrada. Uso desde la terminal:
+    python respaldo.py respaldar [ruta.db]
+    python respaldo.py restaurar <respaldo.tar.gz> [ruta.db]
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tarfile
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from archivo import MAXIMO_ADJUNTAS
+from migraciones import VERSION_ESQUEMA
+
+
+# Páginas copiadas por tanda y pausa (segundos) entre tandas
+PAGINAS_POR_PASO = 256
+PAUSA_ENTRE_PASOS = 0.01
+DIRECTORIO_RESPALDOS = "respaldos"
+# Horas entre respaldos automáticos
+HORAS_ENTRE_RESPALDOS = 24
+
+# Retención: los N más recientes y el último de cada uno de los N días,
+# semanas y meses más recientes con respaldos
+Retencion = namedtuple("Retencion", ["recientes", "diarios", "semanales", "mensuales"])
+RETENCION_POR_DEFECTO = Retencion(recientes=3, diarios=7, semanales=4, mensuales=12)
+
+# Tablas que un respaldo debe tener para poder restaurarse
+TABLAS_REQUERIDAS = ("Movimientos", "MetasAhorro", "FrecuenciaMeta")
+
+_FORMATO_FECHA = "%Y%m%d_%H%M%S"
+# Nombre de la base principal dentro del .tar (las particiones van con el suyo)
+NOMBRE_PRINCIPAL = "principal.db"
+
+Respaldo = namedtuple("Respaldo", ["fecha", "ruta"])
+
+
+class RespaldoInvalido(Exception):
+    """El archivo de respaldo está dañado o no es una base de Walletive"""
+
+
+def prefijo_base(db_path):
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+
+def listar_respaldos(directorio, prefijo):
+    """Respaldos de una base en la carpeta, los más recientes primero"""
+    patron = re.compile(rf"^{re.escape(prefijo)}_(\d{{8}}_\d{{6}})\.(db|tar)(\.gz)?$")
+    respaldos = []
+    try:
+        nombres = os.listdir(directorio)
+    except FileNotFoundError:
+        return []
+    for nombre in nombres:
+        coincidencia = patron.match(nombre)
+        if coincidencia:
+            fecha = datetime.strptime(coincidencia.group(1), _FORMATO_FECHA)
+            respaldos.append(Respaldo(fecha, os.path.join(directorio, nombre)))
+    return sorted(respaldos, reverse=True)
+
+
+def verificar_base(ruta):
+    """Comprobar integridad, versión de esquema y tablas de una base
+
+    Retorna la versión de esquema; lanza RespaldoInvalido si algo falla.
+    """
+    try:
+        conn = sqlite3.connect(ruta, isolation_level=None)
+    except sqlite3.Error as e:
+        raise RespaldoInvalido(f"No se pudo abrir {ruta}: {e}") from e
+    try:
+        resultado = conn.execute("PRAGMA quick_check").fetchall()
+        if resultado != [("ok",)]:
+            raise RespaldoInvalido(f"{ruta} está dañada: {resultado[0][0]}")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > VERSION_ESQUEMA:
+            raise RespaldoInvalido(f"{ruta} tiene el esquema v{version}, más nuevo que esta versión de Walletive")
+        tablas = {nombre for nombre, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        faltantes = [tabla for tabla in TABLAS_REQUERIDAS if tabla not in tablas]
+        if faltantes:
+            raise RespaldoInvalido(f"A {ruta} le faltan las tablas {', '.join(faltantes)}")
+        return version
+    except sqlite3.DatabaseError as e:
+        raise RespaldoInvalido(f"{ruta} no es una base SQLite válida: {e}") from e
+    finally:
+        conn.close()
+
+
+def _particiones(ruta):
+    """(año, archivo, filas) de los años archivados registrados en una base"""
+    conn = sqlite3.connect(ruta, isolation_level=None)
+    try:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Particiones'").fetchone() is None:
+            return []
+        return conn.execute("SELECT anio, archivo, filas FROM Particiones ORDER BY anio").fetchall()
+    finally:
+        conn.close()
+
+
+def verificar_particiones(ruta_principal, directorio):
+    """Comprobar que cada año registrado en la base tenga su archivo sano y completo
+
+    directorio es donde están los archivos de los años. Retorna
+    [(archivo, ruta)]; lanza RespaldoInvalido si falta o no cuadra alguno.
+    """
+    archivos = []
+    for anio, archivo, filas in _particiones(ruta_principal):
+        if os.path.basename(archivo) != archivo:
+            raise RespaldoInvalido(f"Nombre de archivo inválido para {anio}: {archivo}")
+        ruta = os.path.join(directorio, archivo)
+        if not os.path.exists(ruta):
+            raise RespaldoInvalido(f"Falta {archivo}, con los movimientos archivados de {anio}")
+        conn = sqlite3.connect(ruta, isolation_level=None)
+        try:
+            resultado = conn.execute("PRAGMA quick_check").fetchall()
+            if resultado != [("ok",)]:
+                raise RespaldoInvalido(f"{archivo} está dañado: {resultado[0][0]}")
+            encontradas = conn.execute("SELECT COUNT(*) FROM Movimientos").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            raise RespaldoInvalido(f"{archivo} no es un archivo de movimientos válido: {e}") from e
+        finally:
+            conn.close()
+        if encontradas != filas:
+            raise RespaldoInvalido(f"{archivo} tiene {encontradas} movimientos y se registraron {filas}")
+        archivos.append((archivo, ruta))
+    return archivos
+
+
+def _copiar(origen, ruta_destino, paginas, pausa, progreso=None, esquema="main"):
+    """Copiar una base (main o un alias adjuntado) de una conexión a un archivo nuevo, por tandas de páginas"""
+    destino = sqlite3.connect(ruta_destino)
+    try:
+        def avance(estado, restantes, total):
+            if progreso:
+                progreso(total - restantes, total)
+            # backup() solo duerme si la base está ocupada: la pausa entre tandas va aquí
+            if restantes and pausa:
+                time.sleep(pausa)
+        origen.backup(destino, pages=paginas, progress=avance, name=esquema)
+        # Un respaldo no necesita -wal: queda como un único archivo
+        destino.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        destino.close()
+
+
+def _empaquetar(archivos, ruta_tar, comprimir):
+    """Juntar [(nombre, ruta)] en un .tar (comprimido con gzip si se pide)"""
+    opciones = {"mode": "w:gz", "compresslevel": 6} if comprimir else {"mode": "w"}
+    with tarfile.open(ruta_tar, **opciones) as tar:
+        for nombre, ruta in archivos:
+            tar.add(ruta, arcname=nombre)
+
+
+def _desempaquetar(ruta_tar, directorio):
+    """Extraer solo archivos planos .db del respaldo (sin rutas ni enlaces)"""
+    try:
+        with tarfile.open(ruta_tar, "r:*") as tar:
+            for miembro in tar.getmembers():
+                if not miembro.isfile() or os.path.basename(miembro.name) != miembro.name \
+                        or not miembro.name.endswith(".db"):
+                    raise RespaldoInvalido(f"{ruta_tar} contiene una entrada inesperada: {miembro.name}")
+                with tar.extractfile(miembro) as entrada, open(os.path.join(directorio, miembro.name), "wb") as salida:
+                    shutil.copyfileobj(entrada, salida, 1024 * 1024)
+    except (tarfile.TarError, OSError, EOFError) as e:
+        raise RespaldoInvalido(f"No se pudo leer {ruta_tar}: {e}") from e
+
+
+def _descomprimir(ruta_gz, ruta):
+    try:
+        with gzip.open(ruta_gz, "rb") as entrada, open(ruta, "wb") as salida:
+            shutil.copyfileobj(entrada, salida, 1024 * 1024)
+    except (OSError, EOFError) as e:
+        raise RespaldoInvalido(f"No se pudo descomprimir {ruta_gz}: {e}") from e
+
+
+def _borrar(*rutas):
+    for ruta in rutas:
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+
+
+def _restaurar_archivo(origen_ruta, destino_ruta, paginas):
+    """Copiar una base verificada sobre otra con la API de backup"""
+    origen = sqlite3.connect(origen_ruta)
+    destino = sqlite3.connect(destino_ruta, isolation_level=None)
+    try:
+        origen.backup(destino, pages=paginas)
+        if destino.execute("PRAGMA quick_check").fetchall() != [("ok",)]:
+            raise RuntimeError(f"La base restaurada en {destino_ruta} no pasó la verificación")
+        if destino.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            destino.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        origen.close()
+        destino.close()
+
+
+def respaldar(conexiones, directorio=DIRECTORIO_RESPALDOS, paginas=PAGINAS_POR_PASO,
+              pausa=PAUSA_ENTRE_PASOS, comprimir=True, progreso=None, ahora=None):
+    """Respaldar en línea la base de un ConnectionManager junto con sus años archivados
+
+    progreso(paginas_copiadas, paginas_totales) se llama después de cada
+    tanda (de cada archivo). Retorna la ruta del respaldo.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ahora = ahora or datetime.now()
+    nombre = f"{prefijo_base(conexiones.db_path)}_{ahora.strftime(_FORMATO_FECHA)}.tar"
+    final = os.path.join(directorio, nombre + (".gz" if comprimir else ""))
+    temporal = os.path.join(directorio, nombre + ".parcial")
+    carpeta = temporal + ".d"
+    directorio_base = os.path.dirname(os.path.abspath(conexiones.db_path))
+
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        principal = os.path.join(carpeta, NOMBRE_PRINCIPAL)
+        with conexiones.lectura(instantanea=False) as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'Particiones'")
+            hay_registro = cursor.fetchone() is not None
+            if hay_registro:
+                cursor.execute("SELECT anio, archivo FROM Particiones ORDER BY anio")
+            registradas = cursor.fetchall() if hay_registro else []
+        if len(registradas) > MAXIMO_ADJUNTAS:
+            raise RuntimeError(f"La base tiene {len(registradas)} años archivados "
+                               f"(SQLite adjunta como máximo {MAXIMO_ADJUNTAS} en un mismo respaldo)")
+        adjuntos = {f"archivo_{anio}": os.path.join(directorio_base, archivo) for anio, archivo in registradas}
+
+        with conexiones.lectura(adjuntos=adjuntos) as cursor:
+            # Fijar la instantánea de cada base: las escrituras posteriores no
+            # reinician la copia ni cambian lo que se copia
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master")
+            cursor.fetchone()
+            if hay_registro:
+                cursor.execute("SELECT anio, archivo FROM Particiones ORDER BY anio")
+                if cursor.fetchall() != registradas:
+                    raise RuntimeError("Se archivó un año mientras empezaba el respaldo; vuelve a intentarlo")
+            for alias in adjuntos:
+                cursor.execute(f"SELECT COUNT(*) FROM {alias}.sqlite_master")
+                cursor.fetchone()
+            _copiar(cursor.connection, principal, paginas, pausa, progreso)
+            for (anio, archivo), alias in zip(registradas, adjuntos):
+                _copiar(cursor.connection, os.path.join(carpeta, archivo), paginas, pausa, progreso, esquema=alias)
+
+        verificar_base(principal)
+        archivos = [(NOMBRE_PRINCIPAL, principal)] + verificar_particiones(principal, carpeta)
+        _empaquetar(archivos, temporal, comprimir)
+        os.replace(temporal, final)
+    finally:
+        _borrar(temporal)
+        shutil.rmtree(carpeta, ignore_errors=True)
+    return final
+
+
+def aplicar_retencion(directorio, prefijo, retencion=RETENCION_POR_DEFECTO):
+    """Borrar los respaldos que la política no conserva; retorna los borrados"""
+    respaldos = listar_respaldos(directorio, prefijo)
+    conservar = set(respaldos[:retencion.recientes])
+    for cantidad, clave in (
+        (retencion.diarios, lambda fecha: fecha.date()),
+        (retencion.semanales, lambda fecha: fecha.isocalendar()[:2]),
+        (retencion.mensuales, lambda fecha: (fecha.year, fecha.month)),
+    ):
+        vistos = set()
+        for respaldo in respaldos:  # del más reciente al más viejo
+            periodo = clave(respaldo.fecha)
+            if periodo in vistos:
+                continue
+            if len(vistos) >= cantidad:
+                break
+            vistos.add(periodo)
+            conservar.add(respaldo)
+
+    borrados = [respaldo for respaldo in respaldos if respaldo not in conservar]
+    for respaldo in borrados:
+        _borrar(respaldo.ruta)
+    return borrados
+
+
+def restaurar(ruta_respaldo, db_path, paginas=PAGINAS_POR_PASO):
+    """Reemplazar el contenido de una base y sus años archivados por un respaldo verificado
+
+    Ninguna otra conexión debe estar usando la base. Primero se verifica
+    todo el respaldo; si algo no sirve se lanza RespaldoInvalido y no se
+    toca nada. Los archivos de años que el respaldo no registra (archivados
+    después) se renombran con el sufijo .antes_de_restaurar: sus
+    movimientos vuelven a estar en la base principal. Retorna la versión de
+    esquema restaurada.
+    """
+    directorio_base = os.path.dirname(os.path.abspath(db_path))
+    carpeta = f"{db_path}.restaurando"
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        principal = os.path.join(carpeta, NOMBRE_PRINCIPAL)
+        if re.search(r"\.tar(\.gz)?$", ruta_respaldo):
+            _desempaquetar(ruta_respaldo, carpeta)
+            if not os.path.exists(principal):
+                raise RespaldoInvalido(f"{ruta_respaldo} no contiene {NOMBRE_PRINCIPAL}")
+            directorio_particiones = carpeta
+        else:
+            # Respaldo de un solo archivo: sus años archivados solo pueden ser los que están junto a la base
+            if ruta_respaldo.endswith(".gz"):
+                _descomprimir(ruta_respaldo, principal)
+            else:
+                shutil.copyfile(ruta_respaldo, principal)
+            directorio_particiones = directorio_base
+        version = verificar_base(principal)
+        particiones = verificar_particiones(principal, directorio_particiones)
+
+        _restaurar_archivo(principal, db_path, paginas)
+        if directorio_particiones == carpeta:
+            for archivo, ruta in particiones:
+                _restaurar_archivo(ruta, os.path.join(directorio_base, archivo), paginas)
+
+        prefijo = re.escape(prefijo_base(db_path))
+        restauradas = {archivo for archivo, _ in particiones}
+        for nombre in os.listdir(directorio_base):
+            if re.match(rf"^{prefijo}_\d{{4}}\.db$", nombre) and nombre not in restauradas:
+                ruta = os.path.join(directorio_base, nombre)
+                os.replace(ruta, ruta + ".antes_de_restaurar")
+        return version
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def main(argv=None):
+    """Respaldar o restaurar una base desde la terminal"""
+    from db_connection import ConnectionManager
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("respaldar", "restaurar") or (argv[0] == "restaurar" and len(argv) < 2):
+        print("Uso: python respaldo.py respaldar [ruta.db]")
+        print("     python respaldo.py restaurar <respaldo.tar.gz> [ruta.db]")
+        return 1
+
+    try:
+        if argv[0] == "respaldar":
+            ruta = argv[1] if len(argv) > 1 else "walletive.db"
+            conexiones = ConnectionManager(ruta)
+            try:
+                directorio = os.path.join(os.path.dirname(os.path.abspath(ruta)), DIRECTORIO_RESPALDOS)
+                destino = respaldar(conexiones, directorio)
+                borrados = aplicar_retencion(directorio, prefijo_base(ruta))
+            finally:
+                conexiones.cerrar()
+            print(f"✅ Respaldo creado: {destino}")
+            if borrados:
+                print(f"🗑️ {len(borrados)} respaldos viejos eliminados")
+        else:
+            ruta = argv[2] if len(argv) > 2 else "walletive.db"
+            print(f"🔄 Restaurando {argv[1]} en {ruta}...")
+            version = restaurar(argv[1], ruta)
+            print(f"✅ Base restaurada (esquema v{version})")
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
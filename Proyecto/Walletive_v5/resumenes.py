@@ -0,0 +1,264 @@
+"""
+Totales materializados para el resumen financiero de Walletive
+Los triggers sobre Movimientos y MetasAhorro mantienen las tablas de resumen
+al día, de modo que el dashboard lee los totales por clave primaria en lugar
+de recorrer todo el historial con SUM. Todos los totales están en centavos.
+"""
+
+# Valores posibles según los CHECK de Movimientos (0 = sin categoría)
+TIPOS = (1, 2, 3)
+CATEGORIAS = (0, 1, 2, 3, 4, 5)
+
+
+ESQUEMA_RESUMENES = [
+    # Totales por tipo de movimiento (1 = ingreso, 2 = gasto, 3 = meta)
+    """
+    CREATE TABLE IF NOT EXISTS ResumenTipos (
+        tipo INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        cantidad INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    # Totales por tipo y categoría
+    """
+    CREATE TABLE IF NOT EXISTS ResumenCategorias (
+        tipo INTEGER NOT NULL,
+        categoria_id INTEGER NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        cantidad INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (tipo, categoria_id)
+    ) WITHOUT ROWID;
+    """,
+    # Total de metas de ahorro activas (una sola fila, id = 1)
+    """
+    CREATE TABLE IF NOT EXISTS ResumenMetas (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_activas INTEGER NOT NULL DEFAULT 0,
+        cantidad_activas INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+]
+
+TRIGGERS_RESUMENES = [
+    # === Movimientos ===
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_mov_insert
+    AFTER INSERT ON Movimientos
+    BEGIN
+        UPDATE ResumenTipos
+           SET total = total + NEW.monto, cantidad = cantidad + 1
+         WHERE tipo = NEW.tipo;
+        UPDATE ResumenCategorias
+           SET total = total + NEW.monto, cantidad = cantidad + 1
+         WHERE tipo = NEW.tipo AND categoria_id = IFNULL(NEW.categoria_id, 0);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_mov_delete
+    AFTER DELETE ON Movimientos
+    BEGIN
+        UPDATE ResumenTipos
+           SET total = total - OLD.monto, cantidad = cantidad - 1
+         WHERE tipo = OLD.tipo;
+        UPDATE ResumenCategorias
+           SET total = total - OLD.monto, cantidad = cantidad - 1
+         WHERE tipo = OLD.tipo AND categoria_id = IFNULL(OLD.categoria_id, 0);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_mov_update
+    AFTER UPDATE OF tipo, monto, categoria_id ON Movimientos
+    BEGIN
+        UPDATE ResumenTipos
+           SET total = total - OLD.monto, cantidad = cantidad - 1
+         WHERE tipo = OLD.tipo;
+        UPDATE ResumenCategorias
+           SET total = total - OLD.monto, cantidad = cantidad - 1
+         WHERE tipo = OLD.tipo AND categoria_id = IFNULL(OLD.categoria_id, 0);
+        UPDATE ResumenTipos
+           SET total = total + NEW.monto, cantidad = cantidad + 1
+         WHERE tipo = NEW.tipo;
+        UPDATE ResumenCategorias
+           SET total = total + NEW.monto, cantidad = cantidad + 1
+         WHERE tipo = NEW.tipo AND categoria_id = IFNULL(NEW.categoria_id, 0);
+    END;
+    """,
+    # === MetasAhorro (solo cuentan las activas, estado_actual = 0) ===
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_meta_insert
+    AFTER INSERT ON MetasAhorro
+    WHEN NEW.estado_actual = 0
+    BEGIN
+        UPDATE ResumenMetas
+           SET total_activas = total_activas + NEW.monto_objetivo,
+               cantidad_activas = cantidad_activas + 1
+         WHERE id = 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_meta_delete
+    AFTER DELETE ON MetasAhorro
+    WHEN OLD.estado_actual = 0
+    BEGIN
+        UPDATE ResumenMetas
+           SET total_activas = total_activas - OLD.monto_objetivo,
+               cantidad_activas = cantidad_activas - 1
+         WHERE id = 1;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_meta_update
+    AFTER UPDATE OF monto_objetivo, estado_actual ON MetasAhorro
+    BEGIN
+        UPDATE ResumenMetas
+           SET total_activas = total_activas
+                   - CASE WHEN OLD.estado_actual = 0 THEN OLD.monto_objetivo ELSE 0 END
+                   + CASE WHEN NEW.estado_actual = 0 THEN NEW.monto_objetivo ELSE 0 END,
+               cantidad_activas = cantidad_activas
+                   - (OLD.estado_actual = 0) + (NEW.estado_actual = 0)
+         WHERE id = 1;
+    END;
+    """,
+]
+
+
+def eliminar_resumenes(cursor):
+    """Eliminar tablas y triggers de resumen (para recrearlos en una migración)"""
+    for trigger in ("trg_resumen_mov_insert", "trg_resumen_mov_delete", "trg_resumen_mov_update",
+                    "trg_resumen_meta_insert", "trg_resumen_meta_delete", "trg_resumen_meta_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    for tabla in ("ResumenTipos", "ResumenCategorias", "ResumenMetas"):
+        cursor.execute(f"DROP TABLE IF EXISTS {tabla}")
+
+
+def crear_resumenes(cursor):
+    """Crear tablas y triggers de resumen; retorna True si las tablas son nuevas"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ResumenTipos'")
+    nuevas = cursor.fetchone() is None
+
+    for sentencia in ESQUEMA_RESUMENES + TRIGGERS_RESUMENES:
+        cursor.execute(sentencia)
+
+    if nuevas:
+        # Una base existente puede traer historial: calcular todo desde cero
+        reconstruir_resumenes(cursor)
+    return nuevas
+
+
+def _sembrar_filas(cursor):
+    """Crear en cero todas las filas que actualizan los triggers"""
+    cursor.executemany(
+        "INSERT OR IGNORE INTO ResumenTipos (tipo, total, cantidad) VALUES (?, 0, 0)",
+        [(tipo,) for tipo in TIPOS],
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO ResumenCategorias (tipo, categoria_id, total, cantidad) VALUES (?, ?, 0, 0)",
+        [(tipo, categoria) for tipo in TIPOS for categoria in CATEGORIAS],
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO ResumenMetas (id, total_activas, cantidad_activas) VALUES (1, 0, 0)"
+    )
+
+
+def reconstruir_resumenes(cursor, fuente="Movimientos"):
+    """Recalcular todos los totales a partir de las tablas originales
+
+    fuente permite incluir los años archivados (ver archivo.fuente_movimientos).
+    """
+    cursor.execute("DELETE FROM ResumenTipos")
+    cursor.execute("DELETE FROM ResumenCategorias")
+    cursor.execute("DELETE FROM ResumenMetas")
+    _sembrar_filas(cursor)
+
+    # Un único recorrido agrupado alimenta ambas tablas de movimientos
+    cursor.execute(f"""
+        SELECT tipo, IFNULL(categoria_id, 0), SUM(monto), COUNT(*)
+        FROM {fuente}
+        GROUP BY tipo, IFNULL(categoria_id, 0)
+    """)
+    grupos = cursor.fetchall()
+    cursor.executemany("""
+        UPDATE ResumenCategorias SET total = ?, cantidad = ?
+        WHERE tipo = ? AND categoria_id = ?
+    """, [(total, cantidad, tipo, categoria) for tipo, categoria, total, cantidad in grupos])
+
+    cursor.execute("""
+        UPDATE ResumenTipos SET
+            total = (SELECT IFNULL(SUM(c.total), 0) FROM ResumenCategorias c WHERE c.tipo = ResumenTipos.tipo),
+            cantidad = (SELECT IFNULL(SUM(c.cantidad), 0) FROM ResumenCategorias c WHERE c.tipo = ResumenTipos.tipo)
+    """)
+
+    cursor.execute("""
+        UPDATE ResumenMetas SET
+            total_activas = (SELECT IFNULL(SUM(monto_objetivo), 0) FROM MetasAhorro WHERE estado_actual = 0),
+            cantidad_activas = (SELECT COUNT(*) FROM MetasAhorro WHERE estado_actual = 0)
+        WHERE id = 1
+    """)
+
+
+def leer_resumen(cursor):
+    """Leer ingresos, gastos y metas activas (en centavos) desde las tablas de resumen"""
+    cursor.execute("SELECT tipo, total FROM ResumenTipos WHERE tipo IN (1, 2)")
+    totales = dict(cursor.fetchall())
+    cursor.execute("SELECT total_activas FROM ResumenMetas WHERE id = 1")
+    fila = cursor.fetchone()
+
+    ingresos = totales.get(1) or 0
+    gastos = totales.get(2) or 0
+    metas = (fila[0] if fila else 0) or 0
+    return {
+        "ingresos": ingresos,
+        "gastos": gastos,
+        "metas": metas,
+        "balance": ingresos - gastos
+    }
+
+
+def verificar_resumenes(cursor, fuente="Movimientos"):
+    """Comparar los totales en caché contra las tablas originales
+
+    Retorna una lista de diferencias (vacía si todo cuadra). Cada diferencia
+    es un diccionario con la tabla, la clave, el valor en caché y el real.
+    """
+    diferencias = []
+
+    def comparar(tabla, clave, cache, real):
+        total_cache, cantidad_cache = cache
+        total_real, cantidad_real = real
+        if cantidad_cache != cantidad_real or (total_cache or 0) != (total_real or 0):
+            diferencias.append({
+                "tabla": tabla,
+                "clave": clave,
+                "cache": (total_cache, cantidad_cache),
+                "real": (total_real, cantidad_real),
+            })
+
+    cursor.execute(f"""
+        SELECT tipo, IFNULL(categoria_id, 0), IFNULL(SUM(monto), 0), COUNT(*)
+        FROM {fuente}
+        GROUP BY tipo, IFNULL(categoria_id, 0)
+    """)
+    reales = {(tipo, cat): (total, cantidad) for tipo, cat, total, cantidad in cursor.fetchall()}
+
+    cursor.execute("SELECT tipo, categoria_id, total, cantidad FROM ResumenCategorias")
+    cache_categorias = {(tipo, cat): (total, cantidad) for tipo, cat, total, cantidad in cursor.fetchall()}
+
+    for clave in set(reales) | set(cache_categorias):
+        comparar("ResumenCategorias", clave,
+                 cache_categorias.get(clave, (None, None)), reales.get(clave, (0, 0)))
+
+    cursor.execute("SELECT tipo, total, cantidad FROM ResumenTipos")
+    cache_tipos = {tipo: (total, cantidad) for tipo, total, cantidad in cursor.fetchall()}
+    for tipo in TIPOS:
+        real = (
+            sum(total for (t, _), (total, _) in reales.items() if t == tipo),
+            sum(cantidad for (t, _), (_, cantidad) in reales.items() if t == tipo),
+        )
+        comparar("ResumenTipos", tipo, cache_tipos.get(tipo, (None, None)), real)
+
+    cursor.execute("SELECT IFNULL(SUM(monto_objetivo), 0), COUNT(*) FROM MetasAhorro WHERE estado_actual = 0")
+    real_metas = cursor.fetchone()
+    cursor.execute("SELECT total_activas, cantidad_activas FROM ResumenMetas WHERE id = 1")
+    comparar("ResumenMetas", 1, cursor.fetchone() or (None, None), real_metas)
+
+    return diferencias
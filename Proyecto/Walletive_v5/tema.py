@@ -0,0 +1,318 @@
+"""
+Temas visuales de Walletive
+Toda la apariencia vive en una única hoja de estilos de aplicación que se
+aplica una vez sobre QApplication. Los widgets se identifican con
+objectName y propiedades dinámicas (rol, estado, nivel) en lugar de llevar
+su propio setStyleSheet, así Qt parsea el CSS una sola vez.
+"""
+
+from string import Template
+
+
+TEMAS = {
+    "oscuro": {
+        "fondo": "#181818",
+        "fondo_menu": "#121212",
+        "fondo_panel": "#1f1f1f",
+        "fondo_boton": "#1e1e1e",
+        "fondo_campo": "#2b2b2b",
+        "fondo_campo_foco": "#333333",
+        "texto": "white",
+        "texto_secundario": "#aaaaaa",
+        "texto_encabezado": "rgba(255, 255, 255, 0.8)",
+        "acento": "#00d9ff",
+        "acento_oscuro": "#006e58",
+        "acento_hover": "#00b8d4",
+        "acento_oscuro_hover": "#005a47",
+        "acento_pressed": "#0097a7",
+        "acento_oscuro_pressed": "#004d40",
+        "boton_secundario": "#444444",
+        "boton_secundario_hover": "#555555",
+        "boton_secundario_pressed": "#333333",
+        "ok": "#4CAF50",
+        "error": "#F44336",
+        "advertencia": "#FF9800",
+    },
+    "claro": {
+        "fondo": "#f5f5f5",
+        "fondo_menu": "#e8e8e8",
+        "fondo_panel": "#ffffff",
+        "fondo_boton": "#dcdcdc",
+        "fondo_campo": "#ffffff",
+        "fondo_campo_foco": "#eef9fc",
+        "texto": "#1a1a1a",
+        "texto_secundario": "#555555",
+        "texto_encabezado": "rgba(255, 255, 255, 0.9)",
+        "acento": "#0088a8",
+        "acento_oscuro": "#006e58",
+        "acento_hover": "#0097b8",
+        "acento_oscuro_hover": "#005a47",
+        "acento_pressed": "#00788f",
+        "acento_oscuro_pressed": "#004d40",
+        "boton_secundario": "#c8c8c8",
+        "boton_secundario_hover": "#b8b8b8",
+        "boton_secundario_pressed": "#a8a8a8",
+        "ok": "#2e7d32",
+        "error": "#c62828",
+        "advertencia": "#ef6c00",
+    },
+}
+
+TEMA_POR_DEFECTO = "oscuro"
+
+
+HOJA_BASE = Template("""
+/* === General === */
+QWidget {
+    color: $texto;
+}
+QMainWindow, QStackedWidget, QWidget#encuesta {
+    background-color: $fondo;
+}
+QLabel {
+    background: transparent;
+}
+QLabel[rol="subtitulo"] {
+    color: $texto_secundario;
+}
+
+/* === Dashboard: menú lateral === */
+QFrame#menuLateral {
+    background-color: $fondo_menu;
+}
+QLabel#tituloMenu {
+    color: $acento;
+}
+QPushButton[rol="menu"] {
+    background-color: $fondo_boton;
+    color: $texto;
+    border-radius: 10px;
+    padding: 10px;
+    text-align: left;
+}
+QPushButton[rol="menu"]:hover {
+    background-color: $acento_oscuro;
+}
+
+/* === Dashboard: contenido central === */
+QFrame#contenidoCentral {
+    background-color: $fondo;
+}
+QFrame#panelEstadisticas {
+    background-color: $fondo_panel;
+    border-radius: 12px;
+}
+QLabel#tituloEstadisticas {
+    color: $acento;
+}
+QLabel#ingresos {
+    color: $ok;
+}
+QLabel#gastos {
+    color: $error;
+}
+QLabel#metas {
+    color: $advertencia;
+}
+QLabel#balance[estado="cargando"] {
+    color: $texto_secundario;
+}
+QLabel#balance[estado="positivo"] {
+    color: $ok;
+}
+QLabel#balance[estado="negativo"] {
+    color: $error;
+}
+
+/* === Dashboard: panel derecho === */
+QFrame#panelDerecho {
+    background-color: $fondo_menu;
+}
+QLabel#alerta[nivel="cargando"] {
+    color: $texto_secundario;
+}
+QLabel#alerta[nivel="ok"] {
+    color: $ok;
+}
+QLabel#alerta[nivel="advertencia"] {
+    color: $advertencia;
+}
+QLabel#alerta[nivel="error"] {
+    color: $error;
+}
+
+/* === Transacciones, reportes y metas === */
+QTableView#tablaMovimientos, QTableWidget#tablaReportes, QTableWidget#tablaMetas {
+    background-color: $fondo_panel;
+    alternate-background-color: $fondo_boton;
+    gridline-color: $fondo_campo;
+    selection-background-color: $acento_oscuro;
+    border: none;
+    border-radius: 12px;
+}
+QTableView#tablaMovimientos QHeaderView::section, QTableWidget#tablaReportes QHeaderView::section,
+QTableWidget#tablaMetas QHeaderView::section {
+    background-color: $fondo_menu;
+    color: $acento;
+    padding: 6px;
+    border: none;
+}
+QLineEdit#buscarMovimientos, QComboBox[rol="filtro"] {
+    padding: 8px;
+    border: 2px solid $fondo_campo;
+    border-radius: 8px;
+    background-color: $fondo_campo;
+    color: $texto;
+}
+QLineEdit#buscarMovimientos:focus, QComboBox[rol="filtro"]:focus {
+    border: 2px solid $acento;
+}
+
+/* === Encuesta inicial === */
+QFrame#encabezadoEncuesta {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+        stop:0 $acento, stop:1 $acento_oscuro);
+    border-radius: 15px;
+    padding: 20px;
+}
+QLabel#tituloEncuesta {
+    color: white;
+}
+QLabel#subtituloEncuesta {
+    color: $texto_encabezado;
+}
+QFrame#encabezadoEncuesta QLabel {
+    padding: 20px;
+}
+QFrame#marcoPregunta {
+    background-color: $fondo_panel;
+    border-radius: 20px;
+    padding: 30px;
+}
+QLabel#pregunta {
+    color: $acento;
+    padding: 30px;
+}
+QLineEdit#campoRespuesta {
+    padding: 15px;
+    font-size: 16px;
+    border: 2px solid $fondo_campo;
+    border-radius: 12px;
+    background-color: $fondo_campo;
+    color: $texto;
+}
+QLineEdit#campoRespuesta:focus {
+    border: 2px solid $acento;
+    background-color: $fondo_campo_foco;
+}
+QComboBox#opcionRespuesta {
+    padding: 15px;
+    font-size: 16px;
+    border: 2px solid $fondo_campo;
+    border-radius: 12px;
+    background-color: $fondo_campo;
+    color: $texto;
+}
+QComboBox#opcionRespuesta:focus {
+    border: 2px solid $acento;
+}
+QComboBox#opcionRespuesta::drop-down {
+    border: none;
+    background-color: $acento_oscuro;
+    border-radius: 6px;
+}
+QComboBox#opcionRespuesta::down-arrow {
+    image: none;
+    border: none;
+}
+QComboBox QAbstractItemView {
+    background-color: $fondo_campo;
+    color: $texto;
+}
+QFrame#progresoEncuesta, QFrame#botonesEncuesta {
+    background: transparent;
+}
+QLabel#progreso {
+    color: $texto_secundario;
+}
+QPushButton#botonAtras {
+    padding: 12px 30px;
+    font-size: 14px;
+    background-color: $boton_secundario;
+    color: $texto;
+    border: none;
+    border-radius: 10px;
+}
+QPushButton#botonAtras:hover {
+    background-color: $boton_secundario_hover;
+}
+QPushButton#botonAtras:pressed {
+    background-color: $boton_secundario_pressed;
+}
+QPushButton#botonContinuar {
+    padding: 12px 30px;
+    font-size: 14px;
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 $acento, stop:1 $acento_oscuro);
+    color: white;
+    border: none;
+    border-radius: 10px;
+}
+QPushButton#botonContinuar:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 $acento_hover, stop:1 $acento_oscuro_hover);
+}
+QPushButton#botonContinuar:pressed {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 $acento_pressed, stop:1 $acento_oscuro_pressed);
+}
+
+/* === Diálogos === */
+QMessageBox {
+    background-color: $fondo_campo;
+    color: $texto;
+}
+QMessageBox QPushButton {
+    background-color: $acento_oscuro;
+    color: white;
+    padding: 8px 16px;
+    border-radius: 6px;
+}
+""")
+
+# Hojas ya compiladas por nombre de tema
+_hojas = {}
+# Tema aplicado actualmente (para los colores que se pintan desde código)
+_tema_actual = TEMA_POR_DEFECTO
+
+
+def compilar_hoja(nombre=TEMA_POR_DEFECTO):
+    """Generar (una sola vez por tema) la hoja de estilos completa"""
+    if nombre not in TEMAS:
+        raise ValueError(f"Tema desconocido: {nombre}")
+    if nombre not in _hojas:
+        _hojas[nombre] = HOJA_BASE.substitute(TEMAS[nombre])
+    return _hojas[nombre]
+
+
+def aplicar_tema(app, nombre=TEMA_POR_DEFECTO):
+    """Aplicar el tema a toda la aplicación; Qt repolish todo en una pasada"""
+    global _tema_actual
+    app.setStyleSheet(compilar_hoja(nombre))
+    app.setProperty("tema", nombre)
+    _tema_actual = nombre
+
+
+def color(nombre_color, tema=None):
+    """Color de la paleta, para lo que se pinta a mano (gráficos, modelos)"""
+    return TEMAS[tema or _tema_actual][nombre_color]
+
+
+def cambiar_propiedad(widget, propiedad, valor):
+    """Cambiar una propiedad dinámica y re-polish solo ese widget si cambió"""
+    if widget.property(propiedad) == valor:
+        return
+    widget.setProperty(propiedad, valor)
+    estilo = widget.style()
+    estilo.unpolish(widget)
+    estilo.polish(widget)
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Los módulos de Walletive están en la carpeta del proyecto (sin paquete)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Esquema de la primera versión (user_version = 0, montos DECIMAL guardados como REAL)
+ESQUEMA_V0 = [
+    """
+    CREATE TABLE IF NOT EXISTS Movimientos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)),
+        descripcion TEXT,
+        monto DECIMAL(12, 2) NOT NULL,
+        categoria_id INTEGER CHECK (categoria_id IN (1, 2, 3, 4, 5)),
+        fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        metas_id INTEGER,
+        FOREIGN KEY (metas_id) REFERENCES MetasAhorro(id) ON DELETE SET NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS MetasAhorro (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descripcion TEXT NOT NULL,
+        monto_objetivo DECIMAL(12, 2) NOT NULL,
+        estado_actual INTEGER NOT NULL CHECK (estado_actual IN (0, 1)),
+        estado_logro INTEGER NOT NULL CHECK (estado_logro IN (0, 1)),
+        fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        fecha_limite TIMESTAMP NOT NULL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS FrecuenciaMeta (
+        id INTEGER PRIMARY KEY,
+        frecuencia VARCHAR(255),
+        FOREIGN KEY (id) REFERENCES MetasAhorro(id) ON DELETE CASCADE
+    );
+    """,
+]
+
+
+@pytest.fixture
+def base_v0(tmp_path, monkeypatch):
+    """Crear bases con el esquema de la primera versión; retorna su ruta
+
+    La carpeta temporal queda como directorio actual (walletive_config.json).
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def crear(nombre="walletive.db"):
+        ruta = str(tmp_path / nombre)
+        conn = sqlite3.connect(ruta)
+        for sql in ESQUEMA_V0:
+            conn.execute(sql)
+        conn.commit()
+        conn.close()
+        return ruta
+    return crear
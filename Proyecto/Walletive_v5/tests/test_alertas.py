@@ -0,0 +1,189 @@
+"""
+MotorAlertas.evaluar: evaluación incremental por ultimo_movimiento, alertas
+de estado que se borran solas, purga de las de evento a los 90 días,
+umbrales de ReglaPresupuesto y la encuesta, que no debe disparar
+presupuestos.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from alertas import DIAS_RETENCION, MotorAlertas, ReglaBalanceNegativo, ReglaMetaProxima, ReglaPresupuesto
+from db_manager import DatabaseManager
+
+
+HOY = date(2025, 3, 15)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = DatabaseManager(str(tmp_path / "walletive.db"))
+    yield db
+    db.cerrar()
+
+
+def insertar(db, tipo, monto, categoria_id=None, dia=HOY):
+    with db.conexiones.transaccion() as cursor:
+        cursor.execute("""
+            INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha)
+            VALUES (?, ?, ?, ?, ?)
+        """, (tipo, f"Movimiento {tipo}", monto, categoria_id, f"{dia} 12:00:00"))
+        return cursor.lastrowid
+
+
+def evaluar(db, motor, hoy=HOY):
+    with db.conexiones.transaccion() as cursor:
+        return motor.evaluar(cursor, hoy)
+
+
+def alertas(db, regla=None):
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT regla, clave, nivel FROM Alertas WHERE IFNULL(?, regla) = regla ORDER BY id",
+                       (regla,))
+        return cursor.fetchall()
+
+
+class ReglaEspia:
+    """Registra el contexto de cada pasada"""
+
+    nombre = "espia"
+    de_estado = False
+
+    def __init__(self):
+        self.contextos = []
+
+    def evaluar(self, cursor, contexto):
+        self.contextos.append(contexto)
+        return []
+
+
+def test_solo_mira_los_movimientos_nuevos(db):
+    espia = ReglaEspia()
+    motor = MotorAlertas([espia])
+    primero = insertar(db, 1, 1000)
+    segundo = insertar(db, 2, 500, 2)
+    evaluar(db, motor)
+    tercero = insertar(db, 2, 100, 2)
+    evaluar(db, motor)
+    evaluar(db, motor)
+
+    assert [(c.desde_id, c.hasta_id) for c in espia.contextos] == [
+        (0, segundo), (segundo, tercero), (tercero, tercero),
+    ]
+    assert primero < segundo
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT ultimo_movimiento FROM EstadoAlertas")
+        assert cursor.fetchone()[0] == tercero
+
+
+def test_umbrales_de_presupuesto(db):
+    motor = MotorAlertas([ReglaPresupuesto(aviso=0.8)])
+    assert db.fijar_presupuesto(2, Decimal("1000"))
+
+    insertar(db, 2, 70000, 2)
+    assert evaluar(db, motor) == 0
+    assert alertas(db) == []
+
+    # 80%: aviso
+    insertar(db, 2, 10000, 2)
+    assert evaluar(db, motor) == 1
+    assert alertas(db) == [("presupuesto", "2025-03:2", "advertencia")]
+
+    # Sigue en aviso: no es una alerta nueva, pero el mensaje se actualiza
+    insertar(db, 2, 10000, 2)
+    assert evaluar(db, motor) == 0
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT mensaje FROM Alertas")
+        assert "90%" in cursor.fetchone()[0]
+
+    # Sobre el límite: sube a error
+    insertar(db, 2, 10001, 2)
+    assert evaluar(db, motor) == 1
+    assert alertas(db) == [("presupuesto", "2025-03:2", "error")]
+
+
+def test_presupuesto_solo_del_mes_en_curso_y_de_lo_nuevo(db):
+    motor = MotorAlertas([ReglaPresupuesto(aviso=0.8)])
+    assert db.fijar_presupuesto(1, Decimal("100"))
+    assert db.fijar_presupuesto(2, Decimal("100"))
+
+    # Del mes anterior (aunque supere el límite) y de otra categoría sin tope
+    insertar(db, 2, 50000, 1, HOY.replace(day=1) - timedelta(days=1))
+    insertar(db, 2, 50000, 3)
+    assert evaluar(db, motor) == 0
+
+    insertar(db, 2, 20000, 1)
+    assert evaluar(db, motor) == 1
+    # La categoría 1 sigue pasada del límite, pero sin movimientos nuevos suyos no se reevalúa
+    with db.conexiones.transaccion() as cursor:
+        cursor.execute("DELETE FROM Alertas")
+    insertar(db, 2, 9000, 2)
+    assert evaluar(db, motor) == 1
+    assert alertas(db) == [("presupuesto", "2025-03:2", "advertencia")]
+
+
+def test_alertas_de_estado_se_borran_solas(db):
+    motor = MotorAlertas([ReglaBalanceNegativo(), ReglaMetaProxima(dias=30)])
+    insertar(db, 1, 1000)
+    insertar(db, 2, 5000, 2)
+    with db.conexiones.transaccion() as cursor:
+        cursor.execute("""
+            INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro, fecha_limite)
+            VALUES ('Viaje', 100000, 0, 0, ?)
+        """, (f"{HOY + timedelta(days=10)} 00:00:00",))
+        meta_id = cursor.lastrowid
+    assert evaluar(db, motor) == 2
+    assert alertas(db) == [("balance_negativo", "total", "error"), ("meta_proxima", str(meta_id), "advertencia")]
+
+    # Pasada la fecha límite la meta sube a error
+    assert evaluar(db, motor, HOY + timedelta(days=11)) == 1
+    assert alertas(db, "meta_proxima") == [("meta_proxima", str(meta_id), "error")]
+
+    insertar(db, 1, 10000)
+    with db.conexiones.transaccion() as cursor:
+        cursor.execute("UPDATE MetasAhorro SET estado_logro = 1 WHERE id = ?", (meta_id,))
+    assert evaluar(db, motor) == 0
+    assert alertas(db) == []
+
+
+def test_purga_de_alertas_de_evento(db):
+    motor = MotorAlertas([ReglaBalanceNegativo(), ReglaPresupuesto(aviso=0.8)])
+    assert db.fijar_presupuesto(2, Decimal("10"))
+    insertar(db, 2, 5000, 2)
+    assert evaluar(db, motor) == 2
+
+    def envejecer(dias):
+        with db.conexiones.transaccion() as cursor:
+            cursor.execute("UPDATE Alertas SET creada = datetime(?, ?)", (str(HOY), f"-{dias} days"))
+
+    envejecer(DIAS_RETENCION - 1)
+    evaluar(db, motor)
+    assert len(alertas(db)) == 2
+
+    # La de presupuesto se purga; la de estado sigue mientras el balance sea negativo
+    envejecer(DIAS_RETENCION + 1)
+    evaluar(db, motor)
+    assert alertas(db) == [("balance_negativo", "total", "error")]
+
+
+def test_la_encuesta_no_dispara_presupuestos(db):
+    respuestas = [Decimal("3000000"), Decimal("1000000"), Decimal("800000"), "Sí", Decimal("200000"),
+                  Decimal("50000"), "Sí", Decimal("6000000"), 12]
+    db.guardar_datos_encuesta("Ana", respuestas)
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Presupuestos")
+        assert cursor.fetchone()[0] == 0
+
+    db.evaluar_alertas()
+    assert alertas(db, "presupuesto") == []
+    assert alertas(db, "balance_negativo") == []
+    assert db.obtener_alertas() == []
+
+    # Con un presupuesto fijado por el usuario, los gastos nuevos sí cuentan (800000 + 90000)
+    assert db.fijar_presupuesto(2, Decimal("1000000"))
+    insertar(db, 2, 9000000, 2, date.today())
+    db.evaluar_alertas()
+    assert [nivel for _, _, nivel in alertas(db, "presupuesto")] == ["advertencia"]
@@ -0,0 +1,146 @@
+"""
+Archivar años cerrados no debe cambiar lo que ve el usuario: resúmenes,
+reportes por período, balance diario, historial y metas tienen que dar lo
+mismo antes y después, tras reconstruir los agregados y al restaurar un
+respaldo.
+"""
+
+import os
+import tarfile
+from datetime import date
+
+import pytest
+
+import reportes
+from datos_sinteticos import generar
+from db_manager import DatabaseManager
+from respaldo import NOMBRE_PRINCIPAL, RespaldoInvalido, restaurar
+
+
+HASTA = date(2025, 6, 30)
+# Con un año en caliente, se archivan 2022 y 2023
+HOY = date(2025, 7, 1)
+FECHAS_BALANCE = [date(2022, 7, 1), date(2022, 12, 31), date(2023, 6, 15), date(2024, 1, 1), HASTA]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = DatabaseManager(str(tmp_path / "walletive.db"))
+    generar(db.conexiones, 20_000, anios=3, metas=4, semilla=7, hasta=HASTA)
+    yield db
+    db.cerrar()
+
+
+def foto(db):
+    """Todo lo que se muestra al usuario y depende de los movimientos"""
+    return {
+        "resumen": db.obtener_resumen_financiero(),
+        "anios": db.obtener_reporte("anio"),
+        "meses": db.obtener_reporte("mes"),
+        "categorias": db.obtener_totales_por_categoria(2),
+        "balance": [db.balance_al(fecha) for fecha in FECHAS_BALANCE],
+        "historial": db.obtener_historial(),
+        "metas": db.obtener_metas(),
+    }
+
+
+def archivar(db):
+    movidos = db.archivar_anios_cerrados(hoy=HOY)
+    assert movidos > 0
+    with db.conexiones.lectura() as cursor:
+        particiones = db.archivo.particiones(cursor)
+    assert [particion.anio for particion in particiones] == [2022, 2023]
+    assert all(os.path.exists(particion.ruta) for particion in particiones)
+    return movidos
+
+
+def test_archivar_conserva_lo_visible(db):
+    antes = foto(db)
+    assert db.check_summaries() == []
+
+    movidos = archivar(db)
+
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Movimientos")
+        assert cursor.fetchone()[0] == 20_000 - movidos
+    assert foto(db) == antes
+    assert db.check_summaries() == []
+
+
+def test_estado_archivo_marca_el_limite_del_listado(db):
+    assert db.estado_archivo(hoy=HOY) == ([], [2022, 2023])
+
+    archivar(db)
+
+    particiones, pendientes = db.estado_archivo(hoy=HOY)
+    assert pendientes == []
+    limite = particiones[-1].hasta[:10]
+    primera = db.obtener_pagina_movimientos(orden="fecha", descendente=False, limite=1)[0]
+    assert primera[1][:10] > limite
+
+
+def test_reconstruir_incluye_archivados(db):
+    antes = foto(db)
+    archivar(db)
+
+    assert db.rebuild_summaries()
+    assert foto(db) == antes
+    assert db.check_summaries() == []
+
+
+def test_backfill_de_periodos_incluye_archivados(db):
+    antes = foto(db)
+    archivar(db)
+
+    assert reportes.main(["backfill", db.db_path]) == 0
+    assert db.obtener_reporte("anio") == antes["anios"]
+    assert db.obtener_reporte("mes") == antes["meses"]
+    assert db.check_summaries() == []
+
+
+def test_verificar_detecta_periodos_inconsistentes(db):
+    archivar(db)
+    with db.conexiones.transaccion() as cursor:
+        cursor.execute("""
+            UPDATE ResumenPeriodos SET total = total + 100
+            WHERE periodo = 'anio' AND inicio = '2022-01-01' AND tipo = 2 AND categoria_id = 2
+        """)
+
+    diferencias = db.check_summaries()
+    assert [dif["clave"] for dif in diferencias] == [("anio", "2022-01-01", 2, 2)]
+
+
+def test_respaldo_incluye_archivados(db, tmp_path):
+    antes = foto(db)
+    archivar(db)
+
+    ruta = db.respaldar()
+    with tarfile.open(ruta) as tar:
+        assert sorted(tar.getnames()) == [NOMBRE_PRINCIPAL, "walletive_2022.db", "walletive_2023.db"]
+
+    destino = tmp_path / "restaurada" / "walletive.db"
+    destino.parent.mkdir()
+    restaurar(ruta, str(destino))
+    restaurada = DatabaseManager(str(destino))
+    try:
+        assert foto(restaurada) == antes
+        assert restaurada.check_summaries() == []
+    finally:
+        restaurada.cerrar()
+
+
+def test_restaurar_rechaza_respaldo_sin_archivados(db, tmp_path):
+    archivar(db)
+    ruta = db.respaldar()
+    incompleto = tmp_path / "incompleto.tar.gz"
+    with tarfile.open(ruta) as origen, tarfile.open(incompleto, "w:gz") as tar:
+        for miembro in origen.getmembers():
+            if miembro.name != "walletive_2022.db":
+                tar.addfile(miembro, origen.extractfile(miembro))
+
+    destino = tmp_path / "restaurada" / "walletive.db"
+    destino.parent.mkdir()
+    with pytest.raises(RespaldoInvalido, match="walletive_2022.db"):
+        restaurar(str(incompleto), str(destino))
+    assert os.listdir(destino.parent) == []
@@ -0,0 +1,183 @@
+"""
+Árbol de Fenwick y sincronización de IndiceBalance con BalanceDiario: el
+balance a una fecha tiene que dar lo mismo que un SUM sobre Movimientos
+después de insertar, modificar y borrar, incluso cuando aparecen días antes
+del primero o después del margen del árbol.
+"""
+
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from balance_diario import ArbolFenwick, IndiceBalance, crear_balance_diario
+
+
+# === ArbolFenwick ===
+
+@pytest.mark.parametrize("largo", [0, 1, 2, 7, 8, 33])
+def test_prefijos(largo):
+    azar = random.Random(largo)
+    valores = [azar.randint(-1000, 1000) for _ in range(largo)]
+    arbol = ArbolFenwick(valores)
+    for posicion in range(largo):
+        assert arbol.prefijo(posicion) == sum(valores[:posicion + 1])
+    # Más allá del final es el total
+    assert arbol.prefijo(largo + 10) == sum(valores)
+
+
+def test_sumar_actualiza_los_prefijos():
+    valores = [5, -3, 0, 12, 7, 1, -8, 4, 9]
+    arbol = ArbolFenwick(valores)
+    azar = random.Random(1)
+    for _ in range(200):
+        posicion, delta = azar.randrange(len(valores)), azar.randint(-50, 50)
+        arbol.sumar(posicion, delta)
+        valores[posicion] += delta
+        assert [arbol.prefijo(i) for i in range(len(valores))] == \
+               [sum(valores[:i + 1]) for i in range(len(valores))]
+
+
+# === IndiceBalance ===
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE Movimientos (
+            id INTEGER PRIMARY KEY,
+            tipo INTEGER NOT NULL,
+            monto INTEGER NOT NULL,
+            fecha TIMESTAMP NOT NULL
+        )
+    """)
+    crear_balance_diario(cursor)
+    yield cursor
+    conn.close()
+
+
+class IndiceEspiado(IndiceBalance):
+    """IndiceBalance que registra las cargas completas y los días fijados"""
+
+    def __init__(self):
+        super().__init__()
+        self.cargas = 0
+        self.fijados = []
+
+    def _cargar(self, filas):
+        self.cargas += 1
+        super()._cargar(filas)
+
+    def _fijar(self, ordinal, neto):
+        self.fijados.append(date.fromordinal(ordinal))
+        super()._fijar(ordinal, neto)
+
+
+def insertar(cursor, tipo, monto, dia):
+    cursor.execute("INSERT INTO Movimientos (tipo, monto, fecha) VALUES (?, ?, ?)",
+                   (tipo, monto, f"{dia} 12:00:00"))
+    return cursor.lastrowid
+
+
+def balance_sql(cursor, dia):
+    cursor.execute("""
+        SELECT IFNULL(SUM(CASE tipo WHEN 1 THEN monto WHEN 2 THEN -monto ELSE 0 END), 0)
+        FROM Movimientos WHERE date(fecha) <= ?
+    """, (str(dia),))
+    return cursor.fetchone()[0]
+
+
+def comparar(cursor, indice, desde, hasta):
+    indice.actualizar(cursor)
+    dia = desde
+    while dia <= hasta:
+        assert indice.balance_al(dia) == balance_sql(cursor, dia), dia
+        dia += timedelta(days=1)
+
+
+INICIO = date(2024, 1, 1)
+
+
+def test_sincroniza_solo_los_dias_que_cambiaron(cursor):
+    indice = IndiceEspiado()
+    for i in range(10):
+        insertar(cursor, 1, 1000, INICIO + timedelta(days=i))
+    indice.actualizar(cursor)
+    assert indice.cargas == 1
+    assert indice.balance_al(INICIO + timedelta(days=9)) == 10_000
+
+    # Sin cambios no se lee nada
+    indice.actualizar(cursor)
+    assert (indice.cargas, indice.fijados) == (1, [])
+
+    insertar(cursor, 2, 300, INICIO + timedelta(days=3))
+    indice.actualizar(cursor)
+    assert indice.cargas == 1
+    assert indice.fijados == [INICIO + timedelta(days=3)]
+    assert indice.balance_al(INICIO + timedelta(days=2)) == 3000
+    assert indice.balance_al(INICIO + timedelta(days=3)) == 3700
+
+    # Las metas no mueven el balance ni el número de cambio
+    indice.fijados.clear()
+    insertar(cursor, 3, 999, INICIO + timedelta(days=4))
+    indice.actualizar(cursor)
+    assert indice.fijados == []
+
+
+def test_crece_hacia_atras_y_hacia_adelante(cursor):
+    indice = IndiceEspiado()
+    insertar(cursor, 1, 500, INICIO)
+    indice.actualizar(cursor)
+    largo = len(indice._netos)
+
+    # Un día antes del primero: se recarga con el nuevo primer día
+    anterior = INICIO - timedelta(days=40)
+    insertar(cursor, 2, 200, anterior)
+    indice.actualizar(cursor)
+    assert indice.cargas == 2
+    assert indice._primer_dia == anterior.toordinal()
+    assert indice.balance_al(anterior - timedelta(days=1)) == 0
+    assert indice.balance_al(anterior) == -200
+    assert indice.balance_al(INICIO) == 300
+
+    # Dentro del margen no se recarga; fuera de él sí
+    insertar(cursor, 1, 100, INICIO + timedelta(days=IndiceBalance.MARGEN_DIAS - 1))
+    indice.actualizar(cursor)
+    assert indice.cargas == 2
+    lejos = anterior + timedelta(days=len(indice._netos) + 10)
+    insertar(cursor, 1, 50, lejos)
+    indice.actualizar(cursor)
+    assert indice.cargas == 3
+    assert len(indice._netos) > largo
+    comparar(cursor, indice, anterior - timedelta(days=1), lejos + timedelta(days=1))
+
+
+def test_coincide_con_sum_tras_inserciones_cambios_y_borrados(cursor):
+    azar = random.Random(12)
+    indice = IndiceBalance()
+    dias = 120
+    ids = [insertar(cursor, azar.choice((1, 2, 3)), azar.randint(1, 100_000),
+                    INICIO + timedelta(days=azar.randrange(dias))) for _ in range(300)]
+    comparar(cursor, indice, INICIO - timedelta(days=1), INICIO + timedelta(days=dias))
+
+    for ronda in range(5):
+        for _ in range(30):
+            operacion = azar.random()
+            if operacion < 0.4 or not ids:
+                # Incluye días fuera del rango cargado, en ambas direcciones
+                dia = INICIO + timedelta(days=azar.randint(-60 * ronda, dias + 400 * ronda))
+                ids.append(insertar(cursor, azar.choice((1, 2)), azar.randint(1, 100_000), dia))
+            elif operacion < 0.7:
+                cursor.execute("UPDATE Movimientos SET tipo = ?, monto = ?, fecha = ? WHERE id = ?", (
+                    azar.choice((1, 2, 3)), azar.randint(1, 100_000),
+                    f"{INICIO + timedelta(days=azar.randrange(dias))} 08:00:00", azar.choice(ids),
+                ))
+            else:
+                cursor.execute("DELETE FROM Movimientos WHERE id = ?", (ids.pop(azar.randrange(len(ids))),))
+        cursor.execute("SELECT MIN(date(fecha)), MAX(date(fecha)) FROM Movimientos")
+        primero, ultimo = (date.fromisoformat(d) for d in cursor.fetchone())
+        comparar(cursor, indice, primero - timedelta(days=2), ultimo + timedelta(days=2))
+        assert indice.flujo_neto(INICIO, INICIO + timedelta(days=30)) == \
+            balance_sql(cursor, INICIO + timedelta(days=30)) - balance_sql(cursor, INICIO - timedelta(days=1))
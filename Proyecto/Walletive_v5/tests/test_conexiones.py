@@ -0,0 +1,88 @@
+"""
+Pool de lectores de ConnectionManager: espera acotada cuando está agotado
+y cierre de los lectores que otros hilos tienen tomados.
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from db_connection import ConnectionManager, ConsultaCancelada
+
+
+@pytest.fixture
+def conexiones(tmp_path):
+    conexiones = ConnectionManager(str(tmp_path / "walletive.db"), pool_size=1, espera_lector=0.2)
+    with conexiones.transaccion() as cursor:
+        cursor.execute("CREATE TABLE Datos (valor INTEGER)")
+        cursor.execute("INSERT INTO Datos VALUES (1)")
+    yield conexiones
+    conexiones.cerrar()
+
+
+def test_pool_agotado_falla_con_un_error_claro(conexiones):
+    with conexiones.lectura() as cursor:
+        inicio = time.monotonic()
+        # Lectura anidada en el mismo hilo: antes esperaba para siempre
+        with pytest.raises(sqlite3.OperationalError, match="No hay lectores libres"):
+            with conexiones.lectura():
+                pass
+        assert time.monotonic() - inicio < 2
+        cursor.execute("SELECT valor FROM Datos")
+        assert cursor.fetchone() == (1,)
+
+    # El lector volvió al pool
+    with conexiones.lectura() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM Datos")
+        assert cursor.fetchone() == (1,)
+
+
+def test_el_pool_espera_a_que_otro_hilo_devuelva_el_lector(conexiones):
+    tomado, soltar = threading.Event(), threading.Event()
+
+    def leer():
+        with conexiones.lectura():
+            tomado.set()
+            soltar.wait(5)
+
+    hilo = threading.Thread(target=leer)
+    hilo.start()
+    tomado.wait(5)
+    threading.Timer(0.05, soltar.set).start()
+    with conexiones.lectura() as cursor:
+        cursor.execute("SELECT valor FROM Datos")
+        assert cursor.fetchone() == (1,)
+    hilo.join(5)
+
+
+def test_cerrar_cierra_los_lectores_tomados(conexiones):
+    en_curso = threading.Event()
+    resultado = {}
+
+    def leer():
+        try:
+            with conexiones.lectura() as cursor:
+                resultado["conn"] = cursor.connection
+                cursor.connection.set_progress_handler(en_curso.set, 1000)
+                # Consulta sin fin: solo termina si cerrar() la interrumpe
+                cursor.execute("""
+                    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT MAX(i) FROM n
+                """)
+        except Exception as e:
+            resultado["error"] = e
+
+    hilo = threading.Thread(target=leer, daemon=True)
+    hilo.start()
+    assert en_curso.wait(5)
+    conexiones.cerrar()
+    hilo.join(5)
+
+    assert not hilo.is_alive()
+    assert isinstance(resultado["error"], ConsultaCancelada)
+    # El hilo dueño lo cerró al soltarlo en lugar de devolverlo al pool
+    with pytest.raises(sqlite3.ProgrammingError):
+        resultado["conn"].execute("SELECT 1")
+    assert conexiones._lectores.empty()
+    assert conexiones._lectores_en_uso == 0
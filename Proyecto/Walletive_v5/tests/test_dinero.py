@@ -0,0 +1,102 @@
+"""
+Montos en centavos enteros: conversión desde y hacia Decimal, y la
+migración 4, que pasa a centavos los montos REAL de una base anterior.
+"""
+
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from db_manager import DatabaseManager
+from dinero import a_centavos, desde_centavos, parsear_monto
+
+
+MAXIMO_INT64 = 2 ** 63 - 1
+
+
+def test_a_centavos_sin_error_binario():
+    assert 0.1 + 0.2 != 0.3
+    assert a_centavos(0.1 + 0.2) == 30
+    assert a_centavos(Decimal("0.1") + Decimal("0.2")) == 30
+    assert a_centavos(0.1) + a_centavos(0.2) == a_centavos(0.3)
+    assert a_centavos(1234567.89) == 123456789
+
+
+@pytest.mark.parametrize("valor, centavos", [
+    ("0.005", 1),
+    ("0.004", 0),
+    ("2.675", 268),  # como float sería 2.67499999...
+    (2.675, 268),
+    ("-0.005", -1),  # la mitad se aleja del cero, también en negativos
+    ("-12.345", -1235),
+    (-0.1 - 0.2, -30),
+    (-7, -700),
+    ("2,500,000", 250000000),
+])
+def test_a_centavos_redondea_mitad_hacia_arriba(valor, centavos):
+    assert a_centavos(valor) == centavos
+
+
+def test_sumas_grandes_exactas():
+    # Un millón de aportes de 0.10: en float la suma se desvía
+    assert sum(0.1 for _ in range(1_000_000)) != 100_000
+    assert sum(a_centavos(0.1) for _ in range(1_000_000)) == 10_000_000
+
+    assert a_centavos("92233720368547758.07") == MAXIMO_INT64
+    assert desde_centavos(MAXIMO_INT64) == Decimal("92233720368547758.07")
+    assert desde_centavos(-MAXIMO_INT64) == Decimal("-92233720368547758.07")
+
+
+@pytest.mark.parametrize("texto", ["0", "0.01", "-0.01", "19.99", "1234567.89", "-999999999.99"])
+def test_ida_y_vuelta(texto):
+    valor = desde_centavos(a_centavos(texto))
+    assert valor == Decimal(texto)
+    assert valor.as_tuple().exponent == -2
+
+
+def test_none_y_textos_invalidos():
+    assert a_centavos(None) is None
+    assert desde_centavos(None) is None
+    for texto in ("abc", "", "nan", "inf", "1.2.3"):
+        with pytest.raises(ValueError):
+            parsear_monto(texto)
+
+
+# === Migración 4 ===
+
+def test_migracion_convierte_montos_reales(base_v0):
+    ruta = base_v0()
+    conn = sqlite3.connect(ruta)
+    conn.execute("""
+        INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro, fecha_limite)
+        VALUES ('Viaje', ?, 0, 0, '2030-01-01 00:00:00')
+    """, (5000000.5,))
+    conn.executemany("INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id) VALUES (?, ?, ?, ?)", [
+        (1, "Sueldo", 1234567.89, 1),
+        (2, "Café", 0.1 + 0.2, 2),
+        (2, "Arriendo", 450000, 1),
+        (2, "Redondeo", 19.999999999, 3),
+    ])
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(ruta)
+    try:
+        with db.conexiones.lectura() as cursor:
+            cursor.execute("SELECT typeof(monto), monto FROM Movimientos ORDER BY id")
+            assert cursor.fetchall() == [
+                ("integer", 123456789), ("integer", 30), ("integer", 45000000), ("integer", 2000),
+            ]
+            cursor.execute("SELECT typeof(monto_objetivo), monto_objetivo FROM MetasAhorro")
+            assert cursor.fetchall() == [("integer", 500000050)]
+            cursor.execute("SELECT type FROM pragma_table_info('Movimientos') WHERE name = 'monto'")
+            assert cursor.fetchone()[0] == "INTEGER"
+
+        resumen = db.obtener_resumen_financiero()
+        assert resumen["ingresos"] == Decimal("1234567.89")
+        assert resumen["gastos"] == Decimal("450020.30")
+        assert resumen["balance"] == Decimal("784547.59")
+        assert db.obtener_metas()[0][2] == Decimal("5000000.50")
+    finally:
+        db.cerrar()
@@ -0,0 +1,57 @@
+"""
+Exportación: los montos salen como el mismo texto decimal en CSV y JSON
+Lines, y las filas salen por id aunque haya años archivados.
+"""
+
+import csv
+import json
+from datetime import date
+
+import pytest
+
+from db_manager import DatabaseManager
+
+
+# Insertados fuera de orden de fecha: el id no sigue a la fecha
+MOVIMIENTOS = [
+    (1, "Sueldo", 30, "2024-03-01"),
+    (2, "Mercado", 123456789, "2022-11-20"),
+    (2, "Arriendo", 1, "2023-08-05"),
+    (1, "Bono", 100000, "2022-01-10"),
+    (2, "Café", 2990, "2024-05-12"),
+]
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = DatabaseManager(str(tmp_path / "walletive.db"))
+    with db.conexiones.transaccion() as cursor:
+        cursor.executemany("""
+            INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha)
+            VALUES (?, ?, ?, 2, ? || ' 12:00:00')
+        """, MOVIMIENTOS)
+    yield db
+    db.cerrar()
+
+
+def leer_csv(ruta):
+    with open(ruta, encoding="utf-8", newline="") as f:
+        return [(int(fila["id"]), fila["monto"]) for fila in csv.DictReader(f)]
+
+
+def leer_jsonl(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return [(fila["id"], fila["monto"]) for fila in map(json.loads, f)]
+
+
+@pytest.mark.parametrize("archivados", [0, 2])
+def test_mismos_montos_y_orden_por_id(db, tmp_path, archivados):
+    assert db.archivar_anios_cerrados(hoy=date(2024 if archivados else 2022, 7, 1)) == archivados
+    rutas = {formato: str(tmp_path / f"movimientos.{formato}") for formato in ("csv", "jsonl")}
+    for ruta in rutas.values():
+        assert db.exportar({"Movimientos": ruta}) == {"Movimientos": len(MOVIMIENTOS)}
+
+    esperado = [(1, "0.30"), (2, "1234567.89"), (3, "0.01"), (4, "1000.00"), (5, "29.90")]
+    assert leer_csv(rutas["csv"]) == esperado
+    assert leer_jsonl(rutas["jsonl"]) == esperado
@@ -0,0 +1,133 @@
+"""
+Importación de extractos: un archivo de ejemplo por formato (tests/datos),
+lotes y puntos de control, y retomar una importación interrumpida sin
+duplicar movimientos.
+"""
+
+import os
+
+import pytest
+
+from db_manager import DatabaseManager
+from importador import ErrorImportacion, ImportadorMovimientos, parsear_csv, parsear_qif
+
+
+DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = DatabaseManager(str(tmp_path / "walletive.db"))
+    yield db
+    db.cerrar()
+
+
+def movimientos(db):
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT tipo, descripcion, monto, categoria_id, fecha FROM Movimientos ORDER BY id")
+        return cursor.fetchall()
+
+
+def punto_de_control(db):
+    with db.conexiones.lectura() as cursor:
+        cursor.execute("SELECT filas_procesadas, completada FROM Importaciones")
+        return cursor.fetchall()
+
+
+# === Un archivo por formato ===
+
+def test_csv(db):
+    ruta = os.path.join(DATOS, "extracto.csv")
+    assert db.importar_movimientos(ruta, separador_decimal=",") == 4
+    assert movimientos(db) == [
+        (1, "Sueldo enero", 250000000, None, "2024-01-31 00:00:00"),
+        (2, "Supermercado", 8543050, 2, "2024-02-05 00:00:00"),
+        (2, "Arriendo", 65000000, 1, "2024-02-14 00:00:00"),
+        (1, "Reembolso", 1234567, None, "2024-02-29 00:00:00"),
+    ]
+
+
+def test_ofx(db):
+    assert db.importar_movimientos(os.path.join(DATOS, "extracto.ofx")) == 3
+    assert movimientos(db) == [
+        (1, "NOMINA EMPRESA - Sueldo enero", 250000000, None, "2024-01-31 12:00:00"),
+        (2, "SUPERMERCADO", 8543050, 2, "2024-02-05 00:00:00"),
+        (2, "ARRIENDO", 65000000, 2, "2024-02-14 09:30:00"),
+    ]
+
+
+def test_qif_mes_primero(db):
+    assert db.importar_movimientos(os.path.join(DATOS, "extracto.qif")) == 3
+    assert movimientos(db) == [
+        # " 1/ 5'24" es el 5 de enero, no el 1 de mayo
+        (1, "Sueldo - Enero", 250000000, None, "2024-01-05 00:00:00"),
+        (2, "Supermercado", 8543050, 2, "2024-02-13 00:00:00"),
+        (2, "Arriendo", 65000000, 2, "2023-12-31 00:00:00"),
+    ]
+
+
+def test_qif_fechas_ambiguas():
+    lineas = ["!Type:Bank\n", "D3/4'24\n", "T10\n", "^\n", "D03/04/2024\n", "T10\n", "^\n"]
+    assert [fila[4] for fila in parsear_qif(lineas)] == ["2024-03-04 00:00:00"] * 2
+
+
+def test_csv_categoria_invalida():
+    lineas = ["fecha,descripcion,monto,categoria_id\n", "2024-01-01,Ok,-10,2\n", "2024-01-02,Mal,-10,7\n"]
+    with pytest.raises(ErrorImportacion, match=r"Fila 3: categoria_id 7"):
+        list(parsear_csv(lineas))
+
+
+# === Lotes, puntos de control y reanudación ===
+
+FILAS = 23
+
+
+@pytest.fixture
+def extracto(tmp_path):
+    ruta = tmp_path / "grande.csv"
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("fecha,descripcion,monto\n")
+        for i in range(FILAS):
+            f.write(f"2024-03-{i + 1:02d},Movimiento {i},-{i + 1}.50\n")
+    return str(ruta)
+
+
+class Corte(Exception):
+    pass
+
+
+def test_lotes_y_puntos_de_control(db, extracto):
+    llamadas = []
+    importador = ImportadorMovimientos(db.conexiones, tamano_lote=5, filas_por_transaccion=12)
+    # Cada transacción agrupa lotes enteros: 12 se redondea a 10
+    assert importador.filas_por_transaccion == 10
+
+    assert importador.importar(extracto, progreso=lambda filas, *_: llamadas.append(filas)) == FILAS
+    assert llamadas == [5, 10, 15, 20, 23]
+    assert punto_de_control(db) == [(FILAS, 1)]
+
+    # El mismo archivo no se importa dos veces, salvo que se fuerce
+    assert importador.importar(extracto) == 0
+    assert len(movimientos(db)) == FILAS
+    assert importador.importar(extracto, forzar=True) == FILAS
+    assert len(movimientos(db)) == 2 * FILAS
+
+
+def test_retomar_importacion_interrumpida(db, extracto):
+    def cortar(filas, *_):
+        # Falla a mitad de la segunda transacción (filas 11 a 20)
+        if filas == 15:
+            raise Corte()
+
+    importador = ImportadorMovimientos(db.conexiones, tamano_lote=5, filas_por_transaccion=10)
+    with pytest.raises(Corte):
+        importador.importar(extracto, progreso=cortar)
+    # Solo quedó la primera transacción, con su punto de control
+    assert len(movimientos(db)) == 10
+    assert punto_de_control(db) == [(10, 0)]
+
+    assert importador.importar(extracto) == FILAS - 10
+    filas = movimientos(db)
+    assert [descripcion for _, descripcion, *_ in filas] == [f"Movimiento {i}" for i in range(FILAS)]
+    assert punto_de_control(db) == [(FILAS, 1)]
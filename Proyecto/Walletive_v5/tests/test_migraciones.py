@@ -0,0 +1,143 @@
+"""
+Migraciones desde el esquema de la primera versión hasta VERSION_ESQUEMA:
+la base queda igual a una creada de cero, los datos se conservan y volver
+a abrirla (o repetir cualquier migración) no cambia nada.
+"""
+
+import sqlite3
+from decimal import Decimal
+
+from db_connection import ConnectionManager
+from db_manager import DatabaseManager
+from migraciones import MIGRACIONES, VERSION_ESQUEMA, aplicar_migraciones, version_actual
+
+
+def esquema(ruta):
+    """Objetos del esquema (tipo, nombre, tabla, sql) sin las tablas internas de SQLite"""
+    conn = sqlite3.connect(ruta)
+    try:
+        return sorted(conn.execute("""
+            SELECT type, name, tbl_name, sql FROM sqlite_master
+            WHERE name NOT LIKE 'sqlite_%'
+        """).fetchall())
+    finally:
+        conn.close()
+
+
+def nombres(objetos, tipo):
+    return {nombre for t, nombre, _, _ in objetos if t == tipo}
+
+
+def cargar_v0(ruta):
+    conn = sqlite3.connect(ruta)
+    conn.execute("""
+        INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro, fecha_limite)
+        VALUES ('Meta de ahorro principal', 5000000, 0, 0, '2030-01-01 00:00:00')
+    """)
+    conn.execute("INSERT INTO FrecuenciaMeta (id, frecuencia) VALUES (1, 'mensual')")
+    conn.executemany("""
+        INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha, metas_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [
+        (1, "Sueldo", 3000000, 1, "2024-01-31 09:00:00", None),
+        (2, "Gastos fijos", 1000000.5, 1, "2024-02-01 10:00:00", None),
+        (2, "Mercado", 80000.25, 2, "2024-02-03 18:30:00", None),
+        (3, "Meta de ahorro", 5000000, 5, "2024-01-31 09:00:00", 1),
+        (3, "Aporte", 250000, 5, "2024-02-05 09:00:00", 1),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def test_esquema_v0_hasta_la_ultima_version(base_v0, tmp_path):
+    ruta = base_v0()
+    cargar_v0(ruta)
+
+    conexiones = ConnectionManager(ruta)
+    try:
+        assert aplicar_migraciones(conexiones, verbose=False) == [m.version for m in MIGRACIONES]
+        with conexiones.lectura() as cursor:
+            assert version_actual(cursor) == VERSION_ESQUEMA
+            cursor.execute("PRAGMA foreign_key_check")
+            assert cursor.fetchall() == []
+            cursor.execute("PRAGMA integrity_check")
+            assert cursor.fetchone()[0] == "ok"
+    finally:
+        conexiones.cerrar()
+
+    # Mismo esquema que una base nueva
+    nueva = str(tmp_path / "nueva.db")
+    conexiones = ConnectionManager(nueva)
+    try:
+        aplicar_migraciones(conexiones, verbose=False)
+    finally:
+        conexiones.cerrar()
+    migrada, nueva = esquema(ruta), esquema(nueva)
+    for tipo in ("table", "index", "trigger", "view"):
+        assert nombres(migrada, tipo) == nombres(nueva, tipo), tipo
+    assert {"Particiones", "Recurrencias", "ResumenPeriodos", "ObjetivosEncuesta"} <= nombres(migrada, "table")
+
+
+def test_datos_conservados_y_agregados_al_dia(base_v0):
+    ruta = base_v0()
+    cargar_v0(ruta)
+
+    db = DatabaseManager(ruta)
+    try:
+        with db.conexiones.lectura() as cursor:
+            cursor.execute("SELECT id, tipo, monto, fecha, metas_id FROM Movimientos ORDER BY id")
+            assert cursor.fetchall() == [
+                (1, 1, 300000000, "2024-01-31 09:00:00", None),
+                (2, 2, 100000050, "2024-02-01 10:00:00", None),
+                (3, 2, 8000025, "2024-02-03 18:30:00", None),
+                (4, 3, 500000000, "2024-01-31 09:00:00", 1),
+                (5, 3, 25000000, "2024-02-05 09:00:00", 1),
+            ]
+            # El objetivo que guardaba la encuesta anterior queda marcado, no borrado
+            cursor.execute("SELECT movimiento_id FROM ObjetivosEncuesta")
+            assert cursor.fetchall() == [(4,)]
+        assert db.check_summaries() == []
+        assert db.obtener_metas()[0][3] == Decimal("250000.00")
+        assert [fila["gastos"] for fila in db.obtener_reporte("mes")] == [Decimal("0.00"), Decimal("1080000.75")]
+        assert [fila[0] for fila in db.buscar_movimientos("mercado")] == [3]
+    finally:
+        db.cerrar()
+
+
+def test_reabrir_no_cambia_nada(base_v0):
+    ruta = base_v0()
+    cargar_v0(ruta)
+    DatabaseManager(ruta).cerrar()
+    antes = esquema(ruta)
+
+    conexiones = ConnectionManager(ruta)
+    try:
+        # Al día: no se ejecuta ninguna migración
+        assert aplicar_migraciones(conexiones, verbose=False) == []
+        # Y repetir cada una a mano tampoco cambia el esquema ni los datos
+        with conexiones.lectura() as cursor:
+            cursor.execute("SELECT * FROM Movimientos ORDER BY id")
+            movimientos = cursor.fetchall()
+        for migracion in MIGRACIONES:
+            if migracion.sin_claves_foraneas:
+                conexiones.escritor().execute("PRAGMA foreign_keys = OFF;")
+            try:
+                with conexiones.transaccion() as cursor:
+                    migracion.aplicar(cursor)
+            finally:
+                if migracion.sin_claves_foraneas:
+                    conexiones.escritor().execute("PRAGMA foreign_keys = ON;")
+        with conexiones.lectura() as cursor:
+            assert version_actual(cursor) == VERSION_ESQUEMA
+            cursor.execute("SELECT * FROM Movimientos ORDER BY id")
+            assert cursor.fetchall() == movimientos
+    finally:
+        conexiones.cerrar()
+    assert esquema(ruta) == antes
+
+    db = DatabaseManager(ruta)
+    try:
+        assert db.check_summaries() == []
+    finally:
+        db.cerrar()
+    assert esquema(ruta) == antes
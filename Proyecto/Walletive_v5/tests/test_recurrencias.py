@@ -0,0 +1,142 @@
+"""
+ProgramadorRecurrencias.materializar: fechas de fin de mes, reglas con
+fecha final, el tope de ocurrencias por pasada y la verificación optimista
+de `ocurrencias` contra la tabla.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from recurrencias import (
+    MAXIMO_POR_PASADA, ProgramadorRecurrencias, crear_recurrencias, insertar_recurrencia, ocurrencia
+)
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE Movimientos (
+            id INTEGER PRIMARY KEY,
+            tipo INTEGER NOT NULL,
+            descripcion TEXT,
+            monto INTEGER NOT NULL,
+            categoria_id INTEGER,
+            fecha TIMESTAMP,
+            metas_id INTEGER
+        )
+    """)
+    crear_recurrencias(cursor)
+    yield cursor
+    conn.close()
+
+
+def programador(cursor):
+    programador = ProgramadorRecurrencias()
+    programador.cargar(cursor)
+    return programador
+
+
+def fechas(cursor, descripcion=None):
+    cursor.execute("SELECT substr(fecha, 1, 10) FROM Movimientos WHERE IFNULL(?, descripcion) = descripcion "
+                   "ORDER BY fecha, id", (descripcion,))
+    return [date.fromisoformat(dia) for dia, in cursor.fetchall()]
+
+
+def estado(cursor, regla_id):
+    cursor.execute("SELECT ocurrencias, proxima FROM Recurrencias WHERE id = ?", (regla_id,))
+    return cursor.fetchone()
+
+
+def test_dia_31_cae_a_fin_de_mes_y_vuelve(cursor):
+    insertar_recurrencia(cursor, 2, "Arriendo", 100, "mensual", date(2023, 12, 31))
+    assert programador(cursor).materializar(cursor, date(2024, 6, 1)) == 6
+    assert fechas(cursor) == [date(2023, 12, 31), date(2024, 1, 31), date(2024, 2, 29),
+                              date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)]
+    # En un año no bisiesto febrero termina el 28
+    assert ocurrencia(date(2023, 1, 31), "mensual", 1) == date(2023, 2, 28)
+    assert ocurrencia(date(2023, 1, 31), "mensual", 2) == date(2023, 3, 31)
+    assert ocurrencia(date(2024, 2, 29), "anual", 1) == date(2025, 2, 28)
+
+
+def test_hasta_termina_la_regla(cursor):
+    regla = insertar_recurrencia(cursor, 2, "Curso", 100, "semanal", date(2024, 1, 1), hasta=date(2024, 1, 20))
+    recurrencias = programador(cursor)
+    assert recurrencias.materializar(cursor, date(2024, 3, 1)) == 3
+    assert fechas(cursor) == [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)]
+    assert estado(cursor, regla.id) == (3, None)
+    assert recurrencias.siguiente() is None
+    assert recurrencias.materializar(cursor, date(2025, 1, 1)) == 0
+
+
+def test_hasta_en_medio_de_la_pasada(cursor):
+    regla = insertar_recurrencia(cursor, 1, "Beca", 100, "mensual", date(2024, 1, 15), hasta=date(2024, 12, 31))
+    recurrencias = programador(cursor)
+    assert recurrencias.materializar(cursor, date(2024, 3, 20)) == 3
+    assert estado(cursor, regla.id) == (3, "2024-04-15")
+    assert recurrencias.materializar(cursor, date(2026, 1, 1)) == 9
+    assert estado(cursor, regla.id) == (12, None)
+
+
+def test_tope_por_pasada(cursor):
+    inicio, hoy = date(2021, 1, 1), date(2024, 1, 1)
+    total = (hoy - inicio).days + 1
+    regla = insertar_recurrencia(cursor, 2, "Café", 100, "diaria", inicio)
+    recurrencias = programador(cursor)
+
+    assert recurrencias.materializar(cursor, hoy) == MAXIMO_POR_PASADA
+    assert estado(cursor, regla.id) == (MAXIMO_POR_PASADA, str(inicio + timedelta(days=MAXIMO_POR_PASADA)))
+    # Sigue vencida: las pasadas siguientes continúan donde quedó
+    assert recurrencias.hay_vencidas(hoy)
+    pasadas = 1
+    while recurrencias.materializar(cursor, hoy):
+        pasadas += 1
+    assert pasadas == -(-total // MAXIMO_POR_PASADA)
+    assert fechas(cursor) == [inicio + timedelta(days=i) for i in range(total)]
+    assert not recurrencias.hay_vencidas(hoy)
+
+
+def test_otro_proceso_ya_la_materializo(cursor):
+    regla = insertar_recurrencia(cursor, 1, "Sueldo", 100, "mensual", date(2024, 1, 1))
+    otra = insertar_recurrencia(cursor, 2, "Gimnasio", 50, "mensual", date(2024, 1, 1))
+    recurrencias = programador(cursor)
+    # La tabla avanzó por fuera del heap (otra instancia de la aplicación)
+    cursor.execute("UPDATE Recurrencias SET ocurrencias = 2, proxima = '2024-03-01' WHERE id = ?", (regla.id,))
+
+    assert recurrencias.materializar(cursor, date(2024, 2, 10)) == 2
+    assert fechas(cursor, "Sueldo") == []
+    assert fechas(cursor, "Gimnasio") == [date(2024, 1, 1), date(2024, 2, 1)]
+    assert estado(cursor, regla.id) == (2, "2024-03-01")
+    assert recurrencias.cargado is False
+
+    # Al recargar, la regla sigue desde lo que dice la tabla
+    recurrencias.cargar(cursor)
+    assert recurrencias.materializar(cursor, date(2024, 3, 10)) == 2
+    assert fechas(cursor, "Sueldo") == [date(2024, 3, 1)]
+    assert estado(cursor, otra.id) == (3, "2024-04-01")
+
+
+def test_regla_desactivada_en_la_tabla(cursor):
+    regla = insertar_recurrencia(cursor, 2, "Seguro", 100, "mensual", date(2024, 1, 1))
+    recurrencias = programador(cursor)
+    cursor.execute("UPDATE Recurrencias SET activa = 0 WHERE id = ?", (regla.id,))
+    assert recurrencias.materializar(cursor, date(2024, 5, 1)) == 0
+    assert fechas(cursor) == []
+    assert recurrencias.cargado is False
+
+
+def test_regla_programada_dos_veces(cursor):
+    recurrencias = programador(cursor)
+    regla = insertar_recurrencia(cursor, 2, "Internet", 100, "mensual", date(2024, 1, 10))
+    recurrencias.programar(regla)
+    recurrencias.programar(regla)
+
+    assert recurrencias.materializar(cursor, date(2024, 3, 1)) == 2
+    assert fechas(cursor) == [date(2024, 1, 10), date(2024, 2, 10)]
+    assert estado(cursor, regla.id) == (2, "2024-03-10")
+    # La segunda entrada no cuenta como cambio externo
+    assert recurrencias.cargado is True
+    assert recurrencias.siguiente() == "2024-03-10"
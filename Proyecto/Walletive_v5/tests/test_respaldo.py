@@ -0,0 +1,246 @@
+"""
+Respaldos con años archivados: ida y vuelta, contenido del .tar, archivos
+de años que el respaldo no registra, respaldos viejos de un solo archivo
+(.db.gz), verificación de particiones y retención.
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import tarfile
+from datetime import date, datetime
+
+import pytest
+
+from db_manager import DatabaseManager
+from respaldo import (
+    NOMBRE_PRINCIPAL, RespaldoInvalido, Retencion, aplicar_retencion, listar_respaldos, respaldar, restaurar,
+    verificar_particiones,
+)
+
+
+MOVIMIENTOS = [
+    (1, "Sueldo", 300000, "2022-03-01"),
+    (2, "Mercado", 45000, "2022-11-20"),
+    (1, "Sueldo", 310000, "2023-03-01"),
+    (2, "Arriendo", 120000, "2023-08-05"),
+    (1, "Sueldo", 320000, "2024-03-01"),
+    (2, "Mercado", 51000, "2024-05-12"),
+]
+
+
+@pytest.fixture
+def base(tmp_path, monkeypatch):
+    """Base con movimientos de 2022 a 2024 y 2022 ya archivado"""
+    monkeypatch.chdir(tmp_path)
+    ruta = str(tmp_path / "datos" / "walletive.db")
+    os.makedirs(os.path.dirname(ruta))
+    db = DatabaseManager(ruta)
+    with db.conexiones.transaccion() as cursor:
+        cursor.executemany("""
+            INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, fecha)
+            VALUES (?, ?, ?, 2, ? || ' 12:00:00')
+        """, MOVIMIENTOS)
+    assert db.archivar_anios_cerrados(hoy=date(2024, 7, 1)) == 2
+    yield db
+    db.cerrar()
+
+
+def foto(db):
+    return db.obtener_resumen_financiero(), db.obtener_historial(), db.obtener_reporte("anio")
+
+
+def carpeta_base(db):
+    return os.path.dirname(db.db_path)
+
+
+def respaldar_en(db, directorio, **opciones):
+    opciones.setdefault("pausa", 0)
+    return respaldar(db.conexiones, str(directorio), **opciones)
+
+
+def test_ida_y_vuelta(base, tmp_path):
+    antes = foto(base)
+    ruta = respaldar_en(base, tmp_path / "respaldos")
+
+    # Cambios posteriores al respaldo, también en el año archivado
+    with base.conexiones.transaccion() as cursor:
+        cursor.execute("""
+            INSERT INTO Movimientos (tipo, descripcion, monto, fecha) VALUES (2, 'Nuevo', 999, '2024-06-01')
+        """)
+    conn = sqlite3.connect(os.path.join(carpeta_base(base), "walletive_2022.db"))
+    conn.execute("DELETE FROM Movimientos")
+    conn.commit()
+    conn.close()
+    assert foto(base) != antes
+    base.cerrar()
+
+    restaurar(ruta, base.db_path)
+    restaurada = DatabaseManager(base.db_path)
+    try:
+        assert foto(restaurada) == antes
+        assert restaurada.check_summaries() == []
+    finally:
+        restaurada.cerrar()
+
+
+@pytest.mark.parametrize("comprimir, extension", [(True, ".tar.gz"), (False, ".tar")])
+def test_contenido_del_tar(base, tmp_path, comprimir, extension):
+    ruta = respaldar_en(base, tmp_path / "respaldos", comprimir=comprimir, ahora=datetime(2024, 7, 2, 8, 30))
+    assert os.path.basename(ruta) == f"walletive_20240702_083000{extension}"
+    # Sin restos de la copia
+    assert os.listdir(tmp_path / "respaldos") == [os.path.basename(ruta)]
+
+    with tarfile.open(ruta) as tar:
+        miembros = tar.getmembers()
+        assert sorted(miembro.name for miembro in miembros) == [NOMBRE_PRINCIPAL, "walletive_2022.db"]
+        assert all(miembro.isfile() for miembro in miembros)
+        tar.extractall(tmp_path / "extraido")
+    conn = sqlite3.connect(tmp_path / "extraido" / "walletive_2022.db")
+    assert conn.execute("SELECT COUNT(*) FROM Movimientos").fetchone()[0] == 2
+    # Una sola base por archivo, sin -wal
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+    assert listar_respaldos(str(tmp_path / "respaldos"), "walletive")[0].ruta == ruta
+
+
+def test_anios_archivados_despues_del_respaldo(base, tmp_path):
+    antes = foto(base)
+    ruta = respaldar_en(base, tmp_path / "respaldos")
+    assert base.archivar_anios_cerrados(hoy=date(2025, 1, 1)) == 2
+    base.cerrar()
+
+    restaurar(ruta, base.db_path)
+    # El archivo de 2023 no está en el respaldo: sus movimientos vuelven a la base principal
+    carpeta = carpeta_base(base)
+    assert sorted(nombre for nombre in os.listdir(carpeta) if nombre.startswith("walletive_")) == [
+        "walletive_2022.db", "walletive_2023.db.antes_de_restaurar",
+    ]
+    restaurada = DatabaseManager(base.db_path)
+    try:
+        assert foto(restaurada) == antes
+        with restaurada.conexiones.lectura() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM Movimientos WHERE fecha LIKE '2023-%'")
+            assert cursor.fetchone()[0] == 2
+    finally:
+        restaurada.cerrar()
+
+
+def respaldo_de_un_archivo(db, directorio):
+    """Respaldo como los de antes de archivar por años: solo la base, en .db.gz"""
+    os.makedirs(directorio, exist_ok=True)
+    plano = os.path.join(directorio, "plano.db")
+    with db.conexiones.lectura() as cursor:
+        destino = sqlite3.connect(plano)
+        cursor.connection.backup(destino)
+        destino.close()
+    ruta = os.path.join(directorio, "walletive_20240101_000000.db.gz")
+    with open(plano, "rb") as entrada, gzip.open(ruta, "wb") as salida:
+        shutil.copyfileobj(entrada, salida)
+    os.remove(plano)
+    return ruta
+
+
+def test_restaurar_respaldo_de_un_archivo(base, tmp_path):
+    antes = foto(base)
+    ruta = respaldo_de_un_archivo(base, tmp_path / "viejos")
+    assert [r.ruta for r in listar_respaldos(str(tmp_path / "viejos"), "walletive")] == [ruta]
+    with base.conexiones.transaccion() as cursor:
+        cursor.execute("DELETE FROM Movimientos")
+    base.cerrar()
+
+    # Sus años archivados son los que están junto a la base
+    restaurar(ruta, base.db_path)
+    restaurada = DatabaseManager(base.db_path)
+    try:
+        assert foto(restaurada) == antes
+    finally:
+        restaurada.cerrar()
+
+
+def test_respaldo_de_un_archivo_sin_su_particion(base, tmp_path):
+    ruta = respaldo_de_un_archivo(base, tmp_path / "viejos")
+    base.cerrar()
+    particion = os.path.join(carpeta_base(base), "walletive_2022.db")
+    os.replace(particion, tmp_path / "apartada.db")
+    antes = open(base.db_path, "rb").read()
+
+    with pytest.raises(RespaldoInvalido, match="Falta walletive_2022.db"):
+        restaurar(ruta, base.db_path)
+    # No se tocó nada
+    assert open(base.db_path, "rb").read() == antes
+    assert not os.path.exists(base.db_path + ".restaurando")
+
+
+# === verificar_particiones ===
+
+@pytest.fixture
+def copia(base, tmp_path):
+    """Base principal y partición copiadas a una carpeta para alterarlas"""
+    carpeta = tmp_path / "copia"
+    carpeta.mkdir()
+    base.cerrar()
+    for nombre in ("walletive.db", "walletive_2022.db"):
+        shutil.copyfile(os.path.join(carpeta_base(base), nombre), carpeta / nombre)
+    return str(carpeta / "walletive.db"), str(carpeta)
+
+
+def test_verificar_particiones_sanas(copia):
+    principal, carpeta = copia
+    assert verificar_particiones(principal, carpeta) == [
+        ("walletive_2022.db", os.path.join(carpeta, "walletive_2022.db")),
+    ]
+
+
+def test_verificar_particiones_faltan_filas(copia):
+    principal, carpeta = copia
+    conn = sqlite3.connect(os.path.join(carpeta, "walletive_2022.db"))
+    conn.execute("DELETE FROM Movimientos WHERE id = (SELECT MIN(id) FROM Movimientos)")
+    conn.commit()
+    conn.close()
+    with pytest.raises(RespaldoInvalido, match="tiene 1 movimientos y se registraron 2"):
+        verificar_particiones(principal, carpeta)
+
+
+def test_verificar_particiones_archivo_que_no_es_base(copia):
+    principal, carpeta = copia
+    with open(os.path.join(carpeta, "walletive_2022.db"), "wb") as f:
+        f.write(b"esto no es una base de datos" * 200)
+    with pytest.raises(RespaldoInvalido, match="walletive_2022.db"):
+        verificar_particiones(principal, carpeta)
+
+
+def test_verificar_particiones_nombre_con_ruta(copia):
+    principal, carpeta = copia
+    conn = sqlite3.connect(principal)
+    conn.execute("UPDATE Particiones SET archivo = '../walletive_2022.db'")
+    conn.commit()
+    conn.close()
+    with pytest.raises(RespaldoInvalido, match="Nombre de archivo inválido"):
+        verificar_particiones(principal, carpeta)
+
+
+# === Retención ===
+
+def test_retencion(tmp_path):
+    fechas = [
+        datetime(2025, 3, 10, 10), datetime(2025, 3, 10, 9), datetime(2025, 3, 9, 12), datetime(2025, 3, 8, 12),
+        datetime(2025, 3, 1, 12), datetime(2025, 2, 20, 12), datetime(2025, 1, 15, 12),
+    ]
+    for fecha in fechas:
+        (tmp_path / f"walletive_{fecha:%Y%m%d_%H%M%S}.tar.gz").touch()
+    # Otras bases y copias a medio hacer no se tocan
+    otros = ["otra_20240101_000000.tar.gz", "walletive_20240101_000000.tar.parcial"]
+    for nombre in otros:
+        (tmp_path / nombre).touch()
+
+    borrados = aplicar_retencion(str(tmp_path), "walletive",
+                                 Retencion(recientes=2, diarios=3, semanales=2, mensuales=2))
+    # Recientes: los dos del 10/3; días: 10, 9 y 8/3; semanas ISO 11 y 10; meses: marzo y febrero
+    assert sorted(r.fecha for r in borrados) == [datetime(2025, 1, 15, 12), datetime(2025, 3, 1, 12)]
+    assert [r.fecha for r in listar_respaldos(str(tmp_path), "walletive")] == [
+        datetime(2025, 3, 10, 10), datetime(2025, 3, 10, 9), datetime(2025, 3, 9, 12), datetime(2025, 3, 8, 12),
+        datetime(2025, 2, 20, 12),
+    ]
+    assert all((tmp_path / nombre).exists() for nombre in otros)
@@ -0,0 +1,130 @@
+"""
+Listado paginado de movimientos para la pantalla de Transacciones
+Las páginas se piden por clave (keyset): en lugar de OFFSET se recuerda la
+clave (valor de orden, id) de la última fila vista y se continúa desde ahí,
+así cada página cuesta lo mismo sin importar cuán profundo esté el scroll.
+Filtros y orden se resuelven en SQL, apoyados en los índices de Movimientos;
+el texto se busca en el índice FTS5 (busqueda.py) en lugar de con LIKE.
+"""
+
+from collections import namedtuple
+
+from busqueda import expresion_busqueda
+
+
+NOMBRES_TIPO = {1: "Ingreso", 2: "Gasto", 3: "Meta"}
+NOMBRES_CATEGORIA = {1: "Fijo", 2: "Variable", 3: "Esporádico", 4: "Imprevisto", 5: "Ahorro"}
+
+# Columnas por las que se puede ordenar (todas con índice que termina en id).
+# "relevancia" solo aplica con texto de búsqueda y ordena por el rank de bm25
+ORDENES = ("fecha", "monto", "relevancia")
+
+# Columnas de cada fila retornada (con orden por relevancia se agrega el rank)
+COLUMNAS = ("id", "fecha", "tipo", "descripcion", "categoria_id", "monto", "relevancia")
+_POSICION = {columna: i for i, columna in enumerate(COLUMNAS)}
+
+# categoria_id = 0 filtra los movimientos sin categoría; hasta es inclusivo
+FiltroMovimientos = namedtuple("FiltroMovimientos", ["tipo", "categoria_id", "desde", "hasta", "texto"],
+                               defaults=[None, None, None, None, None])
+
+
+def condiciones_filtro(filtro, con_texto=True):
+    """Traducir un FiltroMovimientos a (lista de condiciones SQL, parámetros)
+
+    Con con_texto=False se omite la condición de texto (cuando la consulta ya
+    hace el MATCH contra el índice de búsqueda).
+    """
+    condiciones, parametros = [], []
+    if filtro is None:
+        return condiciones, parametros
+
+    if filtro.tipo is not None:
+        condiciones.append("tipo = ?")
+        parametros.append(filtro.tipo)
+    if filtro.categoria_id is not None:
+        if filtro.categoria_id == 0:
+            condiciones.append("categoria_id IS NULL")
+        else:
+            condiciones.append("categoria_id = ?")
+            parametros.append(filtro.categoria_id)
+    if filtro.desde:
+        condiciones.append("fecha >= ?")
+        parametros.append(str(filtro.desde))
+    if filtro.hasta:
+        condiciones.append("fecha < date(?, '+1 day')")
+        parametros.append(str(filtro.hasta))
+    expresion = expresion_busqueda(filtro.texto) if con_texto else None
+    if expresion:
+        condiciones.append("id IN (SELECT rowid FROM MovimientosFTS WHERE MovimientosFTS MATCH ?)")
+        parametros.append(expresion)
+    return condiciones, parametros
+
+
+def clave_fila(fila, orden="fecha"):
+    """Clave de paginación (valor de orden, id) de una fila"""
+    return (fila[_POSICION[orden]], fila[0])
+
+
+def consultar_pagina(cursor, filtro=None, orden="fecha", descendente=True,
+                     despues=None, incluir=False, limite=200):
+    """Leer una página de movimientos a partir de una clave
+
+    despues es la clave (valor de orden, id) de la última fila ya leída; con
+    incluir=True la página empieza en esa misma fila (para releer una página
+    conocida). Retorna una lista de tuplas en el orden de COLUMNAS.
+    """
+    if orden not in ORDENES:
+        raise ValueError(f"No se puede ordenar por {orden}")
+    expresion = expresion_busqueda(filtro.texto) if filtro is not None else None
+    if orden == "relevancia":
+        # Sin texto que buscar no hay nada que rankear
+        if expresion is None:
+            return []
+        return _pagina_por_relevancia(cursor, filtro, expresion, despues, incluir, limite)
+
+    condiciones, parametros = condiciones_filtro(filtro)
+    if despues is not None:
+        operador = ("<" if descendente else ">") + ("=" if incluir else "")
+        condiciones.append(f"({orden}, id) {operador} (?, ?)")
+        parametros.extend(despues)
+
+    sentido = "DESC" if descendente else "ASC"
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    cursor.execute(f"""
+        SELECT {', '.join(COLUMNAS[:-1])}
+        FROM Movimientos
+        {where}
+        ORDER BY {orden} {sentido}, id {sentido}
+        LIMIT ?
+    """, parametros + [int(limite)])
+    return cursor.fetchall()
+
+
+def _pagina_por_relevancia(cursor, filtro, expresion, despues, incluir, limite):
+    """Página de resultados de búsqueda ordenados por rank (más relevantes primero)"""
+    condiciones, parametros = condiciones_filtro(filtro, con_texto=False)
+    condiciones.insert(0, "MovimientosFTS MATCH ?")
+    parametros.insert(0, expresion)
+    if despues is not None:
+        operador = ">=" if incluir else ">"
+        condiciones.append(f"(MovimientosFTS.rank, m.id) {operador} (?, ?)")
+        parametros.extend(despues)
+
+    columnas = ", ".join(f"m.{columna}" for columna in COLUMNAS[:-1])
+    cursor.execute(f"""
+        SELECT {columnas}, MovimientosFTS.rank
+        FROM MovimientosFTS
+        JOIN Movimientos m ON m.id = MovimientosFTS.rowid
+        WHERE {' AND '.join(condiciones)}
+        ORDER BY MovimientosFTS.rank, m.id
+        LIMIT ?
+    """, parametros + [int(limite)])
+    return cursor.fetchall()
+
+
+def contar_movimientos(cursor, filtro=None):
+    """Cantidad de movimientos que cumplen el filtro"""
+    condiciones, parametros = condiciones_filtro(filtro)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    cursor.execute(f"SELECT COUNT(*) FROM Movimientos {where}", parametros)
+    return cursor.fetchone()[0]
@@ -0,0 +1,184 @@
+"""
+Vencimientos de metas de ahorro
+Cada meta activa genera avisos antes de su fecha límite y uno el mismo día.
+ColaVencimientos los mantiene en una cola de prioridad (heapq) por momento,
+de modo que el programador de la interfaz solo necesita un timer armado para
+el primer evento de la cola.
+
+Para reprogramar sin releer todas las metas, los triggers de MetasAhorro
+anotan en CambiosMetas qué meta cambió con un número de cambio creciente
+(igual que BalanceDiario): la cola pide solo las metas con cambio mayor al
+último visto y reemplaza sus eventos.
+"""
+
+import heapq
+import itertools
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+
+# Días de anticipación de cada aviso (0 = el día del vencimiento)
+AVISOS_DIAS = (7, 1, 0)
+# Hora del día a la que se muestran los avisos
+HORA_AVISO = time(9, 0)
+
+ESQUEMA_VENCIMIENTOS = [
+    """
+    CREATE TABLE IF NOT EXISTS CambiosMetas (
+        meta_id INTEGER PRIMARY KEY,
+        cambio INTEGER NOT NULL -- secuencia del último cambio de la meta
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_cambios_metas_cambio
+    ON CambiosMetas (cambio)
+    """,
+]
+
+_SIGUIENTE_CAMBIO = "(SELECT IFNULL(MAX(cambio), 0) + 1 FROM CambiosMetas)"
+
+TRIGGERS_VENCIMIENTOS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_cambios_metas_insert
+    AFTER INSERT ON MetasAhorro
+    BEGIN
+        INSERT OR REPLACE INTO CambiosMetas (meta_id, cambio) VALUES (NEW.id, {_SIGUIENTE_CAMBIO});
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_cambios_metas_update
+    AFTER UPDATE OF descripcion, fecha_limite, estado_actual, estado_logro ON MetasAhorro
+    BEGIN
+        INSERT OR REPLACE INTO CambiosMetas (meta_id, cambio) VALUES (NEW.id, {_SIGUIENTE_CAMBIO});
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_cambios_metas_delete
+    AFTER DELETE ON MetasAhorro
+    BEGIN
+        INSERT OR REPLACE INTO CambiosMetas (meta_id, cambio) VALUES (OLD.id, {_SIGUIENTE_CAMBIO});
+    END;
+    """,
+]
+
+# activa = False cuando la meta se borró, se desactivó o ya se logró
+MetaVencimiento = namedtuple("MetaVencimiento", ["id", "descripcion", "fecha_limite", "activa"])
+Evento = namedtuple("Evento", ["momento", "meta_id", "dias", "mensaje"])
+
+
+def crear_vencimientos(cursor):
+    """Crear la tabla de cambios de metas y sus triggers"""
+    for sentencia in ESQUEMA_VENCIMIENTOS + TRIGGERS_VENCIMIENTOS:
+        cursor.execute(sentencia)
+
+
+def leer_metas(cursor, desde_cambio=None):
+    """Metas para la cola: todas (desde_cambio=None) o solo las que cambiaron
+
+    Retorna (último cambio, [MetaVencimiento]).
+    """
+    cursor.execute("SELECT IFNULL(MAX(cambio), 0) FROM CambiosMetas")
+    ultimo = cursor.fetchone()[0]
+    if desde_cambio is None:
+        cursor.execute("""
+            SELECT id, descripcion, fecha_limite, 1
+            FROM MetasAhorro
+            WHERE estado_actual = 0 AND estado_logro = 0
+        """)
+    else:
+        cursor.execute("""
+            SELECT c.meta_id, m.descripcion, m.fecha_limite,
+                   IFNULL(m.estado_actual = 0 AND m.estado_logro = 0, 0)
+            FROM CambiosMetas c
+            LEFT JOIN MetasAhorro m ON m.id = c.meta_id
+            WHERE c.cambio > ?
+        """, (desde_cambio,))
+    return ultimo, [MetaVencimiento(meta_id, descripcion, fecha_limite, bool(activa))
+                    for meta_id, descripcion, fecha_limite, activa in cursor.fetchall()]
+
+
+def eventos_meta(meta, ahora=None):
+    """Avisos futuros de una meta activa"""
+    if not meta.activa or not meta.fecha_limite:
+        return []
+    ahora = ahora or datetime.now()
+    limite = date.fromisoformat(str(meta.fecha_limite)[:10])
+    eventos = []
+    for dias in AVISOS_DIAS:
+        momento = datetime.combine(limite - timedelta(days=dias), HORA_AVISO)
+        if momento <= ahora:
+            continue
+        if dias == 0:
+            mensaje = f"⏰ Hoy vence la meta '{meta.descripcion}'"
+        elif dias == 1:
+            mensaje = f"⏳ Mañana vence la meta '{meta.descripcion}'"
+        else:
+            mensaje = f"⏳ La meta '{meta.descripcion}' vence en {dias} días"
+        eventos.append(Evento(momento, meta.id, dias, mensaje))
+    return eventos
+
+
+class ColaVencimientos:
+    """Cola de prioridad de avisos con reemplazo perezoso por meta
+
+    Reprogramar una meta sube su versión; las entradas con versión vieja se
+    descartan al llegar al frente, sin buscarlas dentro del heap.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._versiones = {}
+        self._secuencia = itertools.count()  # desempate estable entre eventos del mismo momento
+        self.ultimo_cambio = None
+
+    def __len__(self):
+        return len(self._heap)
+
+    def aplicar(self, ultimo_cambio, metas, ahora=None):
+        """Reemplazar los eventos de las metas recibidas (de leer_metas)"""
+        if self.ultimo_cambio is None:
+            # Carga completa: se arma el heap de una vez en O(n)
+            self._heap = []
+            for meta in metas:
+                self._versiones[meta.id] = 0
+                self._heap.extend((evento.momento, next(self._secuencia), 0, evento)
+                                  for evento in eventos_meta(meta, ahora))
+            heapq.heapify(self._heap)
+        else:
+            for meta in metas:
+                version = self._versiones.get(meta.id, 0) + 1
+                self._versiones[meta.id] = version
+                for evento in eventos_meta(meta, ahora):
+                    heapq.heappush(self._heap, (evento.momento, next(self._secuencia), version, evento))
+            self._compactar()
+        self.ultimo_cambio = ultimo_cambio
+
+    def _compactar(self):
+        """Quitar las entradas viejas cuando ya son la mayoría del heap"""
+        if len(self._heap) <= 64 + 2 * len(AVISOS_DIAS) * len(self._versiones):
+            return
+        self._heap = [entrada for entrada in self._heap
+                      if self._versiones.get(entrada[3].meta_id) == entrada[2]]
+        heapq.heapify(self._heap)
+
+    def _limpiar_frente(self):
+        while self._heap:
+            _, _, version, evento = self._heap[0]
+            if self._versiones.get(evento.meta_id) == version:
+                return
+            heapq.heappop(self._heap)
+
+    def proximo(self):
+        """Momento del próximo evento vigente, o None"""
+        self._limpiar_frente()
+        return self._heap[0][0] if self._heap else None
+
+    def vencidos(self, ahora=None):
+        """Sacar de la cola todos los eventos cuyo momento ya llegó"""
+        ahora = ahora or datetime.now()
+        eventos = []
+        self._limpiar_frente()
+        while self._heap and self._heap[0][0] <= ahora:
+            eventos.append(heapq.heappop(self._heap)[3])
+            self._limpiar_frente()
+        return eventos
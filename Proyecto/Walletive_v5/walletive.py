@@ -1,400 +1,188 @@
-import sqlite3
+from perfil_arranque import PERFIL
+
 import os
-import json
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFrame, QSizePolicy, QLineEdit, QMessageBox, 
-    QComboBox, QGraphicsDropShadowEffect
+    QComboBox, QGraphicsDropShadowEffect, QStackedWidget, QTableView, QHeaderView,
+    QAbstractItemView, QTableWidget, QTableWidgetItem
 )
 from PyQt5.QtGui import QFont, QPixmap, QPainter, QColor
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect
+from PyQt5.QtCore import (
+    Qt, QPropertyAnimation, QEasingCurve, QRect, QTimer, QObject, pyqtSignal,
+    QAbstractTableModel, QModelIndex, QFileSystemWatcher
+)
 import sys
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
+from db_connection import ConsultaCancelada
+from db_manager import DatabaseManager
+from db_worker import DatabaseWorker, Mantenimiento
+from dinero import desde_centavos, parsear_monto
+from tema import TEMA_POR_DEFECTO, TEMAS, aplicar_tema, cambiar_propiedad, color
+from busqueda import expresion_busqueda
+from vencimientos import ColaVencimientos
+from transacciones import FiltroMovimientos, NOMBRES_CATEGORIA, NOMBRES_TIPO, clave_fila
 
-class DatabaseManager:
-    def __init__(self, db_path="walletive.db"):
-        self.db_path = db_path
-        self.config_path = "walletive_config.json"
-        self.init_database()
-    
-    def init_database(self):
-        """Crear la base de datos y las tablas si no existen"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Activar foreign keys
-            cursor.execute("PRAGMA foreign_keys = ON;")
-            
-            # Crear tabla de movimientos
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS Movimientos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    tipo INTEGER NOT NULL CHECK (tipo IN (1, 2, 3)), -- 1 = ingreso, 2 = gasto, 3 = meta
-                    descripcion TEXT,
-                    monto DECIMAL(12, 2) NOT NULL,
-                    categoria_id INTEGER CHECK (categoria_id IN (1, 2, 3, 4, 5)), -- 1 = fijo, 2 = variable, 3 = esporádico, 4 = imprevisto, 5 = ahorro
-                    fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metas_id INTEGER,
-                    FOREIGN KEY (metas_id) REFERENCES MetasAhorro(id) ON DELETE SET NULL
-                );
-            """)
-            
-            # Crear tabla de metas de ahorro
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS MetasAhorro (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    descripcion TEXT NOT NULL,
-                    monto_objetivo DECIMAL(12, 2) NOT NULL,
-                    estado_actual INTEGER NOT NULL CHECK (estado_actual IN (0, 1)), -- 0 = activo, 1 = inactivo
-                    estado_logro INTEGER NOT NULL CHECK (estado_logro IN (0, 1)), -- 0 = no alcanzado, 1 = alcanzado
-                    fecha_inicio TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    fecha_limite TIMESTAMP NOT NULL
-                );
-            """)
-            
-            # Crear tabla de frecuencia de metas
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS FrecuenciaMeta (
-                    id INTEGER PRIMARY KEY,
-                    frecuencia VARCHAR(255),
-                    FOREIGN KEY (id) REFERENCES MetasAhorro(id) ON DELETE CASCADE
-                );
-            """)
-            
-            conn.commit()
-            conn.close()
-            print("✅ Base de datos inicializada correctamente")
-            
-        except Exception as e:
-            print(f"❌ Error al inicializar la base de datos: {e}")
-    
-    def guardar_configuracion(self, nombre_usuario):
-        """Guardar configuración del usuario en archivo JSON"""
-        try:
-            config = {
-                "nombre_usuario": nombre_usuario,
-                "configurado": True,
-                "fecha_configuracion": datetime.now().isoformat()
-            }
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
-            print(f"✅ Configuración guardada: {nombre_usuario}")
-        except Exception as e:
-            print(f"❌ Error al guardar configuración: {e}")
-    
-    def cargar_configuracion(self):
-        """Cargar configuración del usuario"""
-        try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                return config
-            return None
-        except Exception as e:
-            print(f"❌ Error al cargar configuración: {e}")
-            return None
-    
-    def guardar_datos_encuesta(self, nombre_usuario, respuestas):
-        """Guardar los datos de la encuesta en las tablas correspondientes"""
-        try:
-            # Primero guardar la configuración
-            self.guardar_configuracion(nombre_usuario)
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Extraer datos de las respuestas
-            ingreso_mensual = respuestas[0]
-            gastos_fijos = respuestas[1] 
-            gastos_variables = respuestas[2]
-            tiene_deudas = respuestas[3]
-            monto_deudas = respuestas[4] if respuestas[4] else 0
-            pago_mensual_deudas = respuestas[5] if respuestas[5] else 0
-            tiene_meta_ahorro = respuestas[6]
-            monto_meta_ahorro = respuestas[7] if respuestas[7] else 0
-            meses_meta_ahorro = respuestas[8] if respuestas[8] else 0
-            
-            print(f"🔄 Guardando datos para {nombre_usuario}...")
-            print(f"   - Ingreso mensual: ${ingreso_mensual:,.2f}")
-            print(f"   - Gastos fijos: ${gastos_fijos:,.2f}")
-            print(f"   - Gastos variables: ${gastos_variables:,.2f}")
-            
-            # Crear movimiento de ingreso mensual
-            cursor.execute("""
-                INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
-                VALUES (1, 'Ingreso mensual inicial', ?, NULL)
-            """, (ingreso_mensual,))
-            print("✅ Ingreso mensual guardado")
-            
-            # Crear movimiento de gastos fijos
-            cursor.execute("""
-                INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
-                VALUES (2, 'Gastos fijos mensuales', ?, 1)
-            """, (gastos_fijos,))
-            print("✅ Gastos fijos guardados")
-            
-            # Crear movimiento de gastos variables
-            cursor.execute("""
-                INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
-                VALUES (2, 'Gastos variables mensuales', ?, 2)
-            """, (gastos_variables,))
-            print("✅ Gastos variables guardados")
-            
-            # Si tiene deudas, crear movimientos
-            if tiene_deudas == "Sí":
-                cursor.execute("""
-                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
-                    VALUES (2, 'Deudas totales', ?, 4)
-                """, (monto_deudas,))
-                
-                cursor.execute("""
-                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id)
-                    VALUES (2, 'Pago mensual de deudas', ?, 4)
-                """, (pago_mensual_deudas,))
-                print(f"✅ Deudas guardadas: ${monto_deudas:,.2f}")
-            
-            # Si tiene meta de ahorro, crear meta y movimiento
-            if tiene_meta_ahorro == "Sí":
-                # Calcular fecha límite
-                fecha_limite = datetime.now() + timedelta(days=30 * meses_meta_ahorro)
-                
-                # Crear meta de ahorro
-                cursor.execute("""
-                    INSERT INTO MetasAhorro (descripcion, monto_objetivo, estado_actual, estado_logro, fecha_limite)
-                    VALUES (?, ?, 0, 0, ?)
-                """, ("Meta de ahorro principal", monto_meta_ahorro, fecha_limite))
-                
-                meta_id = cursor.lastrowid
-                
-                # Crear movimiento de meta
-                cursor.execute("""
-                    INSERT INTO Movimientos (tipo, descripcion, monto, categoria_id, metas_id)
-                    VALUES (3, 'Meta de ahorro', ?, 5, ?)
-                """, (monto_meta_ahorro, meta_id))
-                
-                # Crear frecuencia de meta (asumiendo mensual)
-                cursor.execute("""
-                    INSERT INTO FrecuenciaMeta (id, frecuencia)
-                    VALUES (?, 'mensual')
-                """, (meta_id,))
-                
-                print(f"✅ Meta de ahorro guardada: ${monto_meta_ahorro:,.2f} en {meses_meta_ahorro} meses")
-            
-            conn.commit()
-            conn.close()
-            print("✅ Todos los datos de encuesta guardados correctamente")
-            
-            # Verificar que se guardaron los datos
-            self.verificar_datos_guardados()
-            
-        except Exception as e:
-            print(f"❌ Error al guardar encuesta: {e}")
-            if 'conn' in locals():
-                conn.rollback()
-                conn.close()
-    
-    def verificar_datos_guardados(self):
-        """Verificar qué datos se han guardado en la base de datos"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Contar movimientos
-            cursor.execute("SELECT COUNT(*) FROM Movimientos")
-            count_movimientos = cursor.fetchone()[0]
-            
-            # Contar metas
-            cursor.execute("SELECT COUNT(*) FROM MetasAhorro")
-            count_metas = cursor.fetchone()[0]
-            
-            # Mostrar movimientos
-            cursor.execute("SELECT tipo, descripcion, monto FROM Movimientos ORDER BY fecha DESC")
-            movimientos = cursor.fetchall()
-            
-            print(f"\n📊 VERIFICACIÓN DE DATOS:")
-            print(f"   - Movimientos guardados: {count_movimientos}")
-            print(f"   - Metas guardadas: {count_metas}")
-            print(f"   - Movimientos detallados:")
-            for mov in movimientos:
-                tipo_str = "Ingreso" if mov[0] == 1 else "Gasto" if mov[0] == 2 else "Meta"
-                print(f"     * {tipo_str}: {mov[1]} - ${mov[2]:,.2f}")
-            
-            conn.close()
-            
-        except Exception as e:
-            print(f"❌ Error al verificar datos: {e}")
-    
-    def usuario_existe(self):
-        """Verificar si ya existe un usuario registrado"""
-        config = self.cargar_configuracion()
-        return config is not None and config.get("configurado", False)
-    
-    def obtener_nombre_usuario(self):
-        """Obtener el nombre del usuario"""
-        config = self.cargar_configuracion()
-        if config:
-            return config.get("nombre_usuario", "Usuario")
-        return "Usuario"
-    
-    def obtener_resumen_financiero(self):
-        """Obtener resumen financiero del usuario"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Obtener ingresos
-            cursor.execute("SELECT SUM(monto) FROM Movimientos WHERE tipo = 1")
-            ingresos = cursor.fetchone()[0] or 0
-            
-            # Obtener gastos
-            cursor.execute("SELECT SUM(monto) FROM Movimientos WHERE tipo = 2")
-            gastos = cursor.fetchone()[0] or 0
-            
-            # Obtener metas
-            cursor.execute("SELECT SUM(monto_objetivo) FROM MetasAhorro WHERE estado_actual = 0")
-            metas = cursor.fetchone()[0] or 0
-            
-            conn.close()
-            
-            return {
-                "ingresos": ingresos,
-                "gastos": gastos,
-                "metas": metas,
-                "balance": ingresos - gastos
-            }
-            
-        except Exception as e:
-            print(f"❌ Error al obtener resumen: {e}")
-            return {"ingresos": 0, "gastos": 0, "metas": 0, "balance": 0}
+PERFIL.marcar("importaciones")
 
 
-class Walletive(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.db_manager = DatabaseManager()
-        self.setWindowTitle("Walletive - Finanzas Personales")
-        self.setFixedSize(1600, 900)
-        self.setStyleSheet("background-color: #181818; color: white;")
-        
-        # Verificar si es primera vez
-        if not self.db_manager.usuario_existe():
-            print("🔄 Primera vez ejecutando, mostrando encuesta...")
-            self.mostrar_encuesta()
+class DashboardViewModel(QObject):
+    # (campo, valor): solo se emite cuando el valor realmente cambia
+    cambio = pyqtSignal(str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._valores = {}
+
+    def valor(self, campo, por_defecto=None):
+        """Valor actual de un campo"""
+        return self._valores.get(campo, por_defecto)
+
+    def actualizar(self, **valores):
+        """Guardar nuevos valores y notificar solo los que cambiaron"""
+        for campo, valor in valores.items():
+            if campo in self._valores and self._valores[campo] == valor:
+                continue
+            self._valores[campo] = valor
+            self.cambio.emit(campo, valor)
+
+    def aplicar_resumen(self, resumen):
+        """Derivar del resumen financiero los textos que muestra el dashboard"""
+        balance = resumen['balance']
+        if balance > 0:
+            recomendacion = "🎯 Considera aumentar tus metas de ahorro con el balance positivo."
         else:
-            print("✅ Usuario ya configurado, mostrando dashboard...")
-            self.mostrar_dashboard()
+            recomendacion = "💡 Revisa tus gastos variables para mejorar tu balance."
 
-    def mostrar_encuesta(self):
-        """Mostrar la encuesta inicial"""
-        self.encuesta = EncuestaInicial(self.encuesta_finalizada)
-        self.setCentralWidget(self.encuesta)
+        self.actualizar(
+            ingresos=resumen['ingresos'],
+            gastos=resumen['gastos'],
+            balance=balance,
+            balance_negativo=balance < 0,
+            metas=resumen['metas'],
+            recomendacion=recomendacion,
+        )
 
-    def encuesta_finalizada(self, nombre_usuario, respuestas):
-        """Callback cuando la encuesta termina"""
-        print(f"📝 Encuesta finalizada para: {nombre_usuario}")
-        print(f"📋 Respuestas: {respuestas}")
-        self.db_manager.guardar_datos_encuesta(nombre_usuario, respuestas)
-        self.mostrar_dashboard()
-
-    def mostrar_dashboard(self):
-        """Mostrar el dashboard principal"""
-        # Obtener datos del usuario
-        nombre_usuario = self.db_manager.obtener_nombre_usuario()
-        resumen = self.db_manager.obtener_resumen_financiero()
-        
-        print(f"🏠 Mostrando dashboard para: {nombre_usuario}")
-        print(f"💰 Resumen financiero: {resumen}")
-        
+    def aplicar_alertas(self, alertas):
+        """Texto y nivel del panel de alertas a partir de la tabla Alertas"""
+        if alertas is None:
+            return
+        if not alertas:
+            self.actualizar(alerta=("✅ Sin alertas: todo en orden", "ok"))
+            return
+        niveles = {nivel for nivel, _ in alertas}
+        nivel = "error" if "error" in niveles else "advertencia" if "advertencia" in niveles else "ok"
+        self.actualizar(alerta=("\n\n".join(mensaje for _, mensaje in alertas), nivel))
+
+    def aplicar_proyecciones(self, proyecciones):
+        """Texto de la proyección de metas a partir de la simulación"""
+        if proyecciones is None:
+            texto = "Instala NumPy para proyectar tus metas."
+        elif not proyecciones:
+            texto = "No tienes metas activas."
+        else:
+            texto = "\n".join(
+                f"{'✅' if p.probabilidad >= 0.8 else '⚠️' if p.probabilidad >= 0.5 else '❌'} "
+                f"{p.descripcion}: {p.probabilidad:.0%} de lograr ${p.objetivo:,.2f} "
+                f"al {p.fecha_limite:%d/%m/%Y}"
+                for p in proyecciones
+            )
+        self.actualizar(proyeccion=texto)
+
+
+class Dashboard(QWidget):
+    def __init__(self, viewmodel, parent=None):
+        super().__init__(parent)
+        self.viewmodel = viewmodel
+        self.setup_ui()
+        # A partir de aquí solo se tocan las etiquetas cuyo valor cambió
+        self.viewmodel.cambio.connect(self.on_cambio)
+
+    def setup_ui(self):
+        """Construir el dashboard una sola vez"""
         # Layout principal
-        main_widget = QWidget()
-        self.setCentralWidget(main_widget)
-        main_layout = QHBoxLayout(main_widget)
+        main_layout = QHBoxLayout(self)
 
         # === MENÚ LATERAL IZQUIERDO ===
         menu_frame = QFrame()
         menu_frame.setFixedWidth(280)
-        menu_frame.setStyleSheet("background-color: #121212;")
+        menu_frame.setObjectName("menuLateral")
         menu_layout = QVBoxLayout(menu_frame)
 
         title = QLabel("WALLETIVE")
         title.setFont(QFont("Segoe UI Black", 18))
-        title.setStyleSheet("color: #00d9ff;")
+        title.setObjectName("tituloMenu")
         title.setAlignment(Qt.AlignHCenter)
         menu_layout.addWidget(title)
         menu_layout.addSpacing(20)
 
+        self.botones_menu = {}
         botones = ["🏠 Dashboard", "💰 Transacciones", "🎯 Metas", "📊 Reportes", "⚙️ Ajustes"]
         for texto in botones:
             btn = QPushButton(texto)
             btn.setFont(QFont("Segoe UI", 12, QFont.Bold))
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #1e1e1e;
-                    color: white;
-                    border-radius: 10px;
-                    padding: 10px;
-                    text-align: left;
-                }
-                QPushButton:hover {
-                    background-color: #006e58;
-                }
-            """)
+            btn.setProperty("rol", "menu")
             menu_layout.addWidget(btn)
+            self.botones_menu[texto] = btn
 
         menu_layout.addStretch()
 
         # === CONTENIDO CENTRAL ===
+        # El resumen es la primera sección; las demás pantallas se agregan al abrirlas
+        self.secciones = QStackedWidget()
         main_frame = QFrame()
-        main_frame.setStyleSheet("background-color: #181818;")
+        self.secciones.addWidget(main_frame)
+        self.resumen_frame = main_frame
+        main_frame.setObjectName("contenidoCentral")
         center_layout = QVBoxLayout(main_frame)
 
-        saludo = QLabel(f"👋 ¡Hola, {nombre_usuario}!")
-        saludo.setFont(QFont("Segoe UI", 22, QFont.Bold))
-        center_layout.addWidget(saludo)
+        self.saludo = QLabel("👋 ¡Hola!")
+        self.saludo.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        center_layout.addWidget(self.saludo)
 
         subtitulo = QLabel("Resumen de estadísticas financieras")
         subtitulo.setFont(QFont("Segoe UI", 14))
-        subtitulo.setStyleSheet("color: #aaaaaa;")
+        subtitulo.setProperty("rol", "subtitulo")
         center_layout.addWidget(subtitulo)
 
         # Frame de estadísticas
         stats_frame = QFrame()
-        stats_frame.setStyleSheet("background-color: #1f1f1f; border-radius: 12px;")
+        stats_frame.setObjectName("panelEstadisticas")
         stats_frame.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         stats_layout = QVBoxLayout(stats_frame)
 
         # Mostrar estadísticas reales
         stats_title = QLabel("📊 Resumen Financiero")
         stats_title.setFont(QFont("Segoe UI", 16, QFont.Bold))
-        stats_title.setStyleSheet("color: #00d9ff;")
+        stats_title.setObjectName("tituloEstadisticas")
         stats_layout.addWidget(stats_title)
 
-        # Crear estadísticas
+        # Crear estadísticas (en estado "cargando" hasta que llegue el resumen)
         stats_info = QVBoxLayout()
         
-        ingreso_label = QLabel(f"💰 Ingresos: ${resumen['ingresos']:,.2f}")
-        ingreso_label.setFont(QFont("Segoe UI", 14))
-        ingreso_label.setStyleSheet("color: #4CAF50;")
+        self.ingreso_label = QLabel("💰 Ingresos: cargando...")
+        self.ingreso_label.setFont(QFont("Segoe UI", 14))
+        self.ingreso_label.setObjectName("ingresos")
         
-        gasto_label = QLabel(f"💸 Gastos: ${resumen['gastos']:,.2f}")
-        gasto_label.setFont(QFont("Segoe UI", 14))
-        gasto_label.setStyleSheet("color: #F44336;")
+        self.gasto_label = QLabel("💸 Gastos: cargando...")
+        self.gasto_label.setFont(QFont("Segoe UI", 14))
+        self.gasto_label.setObjectName("gastos")
         
-        balance_label = QLabel(f"📈 Balance: ${resumen['balance']:,.2f}")
-        balance_label.setFont(QFont("Segoe UI", 14))
-        balance_color = "#4CAF50" if resumen['balance'] >= 0 else "#F44336"
-        balance_label.setStyleSheet(f"color: {balance_color};")
+        self.balance_label = QLabel("📈 Balance: cargando...")
+        self.balance_label.setFont(QFont("Segoe UI", 14))
+        self.balance_label.setObjectName("balance")
+        self.balance_label.setProperty("estado", "cargando")
         
-        meta_label = QLabel(f"🎯 Metas: ${resumen['metas']:,.2f}")
-        meta_label.setFont(QFont("Segoe UI", 14))
-        meta_label.setStyleSheet("color: #FF9800;")
+        self.meta_label = QLabel("🎯 Metas: cargando...")
+        self.meta_label.setFont(QFont("Segoe UI", 14))
+        self.meta_label.setObjectName("metas")
         
-        stats_info.addWidget(ingreso_label)
-        stats_info.addWidget(gasto_label)
-        stats_info.addWidget(balance_label)
-        stats_info.addWidget(meta_label)
+        stats_info.addWidget(self.ingreso_label)
+        stats_info.addWidget(self.gasto_label)
+        stats_info.addWidget(self.balance_label)
+        stats_info.addWidget(self.meta_label)
         
         stats_layout.addLayout(stats_info)
         stats_layout.addStretch()
@@ -404,23 +192,18 @@ class Walletive(QMainWindow):
         # === PANEL DERECHO ===
         right_frame = QFrame()
         right_frame.setFixedWidth(340)
-        right_frame.setStyleSheet("background-color: #121212;")
+        right_frame.setObjectName("panelDerecho")
         right_layout = QVBoxLayout(right_frame)
 
         alert_title = QLabel("🔔 ALERTAS")
         alert_title.setFont(QFont("Segoe UI Semibold", 14))
         right_layout.addWidget(alert_title)
 
-        # Mostrar alertas basadas en el balance
-        if resumen['balance'] < 0:
-            alerta = QLabel("⚠️ Tu balance es negativo. Revisa tus gastos.")
-            alerta.setStyleSheet("color: #F44336;")
-        else:
-            alerta = QLabel("✅ Sistema configurado correctamente")
-            alerta.setStyleSheet("color: #4CAF50;")
-        
-        alerta.setWordWrap(True)
-        right_layout.addWidget(alerta)
+        self.alerta_label = QLabel("⏳ Cargando alertas...")
+        self.alerta_label.setObjectName("alerta")
+        self.alerta_label.setProperty("nivel", "cargando")
+        self.alerta_label.setWordWrap(True)
+        right_layout.addWidget(self.alerta_label)
 
         right_layout.addSpacing(30)
 
@@ -428,31 +211,1020 @@ class Walletive(QMainWindow):
         rec_title.setFont(QFont("Segoe UI Semibold", 14))
         right_layout.addWidget(rec_title)
 
-        if resumen['balance'] > 0:
-            rec = QLabel("🎯 Considera aumentar tus metas de ahorro con el balance positivo.")
-        else:
-            rec = QLabel("💡 Revisa tus gastos variables para mejorar tu balance.")
-        
-        rec.setWordWrap(True)
-        right_layout.addWidget(rec)
+        self.rec_label = QLabel("")
+        self.rec_label.setWordWrap(True)
+        right_layout.addWidget(self.rec_label)
+
+        right_layout.addSpacing(30)
+
+        proyeccion_title = QLabel("🎯 PROYECCIÓN DE METAS")
+        proyeccion_title.setFont(QFont("Segoe UI Semibold", 14))
+        right_layout.addWidget(proyeccion_title)
+
+        self.proyeccion_label = QLabel("⏳ Calculando...")
+        self.proyeccion_label.setWordWrap(True)
+        right_layout.addWidget(self.proyeccion_label)
 
         right_layout.addStretch()
 
         # Agregar secciones al layout principal
         main_layout.addWidget(menu_frame)
-        main_layout.addWidget(main_frame, stretch=1)
+        main_layout.addWidget(self.secciones, stretch=1)
         main_layout.addWidget(right_frame)
 
+    def mostrar_seccion(self, widget=None):
+        """Mostrar una sección en el área central (None = resumen)"""
+        widget = widget or self.resumen_frame
+        if self.secciones.indexOf(widget) == -1:
+            self.secciones.addWidget(widget)
+        self.secciones.setCurrentWidget(widget)
+
+    def on_cambio(self, campo, valor):
+        """Actualizar únicamente la etiqueta ligada al campo que cambió"""
+        if campo == "nombre_usuario":
+            self.saludo.setText(f"👋 ¡Hola, {valor}!")
+        elif campo == "ingresos":
+            self.ingreso_label.setText(f"💰 Ingresos: ${valor:,.2f}")
+        elif campo == "gastos":
+            self.gasto_label.setText(f"💸 Gastos: ${valor:,.2f}")
+        elif campo == "balance":
+            self.balance_label.setText(f"📈 Balance: ${valor:,.2f}")
+        elif campo == "balance_negativo":
+            # Solo se re-aplica el estilo de esta etiqueta, no el de toda la ventana
+            cambiar_propiedad(self.balance_label, "estado", "negativo" if valor else "positivo")
+        elif campo == "metas":
+            self.meta_label.setText(f"🎯 Metas: ${valor:,.2f}")
+        elif campo == "alerta":
+            texto, nivel = valor
+            self.alerta_label.setText(texto)
+            cambiar_propiedad(self.alerta_label, "nivel", nivel)
+        elif campo == "recomendacion":
+            self.rec_label.setText(valor)
+        elif campo == "proyeccion":
+            self.proyeccion_label.setText(valor)
+
+
+class ModeloMovimientos(QAbstractTableModel):
+    """Movimientos paginados por clave con una ventana acotada en memoria
+
+    Las páginas llegan desde el hilo de datos a medida que la vista pide más
+    filas (canFetchMore/fetchMore). Solo se guardan las páginas usadas más
+    recientemente; si la vista vuelve a una página desalojada, se relee desde
+    la clave de su primera fila.
+    """
+    COLUMNAS = ["Fecha", "Tipo", "Descripción", "Categoría", "Monto"]
+    # Columna de la vista -> columna de orden en SQL
+    ORDENABLES = {0: "fecha", 4: "monto"}
+    COLORES_TIPO = {1: "ok", 2: "error", 3: "advertencia"}
+
+    # Cantidad de movimientos del filtro actual (se calcula aparte)
+    conteo = pyqtSignal(object)
+
+    def __init__(self, db, tamano_pagina=200, max_paginas=10, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.tamano_pagina = tamano_pagina
+        self.max_paginas = max_paginas
+        self.filtro = FiltroMovimientos()
+        self.orden = "fecha"
+        self.descendente = True
+        self._generacion = 0
+        self._futuros = []
+        self._limpiar()
+
+    def _limpiar(self):
+        # Las respuestas de una generación anterior (otro filtro u orden) se
+        # descartan, y las consultas que aún no terminaron se cancelan
+        for futuro in self._futuros:
+            self.db.cancelar(futuro)
+        self._futuros = []
+        self._generacion += 1
+        self._filas = 0
+        self._inicios = []              # clave de la primera fila de cada página
+        self._paginas = OrderedDict()   # número de página -> filas (orden LRU)
+        self._ultima_clave = None
+        self._completo = False
+        self._cargando = False
+        self._releyendo = set()
+
+    # === Interfaz de QAbstractTableModel ===
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._filas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if orientacion == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNAS[seccion]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        columna = index.column()
+        if role == Qt.TextAlignmentRole:
+            alineacion = Qt.AlignRight if columna == 4 else Qt.AlignLeft
+            return int(alineacion | Qt.AlignVCenter)
+
+        fila = self._fila(index.row())
+        if fila is None:
+            return "…" if role == Qt.DisplayRole else None
+        id_movimiento, fecha, tipo, descripcion, categoria_id, monto = fila[:6]
+
+        if role == Qt.DisplayRole:
+            if columna == 0:
+                return str(fecha or "")[:16]
+            if columna == 1:
+                return NOMBRES_TIPO.get(tipo, "")
+            if columna == 2:
+                return descripcion or ""
+            if columna == 3:
+                return NOMBRES_CATEGORIA.get(categoria_id, "")
+            return f"${desde_centavos(monto):,.2f}"
+        if role == Qt.ForegroundRole and columna == 4:
+            return QColor(color(self.COLORES_TIPO.get(tipo, "texto")))
+        if role == Qt.UserRole:
+            return id_movimiento
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._completo and not self._cargando
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Pedir la siguiente página a partir de la última clave cargada"""
+        if not self.canFetchMore(parent):
+            return
+        self._cargando = True
+        generacion = self._generacion
+        self._seguir(self.db.consultar(
+            "obtener_pagina_movimientos", self.filtro, self.orden, self.descendente,
+            despues=self._ultima_clave, limite=self.tamano_pagina,
+            al_terminar=lambda filas: self._pagina_recibida(generacion, filas),
+            al_fallar=lambda error: self._pagina_recibida(generacion, None, error)
+        ))
+
+    def _seguir(self, futuro):
+        """Recordar una consulta de esta generación para poder cancelarla"""
+        self._futuros = [f for f in self._futuros if not f.done()]
+        self._futuros.append(futuro)
+
+    def sort(self, columna, orden=Qt.AscendingOrder):
+        """Ordenar en SQL; solo columnas con índice"""
+        if columna not in self.ORDENABLES:
+            return
+        descendente = orden == Qt.DescendingOrder
+        if (self.ORDENABLES[columna], descendente) == (self.orden, self.descendente):
+            return
+        self.orden = self.ORDENABLES[columna]
+        self.descendente = descendente
+        self.recargar(contar=False)
+
+    # === Filtros y recarga ===
+
+    def aplicar_filtro(self, filtro):
+        """Cambiar el filtro y volver a leer desde la primera página
+
+        Al empezar a buscar texto los resultados se ordenan por relevancia;
+        al borrar la búsqueda se vuelve al orden por fecha.
+        """
+        if filtro == self.filtro:
+            return
+        buscaba, busca = bool(self.filtro.texto), bool(filtro.texto)
+        if busca and not buscaba:
+            self.orden, self.descendente = "relevancia", True
+        elif buscaba and not busca and self.orden == "relevancia":
+            self.orden, self.descendente = "fecha", True
+        self.filtro = filtro
+        self.recargar()
+
+    def recargar(self, contar=True):
+        """Descartar las filas cargadas y empezar de nuevo"""
+        self.beginResetModel()
+        self._limpiar()
+        self.endResetModel()
+        self.fetchMore()
+        if contar:
+            generacion = self._generacion
+            self._seguir(self.db.consultar(
+                "contar_movimientos", self.filtro,
+                al_terminar=lambda total: generacion == self._generacion and self.conteo.emit(total)
+            ))
+
+    # === Páginas ===
+
+    def _fila(self, numero_fila):
+        numero, posicion = divmod(numero_fila, self.tamano_pagina)
+        pagina = self._paginas.get(numero)
+        if pagina is None:
+            self._releer_pagina(numero)
+            return None
+        self._paginas.move_to_end(numero)
+        return pagina[posicion] if posicion < len(pagina) else None
+
+    def _guardar_pagina(self, numero, filas):
+        self._paginas[numero] = filas
+        self._paginas.move_to_end(numero)
+        while len(self._paginas) > self.max_paginas:
+            self._paginas.popitem(last=False)
+
+    def _pagina_recibida(self, generacion, filas, error=None):
+        if generacion != self._generacion:
+            return
+        self._cargando = False
+        if isinstance(error, ConsultaCancelada):
+            return  # Se puede volver a pedir
+        if filas is None:
+            # No reintentar en bucle: la vista volvería a pedir la misma página
+            print(f"⚠️ No se pudieron cargar más movimientos: {error}")
+            self._completo = True
+            return
+        if len(filas) < self.tamano_pagina:
+            self._completo = True
+        if not filas:
+            return
+
+        numero = len(self._inicios)
+        self._inicios.append(clave_fila(filas[0], self.orden))
+        self._ultima_clave = clave_fila(filas[-1], self.orden)
+        self.beginInsertRows(QModelIndex(), self._filas, self._filas + len(filas) - 1)
+        self._guardar_pagina(numero, filas)
+        self._filas += len(filas)
+        self.endInsertRows()
+
+    def _releer_pagina(self, numero):
+        if numero in self._releyendo or numero >= len(self._inicios):
+            return
+        self._releyendo.add(numero)
+        generacion = self._generacion
+        self._seguir(self.db.consultar(
+            "obtener_pagina_movimientos", self.filtro, self.orden, self.descendente,
+            despues=self._inicios[numero], incluir=True, limite=self.tamano_pagina,
+            al_terminar=lambda filas: self._pagina_releida(generacion, numero, filas),
+            al_fallar=lambda error: self._pagina_releida(generacion, numero, None)
+        ))
+
+    def _pagina_releida(self, generacion, numero, filas):
+        if generacion != self._generacion:
+            return
+        self._releyendo.discard(numero)
+        if not filas:
+            return
+        inicio = numero * self.tamano_pagina
+        filas = filas[:self._filas - inicio]
+        self._guardar_pagina(numero, filas)
+        self.dataChanged.emit(self.index(inicio, 0),
+                              self.index(inicio + len(filas) - 1, len(self.COLUMNAS) - 1))
+
+
+class PantallaTransacciones(QWidget):
+    # El modelo se refresca solo con datos_modificados; reabrir la pantalla no relee
+    RECARGAR_AL_MOSTRAR = False
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.modelo = ModeloMovimientos(db, parent=self)
+        self.setup_ui()
+        self.modelo.conteo.connect(self.on_conteo)
+        self.recargar()
+
+    def setup_ui(self):
+        """Construir la pantalla de transacciones"""
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("💰 Transacciones")
+        titulo.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        layout.addWidget(titulo)
+
+        # Límite del archivo: los años archivados no están en el listado ni en la búsqueda
+        self.archivo_label = QLabel("")
+        self.archivo_label.setProperty("rol", "subtitulo")
+        self.archivo_label.setWordWrap(True)
+        self.archivo_label.hide()
+        layout.addWidget(self.archivo_label)
+
+        # === FILTROS ===
+        filtros_layout = QHBoxLayout()
+
+        self.tipo_combo = QComboBox()
+        self.tipo_combo.setProperty("rol", "filtro")
+        self.tipo_combo.addItem("Todos los tipos", None)
+        for tipo, nombre in NOMBRES_TIPO.items():
+            self.tipo_combo.addItem(nombre, tipo)
+
+        self.categoria_combo = QComboBox()
+        self.categoria_combo.setProperty("rol", "filtro")
+        self.categoria_combo.addItem("Todas las categorías", None)
+        self.categoria_combo.addItem("Sin categoría", 0)
+        for categoria, nombre in NOMBRES_CATEGORIA.items():
+            self.categoria_combo.addItem(nombre, categoria)
+
+        self.buscar_input = QLineEdit()
+        self.buscar_input.setObjectName("buscarMovimientos")
+        self.buscar_input.setPlaceholderText("🔍 Buscar en la descripción...")
+        self.buscar_input.setClearButtonEnabled(True)
+
+        self.conteo_label = QLabel("")
+        self.conteo_label.setProperty("rol", "subtitulo")
+
+        filtros_layout.addWidget(self.tipo_combo)
+        filtros_layout.addWidget(self.categoria_combo)
+        filtros_layout.addWidget(self.buscar_input, stretch=1)
+        filtros_layout.addWidget(self.conteo_label)
+        layout.addLayout(filtros_layout)
+
+        # Esperar a que el usuario deje de escribir antes de consultar
+        self.timer_filtro = QTimer(self)
+        self.timer_filtro.setSingleShot(True)
+        self.timer_filtro.setInterval(250)
+        self.timer_filtro.timeout.connect(self.aplicar_filtro)
+        self.buscar_input.textChanged.connect(self.timer_filtro.start)
+        self.tipo_combo.currentIndexChanged.connect(self.aplicar_filtro)
+        self.categoria_combo.currentIndexChanged.connect(self.aplicar_filtro)
+
+        # === TABLA ===
+        self.tabla = QTableView()
+        self.tabla.setObjectName("tablaMovimientos")
+        self.tabla.setModel(self.modelo)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setAlternatingRowColors(True)
+        # Filas de alto fijo: la vista no tiene que medir cada fila al hacer scroll
+        self.tabla.verticalHeader().hide()
+        self.tabla.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabla.verticalHeader().setDefaultSectionSize(30)
+        encabezado = self.tabla.horizontalHeader()
+        encabezado.setSectionResizeMode(QHeaderView.Interactive)
+        encabezado.setSectionResizeMode(2, QHeaderView.Stretch)
+        for columna, ancho in ((0, 160), (1, 100), (3, 130), (4, 150)):
+            self.tabla.setColumnWidth(columna, ancho)
+        encabezado.setSortIndicator(0, Qt.DescendingOrder)
+        self.tabla.setSortingEnabled(True)
+        layout.addWidget(self.tabla, stretch=1)
+
+    def aplicar_filtro(self):
+        """Pasar los filtros de la barra al modelo (se resuelven en SQL)"""
+        self.timer_filtro.stop()
+        # Una letra suelta no filtra: con tan poco casi todo coincide
+        texto = self.buscar_input.text().strip()
+        self.modelo.aplicar_filtro(FiltroMovimientos(
+            tipo=self.tipo_combo.currentData(),
+            categoria_id=self.categoria_combo.currentData(),
+            texto=texto if expresion_busqueda(texto) else None,
+        ))
+        if self.modelo.orden == "relevancia":
+            # Sin indicador: el orden no corresponde a ninguna columna
+            self.tabla.horizontalHeader().setSortIndicator(-1, Qt.DescendingOrder)
+        elif self.tabla.horizontalHeader().sortIndicatorSection() == -1:
+            self.tabla.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
+
+    def recargar(self):
+        """Volver a pedir las páginas visibles, el conteo y el límite del archivo"""
+        self.modelo.recargar()
+        self.db.consultar("estado_archivo", al_terminar=self._archivo_recibido)
+
+    def _archivo_recibido(self, estado):
+        if not estado or not estado[0]:
+            self.archivo_label.hide()
+            return
+        hasta = datetime.fromisoformat(estado[0][-1].hasta[:10])
+        self.archivo_label.setText(
+            f"📦 Los movimientos hasta el {hasta:%d/%m/%Y} están archivados: no aparecen aquí "
+            f"ni en la búsqueda (Reportes y exportar sí los incluyen)"
+        )
+        self.archivo_label.show()
+
+    def on_conteo(self, total):
+        if total is not None:
+            self.conteo_label.setText(f"{total:,} movimientos")
+
+
+class PantallaReportes(QWidget):
+    # Se vuelve a pedir el reporte cada vez que se abre (puede haber cambiado el día)
+    RECARGAR_AL_MOSTRAR = True
+    # Períodos que ofrece la pantalla: (texto del combo, período, cuántos mostrar)
+    PERIODOS = [
+        ("Diario", "dia", 31),
+        ("Semanal", "semana", 26),
+        ("Mensual", "mes", 24),
+        ("Anual", "anio", 10),
+    ]
+    DIAS_POR_PERIODO = {"dia": 1, "semana": 7, "mes": 31, "anio": 366}
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._futuros = []
+        self.setup_ui()
+        self.recargar()
+
+    def setup_ui(self):
+        """Construir la pantalla de reportes"""
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("📊 Reportes")
+        titulo.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        layout.addWidget(titulo)
+
+        filtros_layout = QHBoxLayout()
+        self.periodo_combo = QComboBox()
+        self.periodo_combo.setProperty("rol", "filtro")
+        for texto, periodo, cantidad in self.PERIODOS:
+            self.periodo_combo.addItem(texto, (periodo, cantidad))
+        self.periodo_combo.setCurrentIndex(2)
+        self.periodo_combo.currentIndexChanged.connect(self.recargar)
+        filtros_layout.addWidget(self.periodo_combo)
+        filtros_layout.addStretch()
+        layout.addLayout(filtros_layout)
+
+        # Un renglón por período: la tabla nunca tiene más filas que períodos pedidos
+        self.tabla = QTableWidget(0, 6)
+        self.tabla.setObjectName("tablaReportes")
+        self.tabla.setHorizontalHeaderLabels(["Período", "Ingresos", "Gastos", "Metas", "Balance", "Movimientos"])
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.setAlternatingRowColors(True)
+        self.tabla.verticalHeader().hide()
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.tabla, stretch=1)
+
+        categorias_titulo = QLabel("💸 Gastos por categoría")
+        categorias_titulo.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        layout.addWidget(categorias_titulo)
+
+        self.categorias_label = QLabel("")
+        self.categorias_label.setProperty("rol", "subtitulo")
+        self.categorias_label.setWordWrap(True)
+        layout.addWidget(self.categorias_label)
+
+        tendencias_titulo = QLabel("📈 Tendencias")
+        tendencias_titulo.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        layout.addWidget(tendencias_titulo)
+
+        self.tendencias_label = QLabel("")
+        self.tendencias_label.setProperty("rol", "subtitulo")
+        self.tendencias_label.setWordWrap(True)
+        layout.addWidget(self.tendencias_label)
+
+    def recargar(self):
+        """Pedir el reporte del período elegido al hilo de datos"""
+        for futuro in self._futuros:
+            self.db.cancelar(futuro)
+        periodo, cantidad = self.periodo_combo.currentData()
+        hasta = datetime.now().date()
+        desde = hasta - timedelta(days=self.DIAS_POR_PERIODO[periodo] * (cantidad - 1))
+        self._futuros = [
+            self.db.consultar("obtener_reporte", periodo, desde, hasta, al_terminar=self._reporte_recibido),
+            self.db.consultar("obtener_totales_por_categoria", 2, desde, hasta,
+                              al_terminar=self._categorias_recibidas),
+            self.db.consultar("obtener_tendencias", hasta=hasta, al_terminar=self._tendencias_recibidas),
+        ]
+
+    def _reporte_recibido(self, filas):
+        # Más recientes arriba
+        filas = list(reversed(filas))
+        self.tabla.setRowCount(len(filas))
+        for numero, fila in enumerate(filas):
+            valores = [fila["inicio"]] + [f"${fila[campo]:,.2f}" for campo in ("ingresos", "gastos", "metas", "balance")]
+            valores.append(f"{fila['cantidad']:,}")
+            for columna, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                if columna:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.tabla.setItem(numero, columna, item)
+
+    def _categorias_recibidas(self, filas):
+        if not filas:
+            self.categorias_label.setText("Sin gastos en el período")
+            return
+        total = sum(monto for _, monto, _ in filas) or 1
+        self.categorias_label.setText("   ".join(
+            f"{NOMBRES_CATEGORIA.get(categoria, 'Sin categoría')}: ${monto:,.2f} ({monto / total:.0%})"
+            for categoria, monto, _ in filas
+        ))
+
+    def _tendencias_recibidas(self, tendencias):
+        if tendencias is None:
+            self.tendencias_label.setText("Instala NumPy para ver tendencias y percentiles")
+            return
+        gastos = tendencias["gastos"]
+        if not gastos:
+            self.tendencias_label.setText("Sin datos suficientes")
+            return
+        lineas = [f"Gasto del último mes: ${gastos['totales'][-1]:,.2f} "
+                  f"(promedio de 3 meses: ${gastos['media_movil'][-1]:,.2f})"]
+        relativa = gastos["variacion_relativa"][-1]
+        if relativa is not None:
+            lineas.append(f"Variación respecto del mes anterior: {relativa:+.0%}")
+        percentiles = tendencias["percentiles"]
+        if percentiles:
+            lineas.append("Gasto típico por movimiento: mediana ${:,.2f}, p90 ${:,.2f}".format(
+                percentiles[50], percentiles[90]))
+        self.tendencias_label.setText("\n".join(lineas))
+
+
+class PantallaMetas(QWidget):
+    RECARGAR_AL_MOSTRAR = True
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._futuro = None
+        self.setup_ui()
+        self.recargar()
+
+    def setup_ui(self):
+        """Construir la pantalla de metas de ahorro"""
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("🎯 Metas de ahorro")
+        titulo.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        layout.addWidget(titulo)
+
+        self.tabla = QTableWidget(0, 6)
+        self.tabla.setObjectName("tablaMetas")
+        self.tabla.setHorizontalHeaderLabels(["Meta", "Objetivo", "Aportado", "Progreso", "Fecha límite", "Estado"])
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.setAlternatingRowColors(True)
+        self.tabla.verticalHeader().hide()
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        layout.addWidget(self.tabla, stretch=1)
+
+    def recargar(self):
+        """Pedir las metas al hilo de datos"""
+        if self._futuro is not None:
+            self.db.cancelar(self._futuro)
+        self._futuro = self.db.consultar("obtener_metas", al_terminar=self._metas_recibidas)
+
+    def _metas_recibidas(self, metas):
+        self._futuro = None
+        self.tabla.setRowCount(len(metas))
+        for numero, (_, descripcion, objetivo, aportado, fecha_limite, activa, lograda) in enumerate(metas):
+            progreso = aportado / objetivo if objetivo else 0
+            estado = "✅ Lograda" if lograda else ("⏳ Activa" if activa else "⏸️ Inactiva")
+            valores = [descripcion, f"${objetivo:,.2f}", f"${aportado:,.2f}", f"{progreso:.0%}",
+                       str(fecha_limite or "")[:10], estado]
+            for columna, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                if columna in (1, 2, 3):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.tabla.setItem(numero, columna, item)
+
+
+class PantallaAjustes(QWidget):
+    RECARGAR_AL_MOSTRAR = True
+
+    def __init__(self, db, cambiar_tema, archivar, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.cambiar_tema = cambiar_tema
+        self.archivar = archivar
+        self.pendientes = []
+        self.setup_ui()
+        self.recargar()
+
+    def setup_ui(self):
+        """Construir la pantalla de ajustes"""
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("⚙️ Ajustes")
+        titulo.setFont(QFont("Segoe UI", 22, QFont.Bold))
+        layout.addWidget(titulo)
+
+        # === TEMA ===
+        tema_titulo = QLabel("🎨 Tema")
+        tema_titulo.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        layout.addWidget(tema_titulo)
+
+        self.tema_combo = QComboBox()
+        self.tema_combo.setProperty("rol", "filtro")
+        for nombre in TEMAS:
+            self.tema_combo.addItem(nombre.capitalize(), nombre)
+        actual = QApplication.instance().property("tema") or TEMA_POR_DEFECTO
+        self.tema_combo.setCurrentIndex(max(self.tema_combo.findData(actual), 0))
+        self.tema_combo.currentIndexChanged.connect(lambda: self.cambiar_tema(self.tema_combo.currentData()))
+        layout.addWidget(self.tema_combo)
+
+        layout.addSpacing(30)
+
+        # === RESPALDOS ===
+        respaldo_titulo = QLabel("💾 Respaldos")
+        respaldo_titulo.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        layout.addWidget(respaldo_titulo)
+
+        self.respaldo_label = QLabel("")
+        self.respaldo_label.setProperty("rol", "subtitulo")
+        layout.addWidget(self.respaldo_label)
+
+        self.respaldar_btn = QPushButton("💾 Respaldar ahora")
+        self.respaldar_btn.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.respaldar_btn.setProperty("rol", "menu")
+        self.respaldar_btn.clicked.connect(self.respaldar)
+        layout.addWidget(self.respaldar_btn)
+
+        layout.addSpacing(30)
+
+        # === ARCHIVO ===
+        archivo_titulo = QLabel("📦 Años anteriores")
+        archivo_titulo.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        layout.addWidget(archivo_titulo)
+
+        self.archivo_label = QLabel("")
+        self.archivo_label.setProperty("rol", "subtitulo")
+        self.archivo_label.setWordWrap(True)
+        layout.addWidget(self.archivo_label)
+
+        self.archivar_btn = QPushButton("📦 Archivar años cerrados")
+        self.archivar_btn.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.archivar_btn.setProperty("rol", "menu")
+        self.archivar_btn.setEnabled(False)
+        self.archivar_btn.clicked.connect(self.confirmar_archivo)
+        layout.addWidget(self.archivar_btn)
+
+        layout.addStretch()
+
+    def recargar(self):
+        """Mostrar la fecha del último respaldo y el estado del archivo"""
+        self.db.consultar("listar_respaldos", al_terminar=self._respaldos_recibidos)
+        self.db.consultar("estado_archivo", al_terminar=self._archivo_recibido)
+
+    def _archivo_recibido(self, estado):
+        self.pendientes = estado[1] if estado else []
+        self.archivar_btn.setEnabled(bool(self.pendientes))
+        if estado is None:
+            self.archivo_label.setText("❌ No se pudo leer el archivo")
+            return
+        particiones, pendientes = estado
+        lineas = [
+            f"Archivados: {', '.join(str(p.anio) for p in particiones)}" if particiones
+            else "Todavía no hay años archivados"
+        ]
+        if pendientes:
+            lineas.append(f"Se pueden archivar: {', '.join(map(str, pendientes))}")
+        self.archivo_label.setText("\n".join(lineas))
+
+    def confirmar_archivo(self):
+        """Archivar solo con la confirmación del usuario: el listado pierde esos años"""
+        anios = ", ".join(map(str, self.pendientes))
+        respuesta = QMessageBox.question(
+            self, "Archivar años cerrados",
+            f"Los movimientos de {anios} pasarán a archivos aparte.\n\n"
+            "Dejarán de aparecer en Transacciones y en la búsqueda; los reportes, "
+            "los totales, los respaldos y la exportación los siguen incluyendo.\n\n"
+            "¿Archivar ahora?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No,
+        )
+        if respuesta != QMessageBox.Yes:
+            return
+        self.archivar_btn.setEnabled(False)
+        self.archivo_label.setText("⏳ Archivando...")
+        self.archivar(lambda movidos: self.recargar())
+
+    def respaldar(self):
+        """Respaldo en línea (como lectura: no frena las escrituras)"""
+        self.respaldar_btn.setEnabled(False)
+        self.respaldo_label.setText("⏳ Respaldando...")
+        self.db.consultar("respaldar", al_terminar=self._respaldo_terminado)
+
+    def _respaldo_terminado(self, ruta):
+        self.respaldar_btn.setEnabled(True)
+        if ruta is None:
+            self.respaldo_label.setText("❌ No se pudo crear el respaldo")
+            return
+        self.recargar()
+
+    def _respaldos_recibidos(self, respaldos):
+        if not respaldos:
+            self.respaldo_label.setText("Todavía no hay respaldos")
+            return
+        self.respaldo_label.setText(
+            f"Último respaldo: {respaldos[0].fecha:%d/%m/%Y %H:%M} ({len(respaldos)} guardados)"
+        )
+
+
+class ProgramadorNotificaciones(QObject):
+    """Avisos de vencimiento de metas con un único QTimer
+
+    El timer se arma para el primer evento de la cola; sin eventos no hay
+    timer corriendo. Los intervalos largos se parten en tramos de a lo sumo
+    un día para seguir al reloj si el equipo se suspende.
+    """
+    notificacion = pyqtSignal(object)
+
+    MAXIMO_ESPERA_MS = 24 * 60 * 60 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cola = ColaVencimientos()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._disparar)
+
+    @property
+    def ultimo_cambio(self):
+        return self.cola.ultimo_cambio
+
+    def aplicar_cambios(self, resultado):
+        """Recibir (último cambio, metas) de leer_cambios_metas y re-armar el timer"""
+        if resultado is None:
+            return
+        ultimo_cambio, metas = resultado
+        if metas or self.cola.ultimo_cambio is None:
+            self.cola.aplicar(ultimo_cambio, metas)
+            self._armar()
+        else:
+            self.cola.ultimo_cambio = ultimo_cambio
+
+    def _armar(self):
+        proximo = self.cola.proximo()
+        if proximo is None:
+            self.timer.stop()
+            return
+        espera = (proximo - datetime.now()).total_seconds() * 1000
+        self.timer.start(int(min(max(espera, 0), self.MAXIMO_ESPERA_MS)))
+
+    def _disparar(self):
+        for evento in self.cola.vencidos():
+            self.notificacion.emit(evento)
+        self._armar()
+
+    def detener(self):
+        self.timer.stop()
+
+
+class VigilanteConfiguracion(QObject):
+    """Recarga la configuración cuando otro programa edita el archivo JSON
+    
+    Se vigila también la carpeta: un reemplazo atómico (temporal + rename)
+    saca al archivo de la lista del QFileSystemWatcher y hay que volver a
+    agregarlo.
+    """
+    cambio = pyqtSignal(object)
+
+    def __init__(self, almacen, parent=None):
+        super().__init__(parent)
+        self.almacen = almacen
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.addPath(os.path.dirname(almacen.ruta))
+        self._vigilar_archivo()
+        self.watcher.fileChanged.connect(self._revisar)
+        self.watcher.directoryChanged.connect(self._revisar)
+
+    def _vigilar_archivo(self):
+        if os.path.exists(self.almacen.ruta) and self.almacen.ruta not in self.watcher.files():
+            self.watcher.addPath(self.almacen.ruta)
+
+    def _revisar(self, ruta=None):
+        self._vigilar_archivo()
+        # recargar() solo lee el archivo si cambió su fecha o tamaño
+        if self.almacen.recargar():
+            print("🔄 Configuración recargada desde el archivo")
+            self.cambio.emit(self.almacen.actual)
+
+
+class Walletive(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        # La configuración se lee aquí; crear el DatabaseManager no abre conexiones:
+        # el hilo de datos las abre al usarlo y crea el esquema antes que nada
+        self.db_manager = DatabaseManager(inicializar=False)
+        self.db = DatabaseWorker(lambda: self.db_manager, parent=self)
+        self.db.enviar(Mantenimiento("init_database"))
+        self.setWindowTitle("Walletive - Finanzas Personales")
+        self.setFixedSize(1600, 900)
+        
+        # Las pantallas viven en un stack: cambiar de pantalla no destruye widgets
+        self.pantallas = QStackedWidget()
+        self.setCentralWidget(self.pantallas)
+        self.encuesta = None
+        self.dashboard = None
+        self.dashboard_vm = DashboardViewModel(self)
+        # Las secciones del menú se construyen la primera vez que se abren
+        self._fabricas = {
+            "transacciones": lambda: PantallaTransacciones(self.db),
+            "metas": lambda: PantallaMetas(self.db),
+            "reportes": lambda: PantallaReportes(self.db),
+            "ajustes": lambda: PantallaAjustes(self.db, self.cambiar_tema, self.archivar_anios_cerrados),
+        }
+        self.secciones_abiertas = {}
+        # Hitos que faltan para dar por terminado el arranque (perfil de arranque)
+        self._hitos_arranque = {"primer pintado", "primer resumen"}
+        
+        # Refrescar el resumen y el listado cuando un comando modifica los datos
+        self._resumen_en_curso = False
+        self._resumen_pendiente = False
+        self.db.datos_modificados.connect(self.on_datos_modificados)
+        
+        # Checkpoint periódico del WAL cuando la base está inactiva
+        self.timer_wal = QTimer(self)
+        self.timer_wal.timeout.connect(lambda: self.db.enviar(Mantenimiento("mantenimiento_wal")))
+        self.timer_wal.start(10000)
+        
+        # Movimientos recurrentes: al arrancar y luego cada hora (si nada vence, no se toca la base)
+        self.timer_recurrencias = QTimer(self)
+        self.timer_recurrencias.timeout.connect(self.materializar_recurrencias)
+        self.timer_recurrencias.start(60 * 60 * 1000)
+        self.materializar_recurrencias()
+        
+        # Respaldo diario en línea (como lectura: no frena las escrituras); se revisa cada hora
+        self.timer_respaldo = QTimer(self)
+        self.timer_respaldo.timeout.connect(lambda: self.db.consultar("respaldar_si_corresponde"))
+        self.timer_respaldo.start(60 * 60 * 1000)
+        self.db.consultar("respaldar_si_corresponde")
+        
+        # Avisos de vencimiento de metas: un solo timer armado para el próximo
+        self.notificaciones = ProgramadorNotificaciones(self)
+        self.notificaciones.notificacion.connect(self.on_notificacion)
+        self.db.consultar("leer_cambios_metas", al_terminar=self.notificaciones.aplicar_cambios)
+        
+        # Cambios hechos al archivo de configuración por fuera de la aplicación
+        self.vigilante_configuracion = None
+        if self.db_manager.configuracion.conexiones is None:
+            self.vigilante_configuracion = VigilanteConfiguracion(self.db_manager.configuracion, self)
+            self.vigilante_configuracion.cambio.connect(self.on_configuracion)
+        
+        # Verificar si es primera vez
+        with PERFIL.fase("configuracion"):
+            usuario_existe = self.db_manager.usuario_existe()
+        with PERFIL.fase("pantalla inicial"):
+            if not usuario_existe:
+                print("🔄 Primera vez ejecutando, mostrando encuesta...")
+                # Con la encuesta no hay resumen que esperar
+                self._hitos_arranque.discard("primer resumen")
+                self.mostrar_encuesta()
+            else:
+                print("✅ Usuario ya configurado, mostrando dashboard...")
+                self.mostrar_dashboard()
+
+    def cambiar_tema(self, nombre):
+        """Cambiar el tema de toda la aplicación (un solo repolish)"""
+        aplicar_tema(QApplication.instance(), nombre)
+        print(f"🎨 Tema aplicado: {nombre}")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self._hito_arranque("primer pintado")
+
+    def _hito_arranque(self, nombre):
+        """Registrar un hito del arranque; con el último se imprime el perfil"""
+        if nombre not in self._hitos_arranque:
+            return
+        self._hitos_arranque.discard(nombre)
+        PERFIL.marcar(nombre)
+        if not self._hitos_arranque:
+            PERFIL.terminar()
+
+    def closeEvent(self, event):
+        """Terminar las operaciones pendientes y cerrar la base de datos al salir"""
+        self.timer_wal.stop()
+        self.timer_recurrencias.stop()
+        self.timer_respaldo.stop()
+        self.notificaciones.detener()
+        self.db.detener()
+        super().closeEvent(event)
+
+    def on_configuracion(self, configuracion):
+        """Aplicar una configuración editada por fuera (por ahora, el nombre)"""
+        if configuracion.nombre_usuario:
+            self.dashboard_vm.actualizar(nombre_usuario=configuracion.nombre_usuario)
+
+    def mostrar_encuesta(self):
+        """Mostrar la encuesta inicial"""
+        self.encuesta = EncuestaInicial(self.encuesta_finalizada)
+        self.pantallas.addWidget(self.encuesta)
+        self.pantallas.setCurrentWidget(self.encuesta)
+
+    def encuesta_finalizada(self, nombre_usuario, respuestas):
+        """Callback cuando la encuesta termina"""
+        print(f"📝 Encuesta finalizada para: {nombre_usuario}")
+        print(f"📋 Respuestas: {respuestas}")
+        # El guardado corre en el hilo de datos; al terminar, datos_modificados
+        # dispara el refresco del resumen
+        self.db.ejecutar("guardar_datos_encuesta", nombre_usuario, respuestas)
+        self.mostrar_dashboard(nombre_usuario)
+        
+        # La encuesta no se vuelve a usar
+        self.pantallas.removeWidget(self.encuesta)
+        self.encuesta.deleteLater()
+        self.encuesta = None
+
+    def mostrar_dashboard(self, nombre_usuario=None):
+        """Mostrar el dashboard principal (se construye una sola vez)"""
+        if self.dashboard is None:
+            self.dashboard = Dashboard(self.dashboard_vm)
+            self.pantallas.addWidget(self.dashboard)
+            self.dashboard.botones_menu["🏠 Dashboard"].clicked.connect(lambda: self.dashboard.mostrar_seccion())
+            for texto, nombre in (("💰 Transacciones", "transacciones"), ("🎯 Metas", "metas"),
+                                  ("📊 Reportes", "reportes"), ("⚙️ Ajustes", "ajustes")):
+                self.dashboard.botones_menu[texto].clicked.connect(
+                    lambda _=False, nombre=nombre: self.mostrar_pantalla(nombre))
+        
+        # Obtener datos del usuario; el resumen llega después desde el hilo de datos.
+        # Tras la encuesta el nombre llega directo: la configuración aún se está guardando
+        if nombre_usuario is None:
+            nombre_usuario = self.db_manager.obtener_nombre_usuario()
+        print(f"🏠 Mostrando dashboard para: {nombre_usuario}")
+        self.dashboard_vm.actualizar(nombre_usuario=nombre_usuario)
+        
+        self.pantallas.setCurrentWidget(self.dashboard)
+        self.refrescar_resumen()
+        self.refrescar_alertas()
+
+    def mostrar_pantalla(self, nombre):
+        """Mostrar una sección del menú (se construye al abrirla por primera vez)"""
+        pantalla = self.secciones_abiertas.get(nombre)
+        if pantalla is None:
+            with PERFIL.fase(f"pantalla {nombre}"):
+                pantalla = self.secciones_abiertas[nombre] = self._fabricas[nombre]()
+        elif pantalla.RECARGAR_AL_MOSTRAR:
+            pantalla.recargar()
+        self.dashboard.mostrar_seccion(pantalla)
+
+    def on_datos_modificados(self, operacion):
+        """Actualizar lo que muestra datos después de una escritura"""
+        self.refrescar_resumen()
+        self.refrescar_alertas()
+        # Solo se releen las metas que cambiaron desde la última vez
+        if self.notificaciones.ultimo_cambio is not None:
+            self.db.consultar("leer_cambios_metas", self.notificaciones.ultimo_cambio,
+                              al_terminar=self.notificaciones.aplicar_cambios)
+        # Solo existen las secciones que ya se abrieron
+        for pantalla in self.secciones_abiertas.values():
+            pantalla.recargar()
+
+    def on_notificacion(self, evento):
+        """Mostrar un aviso de vencimiento y actualizar el panel de alertas"""
+        print(f"🔔 {evento.mensaje}")
+        self.statusBar().showMessage(evento.mensaje, 15000)
+        self.refrescar_alertas()
+
+    def materializar_recurrencias(self):
+        """Registrar los movimientos recurrentes vencidos en el hilo de datos"""
+        def al_terminar(creados):
+            # Mantenimiento no avisa cambios: avisar solo si se creó algo
+            if creados:
+                self.on_datos_modificados(None)
+        self.db.enviar(Mantenimiento("materializar_recurrencias"), al_terminar=al_terminar)
+
+    def archivar_anios_cerrados(self, al_terminar=None):
+        """Mover los años cerrados a sus archivos (lo pide el usuario desde Ajustes)"""
+        def terminado(movidos):
+            self._anios_archivados(movidos)
+            if al_terminar:
+                al_terminar(movidos)
+        self.db.enviar(Mantenimiento("archivar_anios_cerrados"), al_terminar=terminado)
+
+    def _anios_archivados(self, movidos):
+        """Los movimientos archivados salen del listado de transacciones"""
+        if movidos and "transacciones" in self.secciones_abiertas:
+            self.secciones_abiertas["transacciones"].recargar()
+
+    def refrescar_alertas(self):
+        """Evaluar las reglas sobre lo nuevo y mostrar la tabla de alertas
+        
+        La evaluación va como Mantenimiento para no disparar otro datos_modificados;
+        la consulta se ejecuta después de ella porque las lecturas esperan a las
+        escrituras enviadas antes.
+        """
+        self.db.enviar(Mantenimiento("evaluar_alertas"))
+        self.db.consultar("obtener_alertas", al_terminar=self.dashboard_vm.aplicar_alertas)
+
+    def refrescar_resumen(self):
+        """Pedir el resumen financiero; las peticiones simultáneas se agrupan en una"""
+        if self._resumen_en_curso:
+            self._resumen_pendiente = True
+            return
+        self._resumen_en_curso = True
+        self.db.consultar(
+            "obtener_resumen_financiero",
+            al_terminar=self._resumen_recibido,
+            al_fallar=self._resumen_fallido
+        )
+
+    def _resumen_recibido(self, resumen):
+        """Pasar el resumen al view model, que actualiza solo lo que cambió"""
+        self._resumen_en_curso = False
+        print(f"💰 Resumen financiero: {resumen}")
+        self.dashboard_vm.aplicar_resumen(resumen)
+        self._hito_arranque("primer resumen")
+        # La simulación es vectorizada: se puede repetir con cada resumen
+        self.db.consultar("proyectar_metas", al_terminar=self.dashboard_vm.aplicar_proyecciones)
+        if self._resumen_pendiente:
+            self._resumen_pendiente = False
+            self.refrescar_resumen()
+
+    def _resumen_fallido(self, error):
+        self._resumen_en_curso = False
+        print(f"❌ Error al obtener resumen: {error}")
+
 
 class EncuestaInicial(QWidget):
     def __init__(self, on_finish_callback):
         super().__init__()
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #181818;
-                color: white;
-            }
-        """)
+        self.setObjectName("encuesta")
         self.on_finish_callback = on_finish_callback
 
         self.preguntas = [
@@ -484,25 +1256,18 @@ class EncuestaInicial(QWidget):
 
         # Título principal
         title_frame = QFrame()
-        title_frame.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #00d9ff, stop:1 #006e58);
-                border-radius: 15px;
-                padding: 20px;
-            }
-        """)
+        title_frame.setObjectName("encabezadoEncuesta")
         title_layout = QVBoxLayout(title_frame)
         
         title = QLabel("WALLETIVE")
         title.setFont(QFont("Segoe UI Black", 28))
-        title.setStyleSheet("color: white; background: transparent;")
+        title.setObjectName("tituloEncuesta")
         title.setAlignment(Qt.AlignCenter)
         title_layout.addWidget(title)
         
         subtitle = QLabel("Configuración Inicial")
         subtitle.setFont(QFont("Segoe UI", 14))
-        subtitle.setStyleSheet("color: rgba(255, 255, 255, 0.8); background: transparent;")
+        subtitle.setObjectName("subtituloEncuesta")
         subtitle.setAlignment(Qt.AlignCenter)
         title_layout.addWidget(subtitle)
         
@@ -510,13 +1275,7 @@ class EncuestaInicial(QWidget):
 
         # Contenedor de pregunta
         self.question_frame = QFrame()
-        self.question_frame.setStyleSheet("""
-            QFrame {
-                background-color: #1f1f1f;
-                border-radius: 20px;
-                padding: 30px;
-            }
-        """)
+        self.question_frame.setObjectName("marcoPregunta")
         # Agregar sombra
         shadow = QGraphicsDropShadowEffect()
         shadow.setBlurRadius(20)
@@ -530,7 +1289,7 @@ class EncuestaInicial(QWidget):
         # Etiqueta de pregunta
         self.label = QLabel("")
         self.label.setFont(QFont("Segoe UI", 18, QFont.Bold))
-        self.label.setStyleSheet("color: #00d9ff; background: transparent;")
+        self.label.setObjectName("pregunta")
         self.label.setWordWrap(True)
         self.label.setAlignment(Qt.AlignCenter)
         question_layout.addWidget(self.label)
@@ -538,20 +1297,7 @@ class EncuestaInicial(QWidget):
         # Campo de entrada
         self.input_field = QLineEdit()
         self.input_field.setFont(QFont("Segoe UI", 14))
-        self.input_field.setStyleSheet("""
-            QLineEdit {
-                padding: 15px;
-                font-size: 16px;
-                border: 2px solid #2b2b2b;
-                border-radius: 12px;
-                background-color: #2b2b2b;
-                color: white;
-            }
-            QLineEdit:focus {
-                border: 2px solid #00d9ff;
-                background-color: #333333;
-            }
-        """)
+        self.input_field.setObjectName("campoRespuesta")
         self.input_field.returnPressed.connect(self.continuar)  # Enter para continuar
         question_layout.addWidget(self.input_field)
 
@@ -559,28 +1305,7 @@ class EncuestaInicial(QWidget):
         self.combo_box = QComboBox()
         self.combo_box.addItems(["Sí", "No"])
         self.combo_box.setFont(QFont("Segoe UI", 14))
-        self.combo_box.setStyleSheet("""
-            QComboBox {
-                padding: 15px;
-                font-size: 16px;
-                border: 2px solid #2b2b2b;
-                border-radius: 12px;
-                background-color: #2b2b2b;
-                color: white;
-            }
-            QComboBox:focus {
-                border: 2px solid #00d9ff;
-            }
-            QComboBox::drop-down {
-                border: none;
-                background-color: #006e58;
-                border-radius: 6px;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border: none;
-            }
-        """)
+        self.combo_box.setObjectName("opcionRespuesta")
         self.combo_box.hide()
         question_layout.addWidget(self.combo_box)
 
@@ -588,65 +1313,32 @@ class EncuestaInicial(QWidget):
 
         # Indicador de progreso
         self.progress_frame = QFrame()
-        self.progress_frame.setStyleSheet("background: transparent;")
+        self.progress_frame.setObjectName("progresoEncuesta")
         progress_layout = QHBoxLayout(self.progress_frame)
         progress_layout.setAlignment(Qt.AlignCenter)
         
         self.progress_label = QLabel("")
         self.progress_label.setFont(QFont("Segoe UI", 12))
-        self.progress_label.setStyleSheet("color: #aaaaaa;")
+        self.progress_label.setObjectName("progreso")
         progress_layout.addWidget(self.progress_label)
         
         main_layout.addWidget(self.progress_frame)
 
         # Botones
         self.btn_frame = QFrame()
-        self.btn_frame.setStyleSheet("background: transparent;")
+        self.btn_frame.setObjectName("botonesEncuesta")
         btn_layout = QHBoxLayout(self.btn_frame)
         btn_layout.setSpacing(20)
 
         self.back_btn = QPushButton("⏪ Atrás")
         self.back_btn.clicked.connect(self.atras)
         self.back_btn.setFont(QFont("Segoe UI", 12, QFont.Bold))
-        self.back_btn.setStyleSheet("""
-            QPushButton {
-                padding: 12px 30px;
-                font-size: 14px;
-                background-color: #444444;
-                color: white;
-                border: none;
-                border-radius: 10px;
-            }
-            QPushButton:hover {
-                background-color: #555555;
-            }
-            QPushButton:pressed {
-                background-color: #333333;
-            }
-        """)
+        self.back_btn.setObjectName("botonAtras")
 
         self.continue_btn = QPushButton("Continuar ⏩")
         self.continue_btn.clicked.connect(self.continuar)
         self.continue_btn.setFont(QFont("Segoe UI", 12, QFont.Bold))
-        self.continue_btn.setStyleSheet("""
-            QPushButton {
-                padding: 12px 30px;
-                font-size: 14px;
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #00d9ff, stop:1 #006e58);
-                color: white;
-                border: none;
-                border-radius: 10px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #00b8d4, stop:1 #005a47);
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #0097a7, stop:1 #004d40);
-            }
-        """)
+        self.continue_btn.setObjectName("botonContinuar")
 
         btn_layout.addWidget(self.back_btn)
         btn_layout.addStretch()
@@ -713,7 +1405,7 @@ class EncuestaInicial(QWidget):
             self.respuestas.append(entrada.strip())
         elif tipo == "float":
             try:
-                valor = float(entrada.replace(",", ""))
+                valor = parsear_monto(entrada)
                 if valor < 0:
                     raise ValueError
                 self.respuestas.append(valor)
@@ -763,23 +1455,16 @@ class EncuestaInicial(QWidget):
         msg.setIcon(QMessageBox.Warning)
         msg.setWindowTitle("Entrada inválida")
         msg.setText(texto)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: #2b2b2b;
-                color: white;
-            }
-            QMessageBox QPushButton {
-                background-color: #006e58;
-                color: white;
-                padding: 8px 16px;
-                border-radius: 6px;
-            }
-        """)
         msg.exec_()
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    ventana = Walletive()
-    ventana.show()
+    with PERFIL.fase("QApplication"):
+        app = QApplication(sys.argv)
+    # Una sola hoja de estilos para toda la aplicación
+    with PERFIL.fase("tema"):
+        aplicar_tema(app)
+    with PERFIL.fase("ventana"):
+        ventana = Walletive()
+        ventana.show()
     sys.exit(app.exec_())
\ No newline at end of file
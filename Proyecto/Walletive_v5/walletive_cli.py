@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Interfaz de línea de comandos de Walletive
+Las mismas operaciones de la ventana sobre DatabaseManager, sin importar
+PyQt5: sirve para importar extractos, sacar reportes y hacer mantenimiento
+desde scripts o en un servidor sin pantalla.
+
+Los datos (exportaciones, reportes, tiempos) van a la salida estándar a
+medida que se generan; los mensajes de estado del DatabaseManager y el
+progreso van a la salida de errores, así la salida se puede redirigir o
+encadenar con otros programas.
+
+Uso:
+    python walletive_cli.py [--db walletive.db] <comando> [opciones]
+
+Comandos: importar, exportar, resumen, reporte, respaldar, archivar, vacuum,
+benchmark
+(python walletive_cli.py <comando> --help para ver sus opciones).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+from db_manager import DatabaseManager
+from exportacion import FORMATOS, TABLAS
+from transacciones import NOMBRES_CATEGORIA, NOMBRES_TIPO
+
+
+TIPOS = {nombre.lower(): tipo for tipo, nombre in NOMBRES_TIPO.items()}
+
+
+def _fecha(texto):
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha inválida (se espera AAAA-MM-DD): {texto}")
+
+
+def _progreso(texto):
+    """Línea de progreso que se reescribe en la salida de errores"""
+    sys.stderr.write(f"\r{texto}")
+    sys.stderr.flush()
+
+
+# === Comandos ===
+
+def comando_importar(db, args, salida):
+    def progreso(filas, leidos, total):
+        _progreso(f"🔄 {filas:,} filas ({leidos / total:.0%})" if total else f"🔄 {filas:,} filas")
+    insertadas = db.importar_movimientos(args.archivo, formato=args.formato, progreso=progreso, forzar=args.forzar)
+    sys.stderr.write("\n")
+    if insertadas is None:
+        return 1
+    print(insertadas, file=salida)
+    return 0
+
+
+def comando_exportar(db, args, salida):
+    tablas = args.tabla or ["Movimientos"]
+    formato = args.formato or (None if args.salida != "-" else "csv")
+    if len(tablas) == 1 and not os.path.isdir(args.salida):
+        destinos = {tablas[0]: salida if args.salida == "-" else args.salida}
+    else:
+        # Varias tablas: un archivo por tabla dentro de la carpeta de salida
+        if args.salida == "-":
+            print("❌ Para exportar varias tablas indica una carpeta con -o")
+            return 1
+        os.makedirs(args.salida, exist_ok=True)
+        formato = formato or "csv"
+        extension = formato + ("" if formato == "parquet" or args.sin_comprimir else ".gz")
+        destinos = {tabla: os.path.join(args.salida, f"{tabla}.{extension}") for tabla in tablas}
+
+    anterior = None
+
+    def progreso(tabla, filas):
+        nonlocal anterior
+        # Cada tabla en su propia línea de progreso
+        if anterior not in (None, tabla):
+            sys.stderr.write("\n")
+        anterior = tabla
+        _progreso(f"📦 {tabla}: {filas:,} filas")
+    exportadas = db.exportar(destinos, formato, args.desde, args.hasta, progreso=progreso)
+    sys.stderr.write("\n")
+    if exportadas is None:
+        return 1
+    for tabla, filas in exportadas.items():
+        print(f"✅ {tabla}: {filas:,} filas en {args.salida if destinos[tabla] is salida else destinos[tabla]}")
+    return 0
+
+
+def comando_resumen(db, args, salida):
+    resumen = db.obtener_resumen_financiero()
+    for clave in ("ingresos", "gastos", "metas", "balance"):
+        print(f"{clave:<10}{resumen[clave]:>18,.2f}", file=salida)
+    return 0
+
+
+def comando_reporte(db, args, salida):
+    if args.categorias:
+        filas = db.obtener_totales_por_categoria(TIPOS[args.tipo or "gasto"], args.desde, args.hasta)
+        print(f"{'categoría':<14}{'total':>18}{'movimientos':>13}", file=salida)
+        for categoria_id, total, cantidad in filas:
+            print(f"{NOMBRES_CATEGORIA.get(categoria_id, 'Sin categoría'):<14}{total:>18,.2f}{cantidad:>13,}",
+                  file=salida)
+        return 0
+
+    filas = db.obtener_reporte(args.periodo, args.desde, args.hasta)
+    print(f"{'inicio':<12}{'ingresos':>18}{'gastos':>18}{'metas':>18}{'balance':>18}{'movimientos':>13}",
+          file=salida)
+    for fila in filas:
+        print(f"{fila['inicio']:<12}{fila['ingresos']:>18,.2f}{fila['gastos']:>18,.2f}"
+              f"{fila['metas']:>18,.2f}{fila['balance']:>18,.2f}{fila['cantidad']:>13,}", file=salida)
+    return 0
+
+
+def comando_respaldar(db, args, salida):
+    def progreso(copiadas, total):
+        _progreso(f"💾 {copiadas:,}/{total:,} páginas")
+    ruta = db.respaldar(progreso=progreso)
+    sys.stderr.write("\n")
+    if ruta is None:
+        return 1
+    print(ruta, file=salida)
+    return 0
+
+
+def comando_archivar(db, args, salida):
+    estado = db.estado_archivo()
+    if estado is None:
+        return 1
+    particiones, pendientes = estado
+    if args.listar or not pendientes:
+        for particion in particiones:
+            print(f"{particion.anio}  {particion.desde[:10]} a {particion.hasta[:10]}  "
+                  f"{particion.filas:>12,} movimientos", file=salida)
+        if not pendientes:
+            print("✅ No hay años cerrados para archivar")
+        else:
+            print(f"📦 Se pueden archivar: {', '.join(map(str, pendientes))}")
+        return 0
+    movidos = db.archivar_anios_cerrados()
+    if movidos is None:
+        return 1
+    print(movidos, file=salida)
+    return 0
+
+
+def comando_vacuum(db, args, salida):
+    recuperados = db.vacuum()
+    if recuperados is None:
+        return 1
+    print(f"✅ Base compactada: {recuperados / 1024:,.0f} KB recuperados", file=salida)
+    return 0
+
+
+def comando_benchmark(db, args, salida):
+    """Tiempo de las consultas de la interfaz sobre la base real"""
+    hoy = date.today()
+    operaciones = [
+        ("resumen", lambda: db.obtener_resumen_financiero()),
+        ("reporte mensual (24)", lambda: db.obtener_reporte("mes", hoy - timedelta(days=31 * 23), hoy)),
+        ("reporte diario (31)", lambda: db.obtener_reporte("dia", hoy - timedelta(days=30), hoy)),
+        ("gastos por categoría", lambda: db.obtener_totales_por_categoria(2, hoy - timedelta(days=365), hoy)),
+        ("página de movimientos", lambda: db.obtener_pagina_movimientos(limite=200)),
+        ("conteo de movimientos", lambda: db.contar_movimientos()),
+        ("búsqueda", lambda: db.buscar_movimientos(args.texto)),
+        ("balance al día", lambda: db.balance_al(hoy)),
+    ]
+    if db.numpy_disponible:
+        operaciones.append(("tendencias", lambda: db.obtener_tendencias(hasta=hoy)))
+
+    print(f"{'operación':<26}{'primera':>10}{'mediana':>10}{'máximo':>10}  (ms, {args.repeticiones} repeticiones)",
+          file=salida)
+    for nombre, operacion in operaciones:
+        tiempos = []
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            operacion()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        # La primera incluye cargar cachés e índices en memoria
+        print(f"{nombre:<26}{tiempos[0]:>10.2f}{statistics.median(tiempos):>10.2f}{max(tiempos):>10.2f}",
+              file=salida, flush=True)
+    return 0
+
+
+COMANDOS = {
+    "importar": comando_importar,
+    "exportar": comando_exportar,
+    "resumen": comando_resumen,
+    "reporte": comando_reporte,
+    "respaldar": comando_respaldar,
+    "archivar": comando_archivar,
+    "vacuum": comando_vacuum,
+    "benchmark": comando_benchmark,
+}
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="walletive_cli.py", description="Walletive sin interfaz gráfica")
+    parser.add_argument("--db", default="walletive.db", help="ruta de la base (por defecto walletive.db)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    importar = comandos.add_parser("importar", help="importar un extracto bancario (CSV, OFX o QIF)")
+    importar.add_argument("archivo")
+    importar.add_argument("--formato", choices=["csv", "ofx", "qif"], help="por defecto, según la extensión")
+    importar.add_argument("--forzar", action="store_true", help="importar aunque el archivo ya se haya importado")
+
+    exportar = comandos.add_parser("exportar", help="exportar tablas a CSV, JSON Lines o Parquet")
+    exportar.add_argument("--tabla", action="append", choices=list(TABLAS),
+                          help="tabla a exportar (se puede repetir; por defecto, Movimientos)")
+    exportar.add_argument("-o", "--salida", default="-",
+                          help="archivo (.csv, .jsonl o .parquet, con .gz/.bz2/.xz para comprimir), "
+                               "carpeta para varias tablas o - para la salida estándar")
+    exportar.add_argument("--formato", choices=FORMATOS, help="por defecto, según la extensión")
+    exportar.add_argument("--sin-comprimir", action="store_true", help="no comprimir los archivos de una carpeta")
+    exportar.add_argument("--desde", type=_fecha, help="movimientos desde esta fecha (incluye años archivados)")
+    exportar.add_argument("--hasta", type=_fecha)
+
+    comandos.add_parser("resumen", help="totales de ingresos, gastos, metas y balance")
+
+    reporte = comandos.add_parser("reporte", help="totales por período o por categoría")
+    reporte.add_argument("--periodo", choices=["dia", "semana", "mes", "anio"], default="mes")
+    reporte.add_argument("--desde", type=_fecha)
+    reporte.add_argument("--hasta", type=_fecha)
+    reporte.add_argument("--categorias", action="store_true", help="totales por categoría en lugar de por período")
+    reporte.add_argument("--tipo", choices=sorted(TIPOS), help="tipo para --categorias (por defecto, gasto)")
+
+    comandos.add_parser("respaldar", help="respaldo en línea comprimido (aplica la retención)")
+    archivar = comandos.add_parser("archivar", help="mover los años cerrados a archivos por año "
+                                                   "(dejan de verse en el listado y la búsqueda)")
+    archivar.add_argument("--listar", action="store_true", help="solo mostrar los años archivados y pendientes")
+    comandos.add_parser("vacuum", help="compactar la base y actualizar estadísticas")
+
+    benchmark = comandos.add_parser("benchmark", help="medir las consultas de la interfaz sobre esta base")
+    benchmark.add_argument("-n", "--repeticiones", type=int, default=20)
+    benchmark.add_argument("--texto", default="pago", help="texto para la búsqueda")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    salida = sys.stdout
+    # Los print del DatabaseManager son mensajes de estado: a la salida de errores
+    with redirect_stdout(sys.stderr):
+        db = DatabaseManager(args.db)
+        try:
+            return COMANDOS[args.comando](db, args, salida)
+        except BrokenPipeError:
+            # La salida se cortó (p. ej. "| head"): no es un error
+            return 0
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return 1
+        finally:
+            db.cerrar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())